@@ -0,0 +1,117 @@
+# analytics.py
+"""
+Coordinator analytics served from the rollup tables maintained by save_block
+(database.write_rollups), plus an optional NumPy columnar export of transaction
+metadata for ad-hoc aggregation offline.
+"""
+import io
+from typing import Dict, List, Optional
+import logging
+from database import ROLLUP_BUCKET_SECONDS, db_connection
+
+# Optional: columnar export is only offered when NumPy is installed
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+# group_by dimension -> rollup_counts column
+DIMENSIONS = {
+    'station': 'station_address',
+    'type': 'type_field',
+    'priority': 'priority_level',
+}
+
+
+def time_series(db_path: str, since: float, until: float, bucket_seconds: int = ROLLUP_BUCKET_SECONDS,
+                group_by: List[str] = (), filters: Optional[Dict[str, object]] = None) -> List[Dict]:
+    """
+    Transaction counts per time bucket, split by the group_by dimensions
+    - bucket_seconds: a multiple of ROLLUP_BUCKET_SECONDS (hourly rows are summed up)
+    - filters: dimension -> required value, e.g. {'type': 'check_in'}
+    """
+    columns = [DIMENSIONS[dimension] for dimension in group_by]
+    where = ['bucket >= ?', 'bucket < ?']
+    params = [since, until]
+    for dimension, value in (filters or {}).items():
+        where.append(f"{DIMENSIONS[dimension]} = ?")
+        params.append(value)
+
+    select = ', '.join(['(bucket / ?) * ? AS slot'] + columns)
+    with db_connection(path=db_path) as conn:
+        rows = conn.execute(
+            f"SELECT {select}, SUM(count) AS count FROM rollup_counts WHERE {' AND '.join(where)} "
+            f"GROUP BY {', '.join(['slot'] + columns)} ORDER BY slot",
+            [bucket_seconds, bucket_seconds] + params
+        ).fetchall()
+    return [
+        {"bucket": row['slot'], **{dimension: row[column] for dimension, column in zip(group_by, columns)},
+         "count": row['count']}
+        for row in rows
+    ]
+
+
+def active_series(db_path: str, since: float, until: float,
+                  bucket_seconds: int = ROLLUP_BUCKET_SECONDS) -> List[Dict]:
+    """Distinct addresses and wallets with any transaction, per time bucket"""
+    with db_connection(path=db_path) as conn:
+        rows = conn.execute(
+            '''
+            SELECT (a.bucket / ?) * ? AS slot,
+                   COUNT(DISTINCT a.address) AS addresses,
+                   COUNT(DISTINCT w.family_id) AS wallets
+            FROM rollup_addresses a
+            LEFT JOIN wallet_members w ON w.address = a.address
+            WHERE a.bucket >= ? AND a.bucket < ?
+            GROUP BY slot ORDER BY slot
+            ''',
+            (bucket_seconds, bucket_seconds, since, until)
+        ).fetchall()
+    return [{"bucket": row['slot'], "active_addresses": row['addresses'], "active_wallets": row['wallets']}
+            for row in rows]
+
+
+def columnar_export(chain, since: float, until: float, since_block: int = 0):
+    """
+    Transaction metadata in [since, until) as a compressed .npz of parallel arrays:
+    timestamp (float64), priority (int8), type / station (int32 codes into the
+    type_names / station_names arrays), block_index (int64)
+    - Blocks are selected by index (since_block), not by mining time: timestamp_created
+      is set by the station, so a transaction in the window can sit in any earlier or
+      later block; the window is applied to each transaction
+    - Returns (payload, next_block), next_block being the since_block of the next
+      incremental export
+    - Raises RuntimeError when NumPy is not installed
+    """
+    if numpy is None:
+        raise RuntimeError("NumPy is not installed")
+
+    timestamps, priorities, types, stations, block_indexes = [], [], [], [], []
+    type_codes: Dict[str, int] = {}
+    station_codes: Dict[str, int] = {}
+    next_block = since_block
+    for block in chain.blocks_from(since_block):
+        next_block = block.block_index + 1
+        for tx in block.transactions:
+            if since <= tx.timestamp_created < until:
+                timestamps.append(tx.timestamp_created)
+                priorities.append(tx.priority_level)
+                types.append(type_codes.setdefault(tx.type_field, len(type_codes)))
+                stations.append(station_codes.setdefault(tx.station_address, len(station_codes)))
+                block_indexes.append(block.block_index)
+
+    buffer = io.BytesIO()
+    numpy.savez_compressed(
+        buffer,
+        timestamp=numpy.array(timestamps, dtype=numpy.float64),
+        priority=numpy.array(priorities, dtype=numpy.int8),
+        type=numpy.array(types, dtype=numpy.int32),
+        station=numpy.array(stations, dtype=numpy.int32),
+        block_index=numpy.array(block_indexes, dtype=numpy.int64),
+        type_names=numpy.array(list(type_codes), dtype=str),
+        station_names=numpy.array(list(station_codes), dtype=str),
+    )
+    logger.info(f"Exported {len(timestamps)} transactions as columns from blocks {since_block}-{next_block - 1}")
+    return buffer.getvalue(), next_block
@@ -1,19 +1,32 @@
 # app.py
+import time
+_IMPORT_STARTED = time.perf_counter()   # startup profiling, see /debug/startup
 import hashlib
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, abort, has_request_context
 from flask_cors import CORS
-from blockchain import Blockchain, Transaction, PolicySystem
-import time
+from werkzeug.local import LocalProxy
+from blockchain import Blockchain, DuplicateTransactionError, MEMPOOL_FULL_ERROR, MempoolFullError, Transaction, PolicySystem
+import threading
 import json
 import os
 import base64
 from functools import wraps
-from database import db_connection
+from database import ROLLUP_BUCKET_SECONDS, db_connection
+import analytics
+from crisis_registry import CrisisRegistry
+from replication import Follower
+from events import matches, public_event
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, PGP_LATENCY, REGISTRY, REQUEST_LATENCY
 import pgpy
 import hmac
 import secrets
-import qrcode
-from io import BytesIO
+import html
+from qr_cache import QR_FORMATS, QRCache
+from idempotency import IdempotencyCache, IdempotencyConflict
+from compression import (
+    ENCODING_PREFERENCE, MIN_COMPRESS_SIZE, SEGMENTED_ENCODINGS,
+    compress, negotiate_encoding
+)
 
 ###############
 # TODO: For each block loaded: Wrap up Phase 2
@@ -22,14 +35,41 @@ from io import BytesIO
 # - Only treat blocks with valid signatures as canonical.
 ###############
 
-# DEV NOTE: logging for development only
 import logging
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from logging_config import configure_logging
+# Configure logging (asynchronous queue pipeline, levels from KRISYS_LOG_* env vars)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 MAX_MEMBERS = 20     # DEV NOTE: THIS SHOULD BE DEFINED IN THE BLOCKCHAIN ISNTANTIATION POLICY BY ADMIN
 MIN_PASSPHRASE_LENGTH = 1   # set small limit, just for obfuscation not security
+EVENT_KEEPALIVE_SECONDS = 15    # SSE comment ping so proxies don't drop idle streams
+MAX_LONG_POLL_SECONDS = 60
+MAX_BATCH_SIZE = 5000   # transactions per /transactions/batch request
+MAX_WALLET_BATCH = 500  # wallets per /wallets/batch request
+MAX_CHECKIN_BATCH = 5000   # queued scans per /checkin/batch request
+MAX_CLOCK_SKEW = 300    # seconds a station's scanned_at may run ahead of the server
+MAX_OFFLINE_SECONDS = int(os.getenv('KRISYS_MAX_OFFLINE_SECONDS', 7 * 24 * 3600))   # oldest scanned_at /checkin/batch accepts
+MAX_BLOCK_RANGE = 500   # blocks per /blocks request
+MAX_LOOKUP_ADDRESSES = 500  # addresses per /last-checkins request
+MAX_ALERTS = 1000   # alerts per /alerts response
+REPLICA_OF = os.getenv('KRISYS_REPLICA_OF')   # primary base URL when running as a read replica
+REPLICATION_TOKEN = os.getenv('KRISYS_REPLICATION_TOKEN')   # shared with replicas for /replication/wallets
+MAX_WALLET_PAGE = 500   # wallets (and devices) per /replication/wallets response
+QR_CACHE_CONTROL = 'public, max-age=31536000, immutable'   # QR images of an address never change
+QR_SHEET_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>KriSYS wallet {family_id}</title>
+<style>
+body {{ font-family: sans-serif; }}
+.card {{ display: inline-block; width: 6cm; margin: 0.3cm; padding: 0.3cm; border: 1px dashed #999; text-align: center; page-break-inside: avoid; }}
+.card svg {{ width: 4.5cm; height: 4.5cm; }}
+.name {{ font-weight: bold; margin: 0.2cm 0 0; }}
+.address {{ font-family: monospace; font-size: 8pt; word-break: break-all; }}
+</style></head>
+<body>
+{cards}
+</body></html>
+"""
 
 app = Flask(__name__, static_folder='static')
 ################ DEV NOTE: CHANGE ADMIN SECRETS!!!!!!!
@@ -38,50 +78,98 @@ CORS(app, origins=['http://localhost:3000', 'http://localhost:5000', 'http://loc
 ################
 
 # CREATING CRISIS
-policy_system = PolicySystem()
-hurricane_policy_id = policy_system.create_crisis_policy(
-    name="Hurricane Response 2024",
-    organization="Orange Cross",
-    contact="hurricane-response@orangecross.org",
-    description="Emergency response protocol for 2025 Atlantic hurricane season",
-    policy_settings={
-        'block_interval': 180,  # 3 minutes
-        'size_limit': 10240,    # 10KB for more detailed reports
-        'rate_limit': 600,      # 10 minute between messages
-        'priority_levels': {
-            'evacuation': 1,
-            'medical': 2,
-            'shelter': 3,
-            'supplies': 4,
-            'personal': 5
+def build_policy_system():
+    """In-memory crisis policies (persisted once the blockchain attaches its database)"""
+    policy_system = PolicySystem()
+    hurricane_policy_id = policy_system.create_crisis_policy(
+        name="Hurricane Response 2024",
+        organization="Orange Cross",
+        contact="hurricane-response@orangecross.org",
+        description="Emergency response protocol for 2025 Atlantic hurricane season",
+        policy_settings={
+            'block_interval': 180,  # 3 minutes
+            'size_limit': 10240,    # 10KB for more detailed reports
+            'rate_limit': 600,      # 10 minute between messages
+            'priority_levels': {
+                'evacuation': 1,
+                'medical': 2,
+                'shelter': 3,
+                'supplies': 4,
+                'personal': 5
+            },
+            'types': ['check_in', 'message', 'alert', 'damage_report']
         },
-        'types': ['check_in', 'message', 'alert', 'damage_report']
-    },
-    policy_id="Hurricane_Bobo"
-)
+        policy_id="Hurricane_Bobo"
+    )
+
+    # Activate the hurricane policy
+    policy_system.current_policy = hurricane_policy_id
+    return policy_system
+
+policy_system = build_policy_system()
+
+# The blockchain (master key, database, full chain load, dev stations) is built on first
+# use instead of at import, once per process and shared by all request threads.
+# - Plain `gunicorn app:app`: each worker builds it on its first request
+# - `gunicorn --preload 'app:create_app(preload=True)'`: built once in the master and
+#   inherited copy-on-write by the workers, which start their own miner thread post-fork
+STARTUP_PROFILE = {}    # phase -> seconds, see /debug/startup
+_blockchain_instance = None
+_blockchain_lock = threading.Lock()
+_follower = None    # replication.Follower when running as a read replica
+
+def _ensure_blockchain():
+    """Build the shared blockchain once (without starting the miner)"""
+    global _blockchain_instance
+    if _blockchain_instance is None:
+        with _blockchain_lock:
+            if _blockchain_instance is None:
+                global _follower
+                started = time.perf_counter()
+                instance = Blockchain(policy_system, start_miner=False, replica=bool(REPLICA_OF))
+                STARTUP_PROFILE.update(instance.startup_profile)
+
+                if REPLICA_OF:
+                    _follower = Follower(instance, REPLICA_OF)
+                else:
+                    stations_started = time.perf_counter()
+                    init_dev_stations(instance.crisis_metadata['id'])
+                    STARTUP_PROFILE['dev_stations'] = round(time.perf_counter() - stations_started, 4)
+                STARTUP_PROFILE['blockchain_total'] = round(time.perf_counter() - started, 4)
+
+                logger.info(f"Blockchain ready in {STARTUP_PROFILE['blockchain_total']}s "
+                            f"({len(instance.chain)} blocks)", extra={"event": "startup", **STARTUP_PROFILE})
+                crisis_registry.register(instance.crisis_metadata['id'], instance)
+                _blockchain_instance = instance
+    return _blockchain_instance
+
+def get_blockchain():
+    """
+    The blockchain for this request, with its miner running in this process
+    - /crises/<crisis_id>/... requests get that crisis's chain (see select_crisis)
+    - Everything else gets the host's primary crisis
+    """
+    instance = g.get('crisis_blockchain') if has_request_context() else None
+    if instance is None:
+        instance = _ensure_blockchain()
+    instance.start_miner()  # cheap pid check; starts the miner once per (forked) process
+    if _follower is not None:
+        _follower.start()   # read replicas follow the primary instead of mining
+    return instance
 
-# Activate the hurricane policy
-policy_system.current_policy = hurricane_policy_id
+# Route handlers keep using `blockchain.<attr>`; the proxy resolves it on each access
+blockchain = LocalProxy(get_blockchain)
 
-# Create the blockchain
-blockchain = Blockchain(policy_system)
+# Additional crises hosted by this process, each with its own chain, database and miner
+crisis_registry = CrisisRegistry()
 
-########### TESTING IN DEV MODE ###############
-def DEV_POLICY_CHECK():
-    # Get current policy information
-    current_policy = blockchain.policy_system.get_policy()
-    logger.info(f"Crisis: {current_policy['name']}")
-    logger.info(f"Organization: {current_policy['organization']}")
-    logger.info(f"Contact: {current_policy['contact']}")
-    logger.info(f"Description: {current_policy['description']}")
-
-    # Get specific policy setting
-    block_interval = current_policy['policy']['block_interval']
-    logger.info(f"block_interval: {block_interval}")
-    
-# Call policy check after the blockchain and policy are instatiated
-DEV_POLICY_CHECK()
+# Rendered QR images for wallet cards, shared by all requests in this worker
+qr_cache = QRCache()
+
+# Responses to write requests by Idempotency-Key, so client retries are replayed
+idempotency_cache = IdempotencyCache()
 
+########### TESTING IN DEV MODE ###############
 # Ensure only verified check-in stations count (plain text and public) for hospitals, camps, food trucks, etc. sanctioned by server
 def ensure_station(crisis_id: str, station_id: str, name: str, stype: str, location: str | None = None):
     """
@@ -149,26 +237,27 @@ def provision_dev_station_api_key(crisis_id: str, station_id: str) -> None:
             "do NOT log or expose it like this in production."
         )
 
-# DEV NOTE: SIMULATED VERIFIED STATION FOR DEMO
-crisis_id = blockchain.crisis_metadata['id']
-ensure_station(
-    crisis_id=crisis_id,
-    station_id="HOSPITAL_SE_001",
-    name="Southeast Field Hospital",
-    stype="hospital",
-    location="Sector SE"
-)
-provision_dev_station_api_key(crisis_id, "HOSPITAL_SE_001")
-
-# DEV NOTE: SECOND SIMULATED VERIFIED STATION FOR DEMO
-ensure_station(
-    crisis_id=crisis_id,
-    station_id="STATION_001",
-    name="Default Check-in Station",
-    stype="generic",
-    location=None
-)
-provision_dev_station_api_key(crisis_id, "STATION_001")
+def init_dev_stations(crisis_id: str):
+    """Called once when the blockchain is built, not at import"""
+    # DEV NOTE: SIMULATED VERIFIED STATION FOR DEMO
+    ensure_station(
+        crisis_id=crisis_id,
+        station_id="HOSPITAL_SE_001",
+        name="Southeast Field Hospital",
+        stype="hospital",
+        location="Sector SE"
+    )
+    provision_dev_station_api_key(crisis_id, "HOSPITAL_SE_001")
+
+    # DEV NOTE: SECOND SIMULATED VERIFIED STATION FOR DEMO
+    ensure_station(
+        crisis_id=crisis_id,
+        station_id="STATION_001",
+        name="Default Check-in Station",
+        stype="generic",
+        location=None
+    )
+    provision_dev_station_api_key(crisis_id, "STATION_001")
 
 ########### TESTING IN DEV MODE ###############
 
@@ -177,13 +266,15 @@ provision_dev_station_api_key(crisis_id, "STATION_001")
 # Admin token setup : this is for the organization hosting the entire KriSYS system for a given disaster
 ADMIN_TOKEN = ""
 
-private_key_file = os.path.join('blockchain', 'master_private_key.asc')
-if not os.path.exists(private_key_file):
-    logger.critical("MASTER PRIVATE KEY FILE NOT FOUND. SHUTTING DOWN.")
-    import sys
-    sys.exit(1)
-with open(private_key_file, 'r') as f:
-    ADMIN_TOKEN = f.read()
+def get_admin_token() -> str:
+    """Master private key, read once the blockchain has loaded or generated it"""
+    global ADMIN_TOKEN
+    if not ADMIN_TOKEN:
+        blockchain.load_or_generate_master_key()
+        private_key_file = os.path.join('blockchain', 'master_private_key.asc')
+        with open(private_key_file, 'r') as f:
+            ADMIN_TOKEN = f.read()
+    return ADMIN_TOKEN
 
 # Admin authentication decorator
 def admin_required(f):
@@ -197,7 +288,7 @@ def admin_required(f):
         try:
             # Decode the base64-encoded token
             decoded_token = base64.b64decode(auth_token).decode('utf8')
-            if decoded_token != ADMIN_TOKEN:
+            if decoded_token != get_admin_token():
                 return jsonify({"error": "UNAUTHORIZED: INVALID ADMIN TOKEN"}), 401
         except Exception as e:
             logger.error(f"Token decoding error: {str(e)}")
@@ -224,11 +315,177 @@ def admin_required(f):
 
 #####################
 
+# Request latency per route template (bounded label cardinality). Registered before the
+# compression hook so it runs after it and the timing includes compression.
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+# Read replicas serve explorer and wallet reads; writes go to the primary
+@app.before_request
+def reject_writes_on_replica():
+    if REPLICA_OF and request.method not in ('GET', 'HEAD', 'OPTIONS'):
+        return jsonify({"error": "Read-only replica", "primary": REPLICA_OF}), 403
+
+# /crises/<crisis_id>/... routes (registered at the bottom of this file) run the same
+# handlers against that crisis's chain
+@app.url_value_preprocessor
+def select_crisis(endpoint, values):
+    if not values or 'crisis_id' not in values:
+        return
+    crisis_id = values.pop('crisis_id')
+    _ensure_blockchain()    # registers the primary crisis under its own ID
+    chain = crisis_registry.get(crisis_id)
+    if chain is None:
+        abort(app.make_response((jsonify({"error": f"Unknown crisis: {crisis_id}"}), 404)))
+    chain.policy_system.reload()
+    g.crisis_blockchain = chain
+
+# Follow policy changes made through any worker (rate-limited to one version check
+# per PolicySystem.POLICY_RELOAD_INTERVAL)
+@app.before_request
+def reload_policy():
+    policy_system.reload()  # no-op until the blockchain has attached the database
+
+@app.after_request
+def record_request_latency(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_LATENCY.labels(request.method, route, response.status_code).observe(time.perf_counter() - start)
+    return response
+
+# Scrape-time views of state that is already tracked elsewhere
+REGISTRY.callback('krisys_mempool_transactions', 'Transactions waiting to be mined',
+                  lambda: len(blockchain.pending_transactions))
+REGISTRY.callback('krisys_mempool_bytes', 'Serialized size of the mempool',
+                  lambda: blockchain.pending_bytes)
+REGISTRY.callback('krisys_mempool_saturated', 'Whether the mempool is above its high watermark (1) or not (0)',
+                  lambda: int(blockchain.mempool_saturated))
+REGISTRY.callback('krisys_chain_height', 'Index of the chain head',
+                  lambda: blockchain.chain[-1].block_index if blockchain.chain else -1)
+REGISTRY.callback('krisys_cache_requests_total', 'Cache lookups by cache and result',
+                  lambda: {
+                      ('block', 'hit'): blockchain.block_cache.hits,
+                      ('block', 'miss'): blockchain.block_cache.misses,
+                      ('qr', 'hit'): qr_cache.hits,
+                      ('qr', 'miss'): qr_cache.misses,
+                      ('idempotency', 'hit'): idempotency_cache.hits,
+                      ('idempotency', 'miss'): idempotency_cache.misses,
+                  }, kind='counter', labelnames=('cache', 'result'))
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text exposition of the instrumentation in metrics.py"""
+    return app.response_class(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
+
+# Content-negotiated compression for JSON responses (satellite/cellular clients)
+@app.after_request
+def compress_response(response):
+    if response.mimetype != 'application/json':
+        return response
+    response.vary.add('Accept-Encoding')
+
+    if (response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or not 200 <= response.status_code < 300):
+        return response
+
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return response
+
+    encoding = negotiate_encoding(request.accept_encodings)
+    if not encoding:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    etag, _ = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}")
+    return response
+
+# Conditional GET keyed on the chain head: nothing these endpoints return can change
+# until a new block is saved (or, for extra, e.g. the policy version changes)
+def conditional_on_chain_head(extra=None):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            parts = [blockchain.chain[-1].hash if blockchain.chain else '']
+            if extra:
+                parts.append(extra(**kwargs))
+            etag = hashlib.sha256('|'.join(map(str, parts)).encode()).hexdigest()
+
+            # Short-circuit before the handler touches the chain
+            # The 304 carries the representation's own tag, e.g. "<etag>-gzip" for the gzipped one
+            candidates = [etag] + [f"{etag}-{encoding}" for encoding in ENCODING_PREFERENCE]
+            matched = next((tag for tag in candidates if request.if_none_match.contains_weak(tag)), None)
+            if matched is not None:
+                response = app.response_class(status=304)
+                response.set_etag(matched)
+                response.vary.add('Accept-Encoding')
+                return response
+
+            response = app.make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                encoding = response.headers.get('Content-Encoding')
+                response.set_etag(f"{etag}-{encoding}" if encoding else etag)
+            return response
+        return decorated_function
+    return decorator
+
+def idempotent(f):
+    """
+    Honour an Idempotency-Key header on write endpoints
+    - A retry with the same key and body returns the first response (marked
+      Idempotent-Replayed) without running the handler again
+    - 5xx and 429 responses are not stored, so those requests can be retried for real
+    - Keys are scoped by path and X-Station-API-Key, so another caller reusing a key
+      runs the handler (and its authentication) instead of getting the stored response
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > 255:
+            return jsonify({"error": "Idempotency-Key is too long"}), 400
+
+        # Scoped by the station credential too, so a stored response is only replayed to a
+        # caller holding the same API key (check-ins authenticate inside the handler)
+        credential = hashlib.sha256(request.headers.get('X-Station-API-Key', '').encode('utf-8')).hexdigest()
+        scoped_key = f"{request.path}|{credential}|{key}"
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        try:
+            stored = idempotency_cache.begin(scoped_key, fingerprint)
+        except IdempotencyConflict as e:
+            return jsonify({"error": str(e)}), 409
+        if stored is not None:
+            status, body, mimetype = stored
+            response = app.response_class(body, status=status, mimetype=mimetype)
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = app.make_response(f(*args, **kwargs))
+        except Exception:
+            idempotency_cache.release(scoped_key)
+            raise
+        if response.status_code >= 500 or response.status_code == 429:
+            idempotency_cache.release(scoped_key)
+        else:
+            idempotency_cache.complete(scoped_key, response.status_code, response.get_data(), response.mimetype)
+        return response
+    return decorated_function
+
 # Crisis metadata
 @app.route('/crisis', methods=['GET'])
+@conditional_on_chain_head()
 def get_crisis_info():
     """Get metadata about the current crisis"""
     return jsonify({
+        "crisis_id": blockchain.crisis_metadata['id'],
         "name": blockchain.crisis_metadata['name'],
         "organization": blockchain.crisis_metadata['organization'],
         "contact": blockchain.crisis_metadata['contact'],
@@ -253,25 +510,84 @@ def get_wallet(family_id):
     return jsonify({"error": "Wallet not found"}), 404
 
 @app.route('/wallet/<family_id>/transactions')
+@conditional_on_chain_head(extra=lambda family_id: f"{family_id}|{request.query_string.decode()}")
 def get_wallet_transactions(family_id):
+    """
+    Transactions related to any wallet member
+    - Without parameters: the full history as a JSON array (original shape)
+    - ?since_block=N: only transactions mined after block N, as {"transactions", "cursor"};
+      pass the returned cursor as the next since_block
+    - ?counts=1: {"total", "by_type", "cursor"} only, for badge refreshes
+    """
     wallet = blockchain.wallets.get_wallet(family_id)
     if not wallet:
         return jsonify({"error": "Wallet not found"}), 404
+
+    try:
+        since_block = int(request.args.get('since_block', -1))
+    except ValueError:
+        return jsonify({"error": "since_block must be a block index"}), 400
+    delta = 'since_block' in request.args
+    counts_only = request.args.get('counts') in ('1', 'true')
     
     # Get all member addresses
-    addresses = [member['address'] for member in wallet.members]
+    addresses = set(member['address'] for member in wallet.members)
+    cursor = len(blockchain.chain) - 1    # snapshot: blocks mined meanwhile go to the next delta
     
     # Find transactions related to any member - NO DECRYPTION ON SERVER
-    transactions = []
-    for block in blockchain.chain:
-        for tx in block.transactions:
-            if any(addr in tx.related_addresses for addr in addresses):
-                transactions.append(tx.to_dict())
-    
-    return jsonify(transactions)
+    transactions = [
+        tx for block in blockchain.chain.blocks_for_addresses(addresses, since_block, cursor)
+        for tx in block.transactions if not addresses.isdisjoint(tx.related_addresses)
+    ]
+
+    if counts_only:
+        by_type = {}
+        for tx in transactions:
+            by_type[tx.type_field] = by_type.get(tx.type_field, 0) + 1
+        return jsonify({"total": len(transactions), "by_type": by_type, "cursor": cursor})
+    if delta:
+        return jsonify({"transactions": [tx.to_dict() for tx in transactions], "cursor": cursor})
+    return jsonify([tx.to_dict() for tx in transactions])
 
 # Message submission with encryption
+def _build_transaction(data):
+    """
+    Build a Transaction from a submitted payload
+    - Direct messages with a recipient_id are encrypted to the recipient wallet's public key
+    - Raises KeyError for missing fields
+    """
+    transaction = Transaction(
+        timestamp_created = data['timestamp_created'],
+        station_address = data['station_address'],
+        message_data = data['message_data'],
+        related_addresses = data['related_addresses'],
+        type_field = data['type_field'],
+        priority_level = data['priority_level'],
+        relay_hash = data.get('relay_hash', ''),
+        posted_id = data.get('posted_id', '')
+    )
+    if data['type_field'] == 'message' and 'recipient_id' in data:
+        # recipient_id is a family ID or one of its member addresses (reverse index)
+        recipient = data['recipient_id']
+        if not blockchain.wallets.get_wallet(recipient):
+            recipient = blockchain.wallets.wallet_for_address(recipient) or recipient
+        # Get recipient's public key from wallet_keys table
+        public_key_str = blockchain.wallets.get_wallet_public_key(recipient)
+        if public_key_str:
+            # PGP encryption is randomized: the ID is taken from the plaintext body first,
+            # so a retry of the same message is still the same transaction
+            transaction.transaction_id = transaction.generate_id(recipient_id=recipient)
+            # Encrypt message with recipient's public key
+            pub_key = pgpy.PGPKey()
+            pub_key.parse(public_key_str)
+            with PGP_LATENCY.labels(operation='encrypt').time():
+                encrypted_msg = pub_key.encrypt(pgpy.PGPMessage.new(transaction.message_data))
+            transaction.message_data = str(encrypted_msg)
+
+    return transaction
+
 @app.route('/transaction', methods=['POST'])
+@idempotent
 def add_transaction():
     data = request.json
     
@@ -280,33 +596,19 @@ def add_transaction():
     
     if data:
         if data['type_field'] == 'message':
-            
-            # Handle message encryption using wallet_keys table
-            message_data = data['message_data']
-            if data['type_field'] == 'message' and 'recipient_id' in data:
-                # Get recipient's public key from wallet_keys table
-                public_key_str = blockchain.wallets.get_wallet_public_key(data['recipient_id'])
-                if public_key_str:
-                    # Encrypt message with recipient's public key
-                    pub_key = pgpy.PGPKey()
-                    pub_key.parse(public_key_str)
-                    encrypted_msg = pub_key.encrypt(pgpy.PGPMessage.new(message_data))
-                    message_data = str(encrypted_msg)
-                    
             try:
-                tx = Transaction(
-                    timestamp_created = data['timestamp_created'],
-                    station_address = data['station_address'],
-                    message_data = message_data,
-                    related_addresses = data['related_addresses'],
-                    type_field = data['type_field'],
-                    priority_level = data['priority_level'],
-                    relay_hash = data.get('relay_hash', ''),
-                    posted_id = data.get('posted_id', '')
-                )
+                tx = _build_transaction(data)
                 # Add transaction with optional rate limit override
                 blockchain.add_transaction(tx, rate_limit_override=rate_limit_override)
                 return jsonify({"status": "success", "transaction_id": tx.transaction_id}), 201
+
+            except DuplicateTransactionError as e:
+                # A retried body: same content-addressed ID as one already accepted
+                return jsonify({"error": str(e), "transaction_id": tx.transaction_id}), 409
+
+            except MempoolFullError as e:
+                # Backpressure: ask the client to come back once the next block has drained the mempool
+                return jsonify({"error": str(e), "retry_after": e.retry_after}), 429, {'Retry-After': str(e.retry_after)}
             
             except KeyError as e:
                 return jsonify({"error": f"Missing field: {str(e)}"}), 400
@@ -318,21 +620,291 @@ def add_transaction():
             return jsonify({"error": "THIS TYPE OF TRANSACTION IS NOT YET DEFINED"}), 500
     else:
         return jsonify({"error": "No data provided"}), 400
-    
+
+# Bulk submission for relays replaying transactions collected offline
+@app.route('/transactions/batch', methods=['POST'])
+@idempotent
+def add_transactions_batch():
+    """
+    Accepts a JSON array of transactions, {"transactions": [...]}, or an
+    application/x-ndjson body (one transaction per line). Returns a per-item status;
+    the whole batch is admitted to the mempool with a single lock acquisition.
+    """
+    rate_limit_override = request.headers.get('X-Dev-Rate-Override') == 'true'
+
+    try:
+        if request.mimetype == 'application/x-ndjson':
+            items = [json.loads(line) for line in request.get_data(as_text=True).splitlines() if line.strip()]
+        else:
+            items = request.get_json()
+            if isinstance(items, dict):
+                items = items.get('transactions')
+    except ValueError:
+        return jsonify({"error": "Malformed batch body"}), 400
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "No transactions provided"}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Batch exceeds {MAX_BATCH_SIZE} transactions"}), 413
+
+    results = [None] * len(items)
+    built = []  # (position, Transaction)
+    for position, data in enumerate(items):
+        try:
+            if not isinstance(data, dict):
+                raise ValueError("Transaction must be an object")
+            if data['type_field'] != 'message':
+                raise ValueError("THIS TYPE OF TRANSACTION IS NOT YET DEFINED")
+            built.append((position, _build_transaction(data)))
+        except KeyError as e:
+            results[position] = {"status": "rejected", "error": f"Missing field: {str(e)}"}
+        except Exception as e:
+            results[position] = {"status": "rejected", "error": str(e)}
+
+    errors = blockchain.add_transactions([tx for _, tx in built], rate_limit_override=rate_limit_override)
+    for (position, tx), error in zip(built, errors):
+        results[position] = (
+            {"status": "rejected", "transaction_id": tx.transaction_id, "error": error} if error
+            else {"status": "accepted", "transaction_id": tx.transaction_id}
+        )
+
+    accepted = sum(1 for result in results if result['status'] == 'accepted')
+    headers = {}
+    if MEMPOOL_FULL_ERROR in errors:
+        headers['Retry-After'] = str(blockchain.retry_after())
+    return jsonify({
+        "accepted": accepted,
+        "rejected": len(results) - accepted,
+        "results": results,
+    }), 200, headers
+
 @app.route('/blockchain', methods=['GET'])
+@conditional_on_chain_head()
 def get_chain():
-    chain_data = [block.to_dict() for block in blockchain.chain]
-    return jsonify(chain_data), 200
+    # Body is assembled from per-block cached JSON/compressed segments, so each
+    # mined block is serialized and compressed once rather than on every poll
+    encoding = negotiate_encoding(request.accept_encodings, SEGMENTED_ENCODINGS)
+    body = blockchain.block_cache.render_chain(blockchain.chain, encoding)
+    response = app.response_class(body, status=200, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+@app.route('/mempool', methods=['GET'])
+def get_mempool_status():
+    """Pending queue size against the admission watermarks, and the measured mining rate"""
+    return jsonify(blockchain.mempool_status()), 200
+
+# Replication: header-first sync for read replicas (see replication.py)
+@app.route('/blockchain/head', methods=['GET'])
+def get_chain_head():
+    if not blockchain.chain:
+        return jsonify({"error": "Chain is empty"}), 503
+    head = blockchain.chain[-1]
+    return jsonify({
+        "block_index": head.block_index,
+        "hash": head.hash,
+        "previous_hash": head.previous_hash,
+        "timestamp": head.timestamp,
+        "transaction_count": len(head.transactions),
+    })
+
+@app.route('/blocks', methods=['GET'])
+def get_block_range():
+    """
+    Blocks [start, end) from the per-block cache, at most MAX_BLOCK_RANGE per request
+    - A fully mined, explicitly bounded range never changes, so it is cacheable forever
+    """
+    height = len(blockchain.chain)
+    start = request.args.get('start', 0, type=int)
+    requested_end = request.args.get('end', type=int)
+    end = min(height, start + MAX_BLOCK_RANGE, requested_end if requested_end is not None else height)
+    if start < 0 or end < start:
+        return jsonify({"error": "Invalid block range"}), 400
+
+    encoding = negotiate_encoding(request.accept_encodings, SEGMENTED_ENCODINGS)
+    body = blockchain.block_cache.render_chain(blockchain.chain[start:end], encoding)
+    response = app.response_class(body, status=200, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if requested_end is not None and end == requested_end:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+@app.route('/replication/wallets', methods=['GET'])
+def get_wallet_range():
+    """
+    Public wallet rows for followers: members, wallet public key and devices, never private keys
+    - after: primary wallet id cursor, devices_since: registered_at cursor for devices
+    - Lists every family, so it requires the X-Replication-Token shared with the replicas
+    """
+    token = request.headers.get('X-Replication-Token', '')
+    if not REPLICATION_TOKEN:
+        return jsonify({"error": "Wallet replication is not enabled on this node"}), 403
+    if not hmac.compare_digest(token, REPLICATION_TOKEN):
+        return jsonify({"error": "UNAUTHORIZED: INVALID REPLICATION TOKEN"}), 401
+    after = request.args.get('after', 0, type=int)
+    devices_since = request.args.get('devices_since', 0.0, type=float)
+    return jsonify(blockchain.wallets.wallet_range(after, devices_since, MAX_WALLET_PAGE))
+
+@app.route('/transaction/<string:transaction_id>', methods=['GET'])
+def get_transaction(transaction_id: str):
+    """One transaction with its status: pending (mempool position) or confirmed (block, depth)"""
+    result = blockchain.find_transaction(transaction_id)
+    if result is None:
+        return jsonify({"error": "Transaction not found"}), 404
+    return jsonify(result)
+
+@app.route('/address/<string:address>/wallet', methods=['GET'])
+def get_address_wallet(address: str):
+    """Which wallet a member address belongs to"""
+    family_id = blockchain.wallets.wallet_for_address(address)
+    if family_id is None:
+        return jsonify({"error": "Address does not belong to a wallet"}), 404
+    return jsonify({"address": address, "family_id": family_id})
+
+# "Where was my relative last checked in": served from the last_checkins view
+@app.route('/address/<string:address>/last-checkin', methods=['GET'])
+def get_address_last_checkin(address: str):
+    checkin = blockchain.last_checkins([address])[address]
+    if checkin is None:
+        return jsonify({"error": "No check-in for this address"}), 404
+    return jsonify({"address": address, **checkin})
+
+@app.route('/wallet/<family_id>/last-checkin', methods=['GET'])
+def get_wallet_last_checkin(family_id: str):
+    """Latest check-in of every member, plus the most recent across the family"""
+    wallet = blockchain.wallets.get_wallet(family_id)
+    if not wallet:
+        return jsonify({"error": "Wallet not found"}), 404
+
+    checkins = blockchain.last_checkins([member['address'] for member in wallet.members])
+    members = [
+        {"id": member['id'], "name": member['name'], "address": member['address'],
+         "last_checkin": checkins[member['address']]}
+        for member in wallet.members
+    ]
+    seen = [m for m in members if m['last_checkin']]
+    latest = max(seen, key=lambda m: m['last_checkin']['timestamp']) if seen else None
+    return jsonify({"family_id": family_id, "members": members, "latest": latest})
+
+@app.route('/last-checkins', methods=['GET'])
+def get_last_checkins():
+    """Batch variant: ?address= repeated, up to MAX_LOOKUP_ADDRESSES"""
+    addresses = list(dict.fromkeys(request.args.getlist('address')))
+    if not addresses:
+        return jsonify({"error": "No addresses provided"}), 400
+    if len(addresses) > MAX_LOOKUP_ADDRESSES:
+        return jsonify({"error": f"At most {MAX_LOOKUP_ADDRESSES} addresses per request"}), 413
+    return jsonify({"last_checkins": blockchain.last_checkins(addresses)})
 
 @app.route('/address/<string:address>', methods=['GET'])
 def get_address_transactions(address):
     txs = []
-    for block in blockchain.chain:
+    for block in blockchain.chain.blocks_for_addresses([address]):
         for tx in block.transactions:
             if address in tx.related_addresses:
                 txs.append(tx.to_dict())
     return jsonify(txs), 200
 
+# Current alerts without scanning the chain: alerts index plus the mempool
+@app.route('/alerts', methods=['GET'])
+def get_alerts():
+    """
+    Alerts created since ?since= (unix time, default the last 24 hours), oldest first
+    - Alerts not yet mined are included with "pending": true
+    - ?max_priority=N keeps alerts of priority 1..N; ?limit= caps the page
+    - New alerts are also pushed on /events as soon as they are admitted
+    """
+    now = time.time()
+    try:
+        since = float(request.args.get('since', now - 24 * 3600))
+        max_priority = request.args.get('max_priority')
+        max_priority = int(max_priority) if max_priority is not None else None
+        limit = min(int(request.args.get('limit', 200)), MAX_ALERTS)
+    except ValueError:
+        return jsonify({"error": "Invalid since, max_priority or limit"}), 400
+    return jsonify({"alerts": blockchain.alerts_since(since, max_priority, limit), "now": now})
+
+# Push feed of new blocks, optionally filtered to the addresses a dashboard cares about
+def _event_filter():
+    """
+    Resolve ?address=... (repeatable) and ?family_id=... into a set of addresses.
+    Returns (addresses or None for everything, error response or None)
+    """
+    addresses = set(request.args.getlist('address'))
+    family_id = request.args.get('family_id')
+    if family_id:
+        wallet = blockchain.wallets.get_wallet(family_id)
+        if not wallet:
+            return None, (jsonify({"error": "Wallet not found"}), 404)
+        addresses.update(member['address'] for member in wallet.members)
+    return (addresses or None), None
+
+def _event_cursor():
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('since')
+    if cursor is None:
+        return blockchain.events.sequence
+    return int(cursor)
+
+@app.route('/events', methods=['GET'])
+def stream_events():
+    """Server-Sent Events stream of block headers as save_block commits them"""
+    addresses, error = _event_filter()
+    if error:
+        return error
+    try:
+        cursor = _event_cursor()
+    except ValueError:
+        return jsonify({"error": "Invalid event cursor"}), 400
+    feed = blockchain.events
+
+    def generate(cursor):
+        yield "retry: 5000\n\n"
+        while True:
+            events = feed.wait(cursor, timeout=EVENT_KEEPALIVE_SECONDS)
+            if not events:
+                yield ": keepalive\n\n"
+                continue
+            for event in events:
+                cursor = event['id']
+                if matches(event, addresses):
+                    payload = json.dumps(public_event(event, addresses))
+                    yield f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n"
+
+    response = app.response_class(generate(cursor), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'     # don't let nginx buffer the stream
+    return response
+
+@app.route('/events/poll', methods=['GET'])
+def poll_events():
+    """
+    Long-poll fallback for clients without EventSource
+    - Without ?since= returns the current cursor immediately
+    - With ?since= waits up to ?timeout= seconds for matching events
+    """
+    addresses, error = _event_filter()
+    if error:
+        return error
+    feed = blockchain.events
+    if 'since' not in request.args:
+        return jsonify({"events": [], "cursor": feed.sequence})
+    try:
+        cursor = int(request.args['since'])
+        timeout = min(float(request.args.get('timeout', 25)), MAX_LONG_POLL_SECONDS)
+    except ValueError:
+        return jsonify({"error": "Invalid since or timeout"}), 400
+
+    deadline = time.time() + timeout
+    while True:
+        events = feed.wait(cursor, timeout=max(0, deadline - time.time()))
+        if events:
+            cursor = events[-1]['id']
+        matched = [public_event(e, addresses) for e in events if matches(e, addresses)]
+        if matched or time.time() >= deadline:
+            return jsonify({"events": matched, "cursor": cursor})
+
 # Admin endpoint for manual mining
 @app.route('/admin/mine', methods=['POST'])
 def mine_block():
@@ -378,6 +950,57 @@ def create_wallet():
     except Exception as e:
         logger.error(f"Wallet creation error: {str(e)}")
         return jsonify({"error": "Wallet creation failed"}), 500
+
+@app.route('/wallets/batch', methods=['POST'])
+def create_wallets_batch():
+    """
+    Create many family wallets at once (registration drives)
+    - Body: {"families": [{"num_members": n, "passphrase": "..."}, ...]}
+    - Streams application/x-ndjson: one line per wallet as its keys are ready
+      ({"index": i, ...wallet}), then {"done": true, "created": n}
+    - All wallets are stored together after the last line is generated; a client
+      that disconnects mid-stream leaves nothing behind
+    """
+    families = (request.get_json(silent=True) or {}).get('families')
+    if not isinstance(families, list) or not families:
+        return jsonify({"error": "families must be a non-empty list"}), 400
+    if len(families) > MAX_WALLET_BATCH:
+        return jsonify({"error": f"At most {MAX_WALLET_BATCH} wallets per batch"}), 400
+
+    batch = []
+    for index, family in enumerate(families):
+        try:
+            num_members = int(family.get('num_members', 1))
+        except (AttributeError, TypeError, ValueError):
+            return jsonify({"error": f"families[{index}]: invalid entry"}), 400
+        passphrase = family.get('passphrase', '')
+        if not isinstance(passphrase, str) or len(passphrase) < MIN_PASSPHRASE_LENGTH:
+            return jsonify({"error": f"families[{index}]: Passphrase must be at least {MIN_PASSPHRASE_LENGTH} characters"}), 400
+        if num_members < 1 or num_members > MAX_MEMBERS:
+            return jsonify({"error": f"families[{index}]: Number of members must be between 1-{MAX_MEMBERS}"}), 400
+        batch.append({
+            "family_id": hashlib.sha256(secrets.token_bytes(32)).hexdigest()[:24],
+            "members": [{"name": f"Member {i+1}"} for i in range(num_members)],
+            "passphrase": passphrase,
+        })
+
+    wallets, crisis_id = blockchain.wallets, blockchain.crisis_metadata['id']    # the stream outlives the request context
+
+    def generate():
+        created = 0
+        try:
+            for index, wallet in wallets.create_wallets(batch, crisis_id):
+                created += 1
+                yield json.dumps({"index": index, **wallet.to_dict()}) + "\n"
+        except Exception as e:
+            logger.error(f"Batch wallet creation error: {str(e)}")
+            yield json.dumps({"error": "Wallet creation failed", "created": 0}) + "\n"
+            return
+        yield json.dumps({"done": True, "created": created}) + "\n"
+
+    response = app.response_class(generate(), status=201, mimetype='application/x-ndjson')
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
     ########### OLD
     # try: 
     #     data = request.json
@@ -408,6 +1031,7 @@ def create_wallet():
 
 @app.route('/admin/alert', methods=['POST'])
 @admin_required
+@idempotent
 def admin_alert():
     data = request.json
     try: 
@@ -430,28 +1054,140 @@ def admin_alert():
 
 @app.route('/wallet/<family_id>/qr/<address>')
 def get_address_qr(family_id: str, address: str):
-    """Generate QR code for a specific address"""
+    """
+    QR code for a specific address
+    - Default: JSON with a base64 PNG data URI
+    - ?format=png|svg: the raw image, cacheable forever (an address never changes)
+    """
+    fmt = request.args.get('format')
+    if fmt is not None and fmt not in QR_FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(QR_FORMATS)}"}), 400
+
     try:
-        # Generate QR code
-        img = qrcode.make(address)
-        buffered = BytesIO()
-        img.save(buffered, "PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode('utf-8')
-        return jsonify({
-            "qr_code": f"data:image/png;base64,{img_str}"
-        })
+        if fmt is None:
+            response = jsonify({
+                "qr_code": qr_cache.data_uri(address)
+            })
+        else:
+            response = app.response_class(qr_cache.get(address, fmt), mimetype=QR_FORMATS[fmt])
+            response.add_etag()
+            response.make_conditional(request)
+            response.headers['Cache-Control'] = QR_CACHE_CONTROL    # raw image only: URL is keyed on its content
+        return response
         
     except Exception as e:
         logger.error(f"QR generation error: {str(e)}")
         return jsonify({"error": "QR generation failed"}), 500
 
 
+@app.route('/wallet/<family_id>/qr')
+def get_wallet_qr_codes(family_id: str):
+    """
+    QR codes for every member of a wallet in one call
+    - Default: JSON list of members with PNG data URIs
+    - ?format=html: printable sheet of member cards (inline SVG)
+    """
+    fmt = request.args.get('format', 'json')
+    if fmt not in ('json', 'html'):
+        return jsonify({"error": "format must be json or html"}), 400
+
+    wallet = blockchain.get_wallet(family_id)
+    if not wallet:
+        return jsonify({"error": "Wallet not found"}), 404
+
+    try:
+        if fmt == 'html':
+            cards = []
+            for member in wallet.members:
+                svg = qr_cache.get(member['address'], 'svg').decode('utf-8')
+                svg = svg[svg.index('<svg'):]  # drop the XML declaration to inline it
+                cards.append(
+                    f'<div class="card">{svg}'
+                    f'<p class="name">{html.escape(member["name"])}</p>'
+                    f'<p class="address">{html.escape(member["address"])}</p></div>'
+                )
+            sheet = QR_SHEET_TEMPLATE.format(family_id=html.escape(family_id), cards='\n'.join(cards))
+            return app.response_class(sheet, mimetype='text/html')
+
+        return jsonify({
+            "family_id": family_id,
+            "members": [{
+                "id": member['id'],
+                "name": member['name'],
+                "address": member['address'],
+                "qr_code": qr_cache.data_uri(member['address']),
+            } for member in wallet.members],
+        })
+
+    except Exception as e:
+        logger.error(f"QR sheet generation error: {str(e)}")
+        return jsonify({"error": "QR generation failed"}), 500
+
+
 @app.route('/policy', methods=['GET'])
+@conditional_on_chain_head(extra=lambda: blockchain.policy_system.version)
 def get_current_policy():
     policy = blockchain.policy_system.get_policy()
     return jsonify(policy)
 
 
+# Coordinator analytics from the rollup tables (analytics.py)
+def _analytics_window():
+    """(since, until) from the query string, defaulting to the last 24 hours"""
+    now = time.time()
+    until = request.args.get('until', now, type=float)
+    since = request.args.get('since', until - 24 * 3600, type=float)
+    return since, until
+
+@app.route('/admin/analytics', methods=['GET'])
+@admin_required
+def admin_analytics():
+    """
+    Time-series slices of transaction counts plus active addresses / wallets
+    - ?bucket=<seconds> (multiple of an hour), ?group_by=station,type,priority
+    - ?station=, ?type=, ?priority= filter the counts
+    """
+    since, until = _analytics_window()
+    bucket = request.args.get('bucket', ROLLUP_BUCKET_SECONDS, type=int)
+    if bucket <= 0 or bucket % ROLLUP_BUCKET_SECONDS:
+        return jsonify({"error": f"bucket must be a multiple of {ROLLUP_BUCKET_SECONDS} seconds"}), 400
+
+    group_by = [d for d in request.args.get('group_by', '').split(',') if d]
+    unknown = set(group_by) - set(analytics.DIMENSIONS)
+    if unknown:
+        return jsonify({"error": f"Unknown group_by: {', '.join(sorted(unknown))}"}), 400
+    filters = {d: request.args.get(d, type=int if d == 'priority' else str)
+               for d in analytics.DIMENSIONS if request.args.get(d) is not None}
+
+    # Rollup rows are hourly: widen the window to whole buckets
+    since = int(since // bucket) * bucket
+    return jsonify({
+        "since": since,
+        "until": until,
+        "bucket_seconds": bucket,
+        "series": analytics.time_series(blockchain.db_path, since, until, bucket, group_by, filters),
+        "active": analytics.active_series(blockchain.db_path, since, until, bucket),
+    })
+
+@app.route('/admin/analytics/export', methods=['GET'])
+@admin_required
+def admin_analytics_export():
+    """
+    Transaction metadata as NumPy columns (.npz), 501 when NumPy is not installed
+    - ?since_block= skips blocks already exported; X-Next-Block is the cursor for the next call
+    """
+    if analytics.numpy is None:
+        return jsonify({"error": "Columnar export requires NumPy on the server"}), 501
+    since, until = _analytics_window()
+    since_block = request.args.get('since_block', 0, type=int)
+    if since_block < 0:
+        return jsonify({"error": "since_block must not be negative"}), 400
+    payload, next_block = analytics.columnar_export(blockchain.chain, since, until, since_block)
+    response = app.response_class(payload, mimetype='application/octet-stream')
+    response.headers['Content-Disposition'] = f'attachment; filename="transactions-{int(since)}-{int(until)}.npz"'
+    response.headers['X-Next-Block'] = str(next_block)
+    return response
+
 @app.route('/admin/policy', methods=['POST'])
 @admin_required
 def set_policy():
@@ -463,6 +1199,77 @@ def set_policy():
     return jsonify({"error": "Invalid Policy ID provided"}), 400
 
 
+@app.route('/admin/stations', methods=['POST'])
+@admin_required
+def provision_station():
+    """
+    Register a check-in station for this crisis (or re-key an existing one) and return
+    its API key, which is shown only once; only its SHA-256 is stored
+    - Body: {"station_id": ..., "name": ..., "type": ..., "location": ...}
+    - Per crisis as /crises/<crisis_id>/admin/stations: stations live in that chain's database
+    """
+    data = request.get_json(silent=True) or {}
+    station_id = data.get('station_id')
+    if not isinstance(station_id, str) or not station_id:
+        return jsonify({"error": "Missing station_id"}), 400
+
+    crisis_id = blockchain.crisis_metadata['id']
+    api_key = secrets.token_urlsafe(32)
+    with db_connection(path=blockchain.db_path) as conn:
+        conn.execute(
+            '''
+            INSERT INTO stations (crisis_id, station_id, name, type, location, api_key_hash, status)
+            VALUES (?, ?, ?, ?, ?, ?, 'active')
+            ON CONFLICT(crisis_id, station_id) DO UPDATE SET
+                name = excluded.name, type = excluded.type, location = excluded.location,
+                api_key_hash = excluded.api_key_hash, status = 'active'
+            ''',
+            (crisis_id, station_id, data.get('name', station_id), data.get('type', 'generic'),
+             data.get('location'), hashlib.sha256(api_key.encode('utf-8')).hexdigest()),
+        )
+        conn.commit()
+
+    logger.info(f"Provisioned station {station_id} for crisis {crisis_id}")
+    return jsonify({"station_id": station_id, "crisis_id": crisis_id, "api_key": api_key}), 201
+
+def _authenticate_station(station_id, api_key):
+    """Check a station's API key against its stored hash, returns an error response or None"""
+    crisis_id = blockchain.crisis_metadata['id']
+
+    # Look up station auth info
+    with db_connection(path=blockchain.db_path) as conn:
+        row = conn.execute(
+            '''
+            SELECT api_key_hash, status
+            FROM stations
+            WHERE crisis_id = ? AND station_id = ?
+            ''',
+            (crisis_id, station_id),
+        ).fetchone()
+
+    if not row:
+        logger.warning(
+            f"Check-in attempt from unknown station_id={station_id} "
+            f"for crisis={crisis_id}"
+        )
+        return jsonify({"error": "Unknown station_id"}), 400
+
+    if row['status'] != 'active' or not row['api_key_hash']:
+        logger.warning(
+            f"Check-in attempt from inactive station_id={station_id} "
+            f"for crisis={crisis_id}, status={row['status']}"
+        )
+        return jsonify({"error": "Station not active"}), 403
+
+    # Verify API key
+    provided_hash = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+    if not hmac.compare_digest(provided_hash, row['api_key_hash']):
+        logger.warning(
+            f"Invalid API key for station_id={station_id} crisis={crisis_id}"
+        )
+        return jsonify({"error": "Invalid station API key"}), 401
+    return None
+
 # Verified check-in stations like camp office, food truck, hospital, etc.
 # DEV NOTE:
 #   -If X-Station-API-Key is missing → 401.
@@ -471,6 +1278,7 @@ def set_policy():
 #   -If SHA-256(api_key) does not match api_key_hash (with hmac.compare_digest) → 401.
 #   -Only then do we accept and add the check_in transaction.
 @app.route('/checkin', methods=['POST'])
+@idempotent
 def check_in():
     """Process QR code scan and create check-in transaction"""
     try:
@@ -485,40 +1293,9 @@ def check_in():
         if not api_key:
             return jsonify({"error": "Missing station API key"}), 401
 
-        crisis_id = blockchain.crisis_metadata['id']
-
-        # Look up station auth info
-        with db_connection() as conn:
-            row = conn.execute(
-                '''
-                SELECT api_key_hash, status
-                FROM stations
-                WHERE crisis_id = ? AND station_id = ?
-                ''',
-                (crisis_id, station_id),
-            ).fetchone()
-
-        if not row:
-            logger.warning(
-                f"Check-in attempt from unknown station_id={station_id} "
-                f"for crisis={crisis_id}"
-            )
-            return jsonify({"error": "Unknown station_id"}), 400
-
-        if row['status'] != 'active' or not row['api_key_hash']:
-            logger.warning(
-                f"Check-in attempt from inactive station_id={station_id} "
-                f"for crisis={crisis_id}, status={row['status']}"
-            )
-            return jsonify({"error": "Station not active"}), 403
-
-        # Verify API key
-        provided_hash = hashlib.sha256(api_key.encode('utf-8')).hexdigest()
-        if not hmac.compare_digest(provided_hash, row['api_key_hash']):
-            logger.warning(
-                f"Invalid API key for station_id={station_id} crisis={crisis_id}"
-            )
-            return jsonify({"error": "Invalid station API key"}), 401
+        error = _authenticate_station(station_id, api_key)
+        if error:
+            return error
 
         # Create check-in transaction
         tx = Transaction(
@@ -671,6 +1448,87 @@ def check_in():
     # ---------------------------------------------------------------------------
 
 
+@app.route('/checkin/batch', methods=['POST'])
+@idempotent
+def check_in_batch():
+    """
+    Upload a station's offline scan queue: {"station_id": ..., "scans": [{"address", "scanned_at"}]}
+    - The station is authenticated once for the whole batch
+    - Scans keep their original scanned_at as timestamp_created, so a re-upload of the
+      same queue is rejected as duplicate rather than checked in twice
+    - Rate policy: the per-station limit is replaced by one check-in per address per
+      rate_limit seconds of scan time, so a double scan of the same person is dropped
+      but a busy station's backlog is not
+    - scanned_at must lie within MAX_OFFLINE_SECONDS before and MAX_CLOCK_SKEW after the
+      server clock, so a backdated scan cannot slip under the rate rule or into old rollup buckets
+    - Everything admitted goes to the mempool in one add_transactions call
+    """
+    data = request.get_json(silent=True) or {}
+    station_id = data.get('station_id', 'STATION_001')
+    scans = data.get('scans')
+    api_key = request.headers.get('X-Station-API-Key')
+
+    if not api_key:
+        return jsonify({"error": "Missing station API key"}), 401
+    if not isinstance(scans, list) or not scans:
+        return jsonify({"error": "No scans provided"}), 400
+    if len(scans) > MAX_CHECKIN_BATCH:
+        return jsonify({"error": f"Batch exceeds {MAX_CHECKIN_BATCH} scans"}), 413
+
+    error = _authenticate_station(station_id, api_key)
+    if error:
+        return error
+
+    results = [None] * len(scans)
+    valid = []  # (scanned_at, position, address)
+    now = time.time()
+    earliest, latest = now - MAX_OFFLINE_SECONDS, now + MAX_CLOCK_SKEW
+    for position, scan in enumerate(scans):
+        address = scan.get('address') if isinstance(scan, dict) else None
+        scanned_at = scan.get('scanned_at') if isinstance(scan, dict) else None
+        if not address or not isinstance(address, str):
+            results[position] = {"status": "rejected", "error": "Missing address"}
+        elif isinstance(scanned_at, bool) or not isinstance(scanned_at, (int, float)) or scanned_at > latest:
+            results[position] = {"status": "rejected", "error": "Invalid scanned_at"}
+        elif scanned_at < earliest:
+            results[position] = {"status": "rejected",
+                                 "error": f"scanned_at is older than the {MAX_OFFLINE_SECONDS} second offline window"}
+        else:
+            valid.append((scanned_at, position, address))
+
+    built = []  # (position, Transaction)
+    last_scan = {}  # address -> scanned_at of its last kept scan
+    rate_limit = blockchain.tx_rate_limit
+    for scanned_at, position, address in sorted(valid):
+        if address in last_scan and scanned_at - last_scan[address] < rate_limit:
+            results[position] = {"status": "rejected", "error": f"Repeat scan within {rate_limit} seconds"}
+            continue
+        last_scan[address] = scanned_at
+        built.append((position, Transaction(
+            timestamp_created=scanned_at,
+            station_address=station_id,
+            message_data="Check-in",
+            related_addresses=[address],
+            type_field="check_in",
+            priority_level=1,
+        )))
+
+    errors = blockchain.add_transactions([tx for _, tx in built], rate_limit_override=True)
+    for (position, tx), error in zip(built, errors):
+        results[position] = (
+            {"status": "rejected", "transaction_id": tx.transaction_id, "error": error} if error
+            else {"status": "accepted", "transaction_id": tx.transaction_id}
+        )
+
+    accepted = sum(1 for result in results if result['status'] == 'accepted')
+    logger.info(f"Station {station_id} uploaded {len(scans)} scans, {accepted} accepted")
+    return jsonify({
+        "station_id": station_id,
+        "accepted": accepted,
+        "rejected": len(results) - accepted,
+        "results": results,
+    }), 200
+
 # Authentication endpoint that returns private key for client-side decryption
 @app.route('/auth/unlock', methods=['POST'])
 def unlock_wallet_endpoint():
@@ -717,15 +1575,13 @@ def debug_wallet(family_id):
 
 @app.route('/debug/transactions')
 def debug_transactions():
-    all_transactions = []
-    for block in blockchain.chain:
-        for tx in block.transactions:
-            all_transactions.append(tx.to_dict())
-    return jsonify(all_transactions)
+    body = blockchain.block_cache.render_transactions(blockchain.chain)
+    return app.response_class(body, mimetype='application/json')
 
 @app.route('/debug/blockchain')
 def debug_blockchain():
-    return jsonify([block.to_dict() for block in blockchain.chain])
+    body = blockchain.block_cache.render_chain(blockchain.chain)
+    return app.response_class(body, mimetype='application/json')
 
 
 @app.route('/wallet/<family_id>/public-key')
@@ -747,5 +1603,83 @@ def get_wallet_public_key(family_id):
 
 
 
+@app.route('/debug/startup')
+def debug_startup():
+    """Startup profiling report: seconds spent per initialization phase in this process"""
+    return jsonify({
+        "import_seconds": IMPORT_SECONDS,
+        "blockchain_ready": _blockchain_instance is not None,
+        "phases": STARTUP_PROFILE,
+    })
+
+
+@app.route('/crises', methods=['GET'])
+def list_crises():
+    """Crises hosted by this process; chains not opened yet are listed without stats"""
+    _ensure_blockchain()
+    crises = []
+    for crisis_id in crisis_registry.crisis_ids():
+        chain = crisis_registry.chains.get(crisis_id)
+        entry = {"crisis_id": crisis_id, "loaded": chain is not None}
+        if chain is not None:
+            entry.update({
+                "name": chain.crisis_metadata['name'],
+                "organization": chain.crisis_metadata['organization'],
+                "block_height": chain.chain[-1].block_index if chain.chain else -1,
+                "pending_transactions": len(chain.pending_transactions),
+            })
+        crises.append(entry)
+    return jsonify({"primary": _blockchain_instance.crisis_metadata['id'], "crises": crises})
+
+
+@app.route('/admin/crises', methods=['POST'])
+@admin_required
+def create_crisis():
+    """Start hosting a new crisis chain, served under /crises/<crisis_id>/..."""
+    data = request.get_json(silent=True) or {}
+    try:
+        _ensure_blockchain()
+        chain = crisis_registry.create(
+            crisis_id=data['crisis_id'],
+            name=data['name'],
+            organization=data.get('organization', ''),
+            contact=data.get('contact', ''),
+            description=data.get('description', ''),
+            policy_settings=data.get('policy_settings', {}),
+        )
+        chain.start_miner()
+        return jsonify({"status": "success", "crisis_id": data['crisis_id']}), 201
+    except KeyError as e:
+        return jsonify({"error": f"Missing field: {str(e)}"}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Crisis creation error: {str(e)}")
+        return jsonify({"error": "Crisis creation failed"}), 500
+
+
+# Every chain-scoped route is also served per crisis under /crises/<crisis_id>
+PROCESS_WIDE_ENDPOINTS = {'static', 'metrics', 'debug_startup', 'list_crises', 'create_crisis'}
+for rule in list(app.url_map.iter_rules()):
+    if rule.endpoint not in PROCESS_WIDE_ENDPOINTS:
+        app.add_url_rule(f'/crises/<crisis_id>{rule.rule}', endpoint=rule.endpoint,
+                         view_func=app.view_functions[rule.endpoint], methods=rule.methods)
+
+
+def create_app(preload: bool = False):
+    """
+    Application factory for WSGI servers
+    - preload=True builds the blockchain immediately (use with gunicorn --preload so it
+      happens once in the master); the miner still starts lazily in each worker
+    """
+    if preload:
+        _ensure_blockchain()
+    return app
+
+
+IMPORT_SECONDS = round(time.perf_counter() - _IMPORT_STARTED, 4)
+
+
 if __name__ == '__main__':
+    create_app(preload=True)
     app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
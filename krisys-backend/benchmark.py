@@ -0,0 +1,506 @@
+# benchmark.py
+"""
+Reproducible, offline benchmarks for the chain core and the Flask API.
+
+    python benchmark.py core --sizes 1000,10000,100000 --output bench_results.json
+    python benchmark.py http --requests 2000 --concurrency 8 --output bench_results.json
+    python benchmark.py http --url http://localhost:5000       # against a running gunicorn
+    python benchmark.py startup --chain-size 10000 --repeat 3
+    python benchmark.py replication --chain-size 10000 --batch-size 200
+    python benchmark.py wallets --count 16 --workers 8
+    python benchmark.py compare old_results.json bench_results.json
+
+Everything runs in a throwaway directory (database + master key), with the background
+miner disabled so timings are not disturbed. Results are merged into one JSON file per
+run so two commits can be diffed with `compare`.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import logging
+import socket
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+import database
+from blockchain import Blockchain, Block, Transaction
+from chain_storage import TieredChain
+from replication import Follower
+import wallet_keys
+
+DEFAULT_SIZES = [1_000, 10_000]
+TXS_PER_BLOCK = 500     # bulk-built chains are split into blocks of this many transactions
+BENCH_SIGNATURE = "BENCHMARK"   # preset on bulk-built blocks so save_block skips RSA signing
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples, operations=None):
+    """Latency summary in milliseconds plus throughput"""
+    total = sum(samples)
+    return {
+        "runs": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 4),
+        "p50_ms": round(percentile(samples, 50) * 1000, 4),
+        "p99_ms": round(percentile(samples, 99) * 1000, 4),
+        "ops_per_s": round((operations or len(samples)) / total, 2) if total else None,
+    }
+
+
+def measure(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+@contextmanager
+def sandbox():
+    """Run inside a temporary directory with its own database and master key"""
+    cwd, db_path = os.getcwd(), database.DB_PATH
+    with tempfile.TemporaryDirectory(prefix="krisys-bench-") as tmp:
+        os.chdir(tmp)
+        database.DB_PATH = os.path.join(tmp, "blockchain.db")
+        try:
+            yield tmp
+        finally:
+            os.chdir(cwd)
+            database.DB_PATH = db_path
+
+
+def make_transaction(i, now=None):
+    return Transaction(
+        timestamp_created=(now or time.time()) + i * 1e-6,
+        station_address=f"station_{i % 50}",
+        message_data=f"Benchmark message {i} " + "x" * 200,
+        related_addresses=[f"bench{i % 1000:04d}-{i % 7:08x}"],
+        type_field="message",
+        priority_level=4,   # 'personal' in the default policy
+    )
+
+
+def build_chain(blockchain, tx_count, sign=False):
+    """
+    Append tx_count transactions to the chain in TXS_PER_BLOCK-sized blocks
+    - Pre-signed with BENCH_SIGNATURE unless sign (replicas verify real master-key signatures)
+    """
+    for start in range(0, tx_count, TXS_PER_BLOCK):
+        txs = [make_transaction(i) for i in range(start, min(start + TXS_PER_BLOCK, tx_count))]
+        last = blockchain.chain[-1]
+        block = Block(last.block_index + 1, time.time(), txs, last.hash,
+                      signature=None if sign else BENCH_SIGNATURE)
+        blockchain.chain.append(block)
+        blockchain.save_block(block)
+
+
+def bench_core(sizes, repeat):
+    results = {}
+    with sandbox():
+        for size in sizes:
+            database.DB_PATH = os.path.join(os.getcwd(), f"chain_{size}.db")
+            blockchain = Blockchain(start_miner=False)
+
+            build_start = time.perf_counter()
+            build_chain(blockchain, size)
+            build_seconds = time.perf_counter() - build_start
+
+            block = blockchain.chain[-1]
+            txs = [make_transaction(size + i) for i in range(repeat)]
+            pending = iter(txs)
+
+            def add_one():
+                blockchain.add_transaction(next(pending), rate_limit_override=True)
+
+            def save_one():
+                last = blockchain.chain[-1]
+                new = Block(last.block_index + 1, time.time(),
+                            [make_transaction(size * 2 + last.block_index)], last.hash,
+                            signature=BENCH_SIGNATURE)
+                blockchain.chain.append(new)
+                blockchain.save_block(new)
+
+            def load_once():
+                reloaded = Blockchain.__new__(Blockchain)
+                reloaded.chain = TieredChain(blockchain.chain.directory)
+                reloaded.db_path = blockchain.db_path
+                reloaded.load_chain()
+
+            target = txs[0].related_addresses[0]
+
+            def address_lookup():
+                return [tx for b in blockchain.chain.blocks_for_addresses([target]) for tx in b.transactions
+                        if target in tx.related_addresses]
+
+            results[str(size)] = {
+                "blocks": len(blockchain.chain),
+                "build_chain_s": round(build_seconds, 3),
+                "add_transaction": summarize(measure(add_one, repeat)),
+                "calculate_hash": summarize(measure(block.calculate_hash, repeat)),
+                "save_block": summarize(measure(save_one, max(1, repeat // 10))),
+                "sign_block": summarize(measure(lambda: blockchain.sign_block(block), max(1, repeat // 20))),
+                "load_chain": summarize(measure(load_once, 3)),
+                "address_lookup": summarize(measure(address_lookup, max(1, repeat // 10))),
+            }
+            print(f"core size={size}: {json.dumps(results[str(size)], indent=2)}")
+    return results
+
+
+HTTP_ENDPOINTS = [
+    ("GET", "/blockchain"),
+    ("GET", "/crisis"),
+    ("GET", "/policy"),
+    ("GET", "/address/{address}"),
+    ("POST", "/transaction"),
+]
+
+
+def http_payload(i):
+    return {
+        "timestamp_created": time.time() + i * 1e-6,
+        "station_address": f"load_{i}",
+        "message_data": f"Load test message {i}",
+        "related_addresses": ["bench0001-00000001"],
+        "type_field": "message",
+        "priority_level": 5,
+    }
+
+
+def _local_requester():
+    """Requests through app.test_client(), one client per thread"""
+    import app as app_module
+    local = threading.local()
+
+    def request(method, path, body):
+        if not hasattr(local, "client"):
+            local.client = app_module.app.test_client()
+        response = local.client.open(path, method=method, json=body,
+                                     headers={"X-Dev-Rate-Override": "true"})
+        return response.status_code
+    return request, app_module
+
+
+def _remote_requester(base_url):
+    def request(method, path, body):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(base_url.rstrip("/") + path, data=data, method=method, headers={
+            "Content-Type": "application/json",
+            "X-Dev-Rate-Override": "true",
+        })
+        try:
+            with urllib.request.urlopen(req) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+    return request
+
+
+def _run_load(request, requests_per_endpoint, concurrency):
+    results = {}
+    counter = iter(range(10 ** 9))
+    for method, template in HTTP_ENDPOINTS:
+        path = template.format(address="bench0001-00000001")
+
+        def one(_):
+            body = http_payload(next(counter)) if method == "POST" else None
+            start = time.perf_counter()
+            status = request(method, path, body)
+            return time.perf_counter() - start, status
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(one, range(requests_per_endpoint)))
+        wall = time.perf_counter() - wall_start
+
+        samples = [latency for latency, _ in outcomes]
+        summary = summarize(samples)
+        summary["req_per_s"] = round(len(samples) / wall, 2)
+        summary["errors"] = sum(1 for _, status in outcomes if status >= 500)
+        results[f"{method} {template}"] = summary
+        print(f"http {method} {template}: p50={summary['p50_ms']}ms p99={summary['p99_ms']}ms "
+              f"{summary['req_per_s']} req/s errors={summary['errors']}")
+    return results
+
+
+def bench_http(requests_per_endpoint, concurrency, chain_size, url=None):
+    if url:
+        return _run_load(_remote_requester(url), requests_per_endpoint, concurrency)
+
+    with sandbox():
+        request, app_module = _local_requester()
+        blockchain = Blockchain(app_module.policy_system, start_miner=False)
+        build_chain(blockchain, chain_size)
+        shared, app_module.blockchain = app_module.blockchain, blockchain
+        try:
+            return _run_load(request, requests_per_endpoint, concurrency)
+        finally:
+            app_module.blockchain = shared
+
+
+# Cold-start target: a fresh process (master key and database already on disk) must import
+# app.py and answer its first request within this many seconds for a 10k-transaction chain
+COLD_START_TARGET_SECONDS = 1.0
+
+STARTUP_SCRIPT = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+status = app.app.test_client().get('/crisis').status_code
+ready = time.perf_counter()
+print(json.dumps({"import_s": imported - started, "first_request_s": ready - imported,
+                  "status": status, "phases": app.STARTUP_PROFILE}))
+"""
+
+
+def bench_startup(chain_size, repeat):
+    """Time `import app` and the first request in fresh interpreter processes"""
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    with sandbox() as tmp:
+        build_chain(Blockchain(start_miner=False), chain_size)  # also creates the master key
+        env = dict(os.environ, BLOCKCHAIN_DB_PATH=database.DB_PATH,
+                   PYTHONPATH=os.pathsep.join(filter(None, [source_dir, os.environ.get("PYTHONPATH")])),
+                   KRISYS_LOG_LEVEL="WARNING")
+
+        runs = []
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=tmp, env=env,
+                                    capture_output=True, text=True, check=True).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    cold_start = [run["import_s"] + run["first_request_s"] for run in runs]
+    result = {
+        "chain_size": chain_size,
+        "import": summarize([run["import_s"] for run in runs]),
+        "first_request": summarize([run["first_request_s"] for run in runs]),
+        "cold_start": summarize(cold_start),
+        "phases": runs[-1]["phases"],
+        "target_s": COLD_START_TARGET_SECONDS,
+        "within_target": max(cold_start) <= COLD_START_TARGET_SECONDS,
+    }
+    print(f"startup chain_size={chain_size}: {json.dumps(result, indent=2)}")
+    return result
+
+
+PRIMARY_SCRIPT = """
+import sys
+import app
+app.create_app(preload=True).run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True)
+"""
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url, timeout=60):
+    deadline = time.time() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url, timeout=5):
+                return
+        except OSError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def bench_replication(chain_size, batch_size):
+    """
+    Two-process harness: a primary app.py serving a signed chain over HTTP, and a
+    follower in this process replicating it into its own database from scratch
+    """
+    source_dir = os.path.dirname(os.path.abspath(__file__))
+    with sandbox() as primary_dir:
+        build_chain(Blockchain(start_miner=False), chain_size, sign=True)
+        port = _free_port()
+        env = dict(os.environ, BLOCKCHAIN_DB_PATH=database.DB_PATH,
+                   PYTHONPATH=os.pathsep.join(filter(None, [source_dir, os.environ.get("PYTHONPATH")])),
+                   KRISYS_LOG_LEVEL="WARNING")
+        primary = subprocess.Popen([sys.executable, "-c", PRIMARY_SCRIPT, str(port)], cwd=primary_dir, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            _wait_for(base_url + "/blockchain/head")
+            with sandbox():
+                replica = Blockchain(start_miner=False, replica=True)
+                follower = Follower(replica, base_url, batch_size)
+                started = time.perf_counter()
+                applied = follower.sync_once()
+                elapsed = time.perf_counter() - started
+                transactions = sum(len(block.transactions) for block in replica.chain)
+        finally:
+            primary.terminate()
+            primary.wait()
+
+    result = {
+        "chain_size": chain_size,
+        "batch_size": batch_size,
+        "blocks": applied,
+        "seconds": round(elapsed, 4),
+        "blocks_per_s": round(applied / elapsed, 2),
+        "tx_per_s": round(transactions / elapsed, 2),
+    }
+    print(f"replication chain_size={chain_size}: {json.dumps(result, indent=2)}")
+    return result
+
+
+def bench_wallets(count, workers):
+    """
+    Wallets/minute for a registration drive: one create_wallet per family versus a
+    single create_wallets batch over a process pool of the given size (spawned and
+    warmed up before timing, as the server's shared pool would be)
+    """
+    families = [{"family_id": f"bench{i:07d}", "members": [{"name": "Member 1"}, {"name": "Member 2"}],
+                 "passphrase": "drive"} for i in range(count)]
+    with sandbox():
+        chain = Blockchain(start_miner=False)
+        started = time.perf_counter()
+        for family in families:
+            chain.wallets.create_wallet(family["family_id"], family["members"], "bench", family["passphrase"])
+        sequential = time.perf_counter() - started
+
+    with sandbox(), ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        list(pool.map(wallet_keys.wrap_with_master_key, ["warmup"] * workers, [chain.master_public_key] * workers))
+        chain = Blockchain(start_miner=False)
+        started = time.perf_counter()
+        created = sum(1 for _ in chain.wallets.create_wallets(families, "bench", pool=pool))
+        batched = time.perf_counter() - started
+
+    result = {
+        "count": count,
+        "workers": workers,
+        "cpu_count": os.cpu_count(),
+        "sequential_s": round(sequential, 3),
+        "batch_s": round(batched, 3),
+        "sequential_wallets_per_min": round(count / sequential * 60, 1),
+        "batch_wallets_per_min": round(created / batched * 60, 1),
+        "speedup": round(sequential / batched, 2),
+    }
+    print(f"wallets count={count} workers={workers}: {json.dumps(result, indent=2)}")
+    return result
+
+
+def run_metadata(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.time(),
+        "args": {k: v for k, v in vars(args).items() if k != "func"},
+    }
+
+
+def write_results(path, section, data, args):
+    results = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            results = json.load(f)
+    results["meta"] = run_metadata(args)
+    results[section] = data
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f"Wrote {section} results to {path}")
+
+
+def compare(old_path, new_path):
+    """Print the relative change of every latency/throughput figure between two result files"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    def walk(a, b, prefix=""):
+        for key in sorted(set(a) & set(b)):
+            if key == "meta":
+                continue
+            if isinstance(a[key], dict) and isinstance(b[key], dict):
+                walk(a[key], b[key], f"{prefix}{key}.")
+            elif isinstance(a[key], (int, float)) and isinstance(b[key], (int, float)) and a[key]:
+                change = (b[key] - a[key]) / a[key] * 100
+                print(f"{prefix}{key:<12} {a[key]:>12} -> {b[key]:>12}  ({change:+.1f}%)")
+
+    walk(old, new)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KriSYS benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    core = sub.add_parser("core", help="micro-benchmarks for the chain core")
+    core.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                      help="comma separated chain sizes in transactions (e.g. 1000,100000,1000000)")
+    core.add_argument("--repeat", type=int, default=200)
+    core.add_argument("--output", default="bench_results.json")
+
+    http = sub.add_parser("http", help="HTTP load generator")
+    http.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    http.add_argument("--concurrency", type=int, default=8)
+    http.add_argument("--chain-size", type=int, default=1000)
+    http.add_argument("--url", help="base URL of a running server (default: in-process test client)")
+    http.add_argument("--output", default="bench_results.json")
+
+    startup = sub.add_parser("startup", help="cold-start time of app.py against COLD_START_TARGET_SECONDS")
+    startup.add_argument("--chain-size", type=int, default=10_000)
+    startup.add_argument("--repeat", type=int, default=3)
+    startup.add_argument("--output", default="bench_results.json")
+
+    replication = sub.add_parser("replication", help="follower catch-up throughput against a primary process")
+    replication.add_argument("--chain-size", type=int, default=10_000)
+    replication.add_argument("--batch-size", type=int, default=200)
+    replication.add_argument("--output", default="bench_results.json")
+
+    wallets = sub.add_parser("wallets", help="bulk wallet creation throughput, sequential vs process pool")
+    wallets.add_argument("--count", type=int, default=16)
+    wallets.add_argument("--workers", type=int, default=wallet_keys.KEYGEN_WORKERS)
+    wallets.add_argument("--output", default="bench_results.json")
+
+    cmp_parser = sub.add_parser("compare", help="diff two results files")
+    cmp_parser.add_argument("old")
+    cmp_parser.add_argument("new")
+
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.WARNING)   # keep per-transaction INFO logs out of the timings
+    if args.command == "core":
+        sizes = [int(size) for size in args.sizes.split(",")]
+        write_results(args.output, "core", bench_core(sizes, args.repeat), args)
+    elif args.command == "http":
+        data = bench_http(args.requests, args.concurrency, args.chain_size, args.url)
+        write_results(args.output, "http", data, args)
+    elif args.command == "startup":
+        write_results(args.output, "startup", bench_startup(args.chain_size, args.repeat), args)
+    elif args.command == "replication":
+        write_results(args.output, "replication", bench_replication(args.chain_size, args.batch_size), args)
+    elif args.command == "wallets":
+        write_results(args.output, "wallets", bench_wallets(args.count, args.workers), args)
+    else:
+        compare(args.old, args.new)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
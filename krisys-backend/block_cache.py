@@ -0,0 +1,152 @@
+# block_cache.py
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+import logging
+from compression import SEGMENTED_ENCODINGS, compress_segment, join_segments, render_json
+
+logger = logging.getLogger(__name__)
+
+
+class CachedBlock:
+    """
+    Immutable serialized form of one mined block
+    - raw: JSON bytes exactly as jsonify(block.to_dict()) would render them (minus newline)
+    - tx_spans: (start, end) offsets of each transaction's JSON inside raw, so
+      transaction listings reuse the same buffer without copying
+    - segments: precompressed pieces per content-coding (see compression.compress_segment)
+    """
+    __slots__ = ('raw', 'tx_spans', 'segments')
+
+    def __init__(self, raw: bytes, tx_spans: list):
+        self.raw = raw
+        self.tx_spans = tx_spans
+        self.segments = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.raw) + sum(len(segment) for segment in self.segments.values())
+
+    def transactions(self) -> list:
+        view = memoryview(self.raw)
+        return [view[start:end] for start, end in self.tx_spans]
+
+
+def serialize_block(block) -> CachedBlock:
+    """
+    Render a block to JSON once, recording where each transaction sits
+    - With sorted keys 'transactions' is the last field of a block, so the block is
+      its header object with the transaction array spliced in before the closing brace
+    """
+    header = block.to_dict()
+    del header['transactions']
+    prefix = render_json(header)[:-1] + b',"transactions":['
+
+    parts, spans, offset = [prefix], [], len(prefix)
+    for position, tx in enumerate(block.transactions):
+        if position:
+            parts.append(b',')
+            offset += 1
+        tx_json = render_json(tx.to_dict())
+        parts.append(tx_json)
+        spans.append((offset, offset + len(tx_json)))
+        offset += len(tx_json)
+    parts.append(b']}')
+    return CachedBlock(b''.join(parts), spans)
+
+
+class BlockCache:
+    """
+    Bounded byte cache of pre-serialized blocks keyed by block hash
+    - store() is called from save_block, so a block is rendered (and precompressed
+      for the segmentable encodings) exactly once, off the request path
+    - Blocks evicted under max_bytes are re-rendered from the in-memory chain on demand
+    - Chain responses are then just concatenations of cached buffers
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024,
+                 precompress: Iterable[str] = SEGMENTED_ENCODINGS):
+        self.max_bytes = max_bytes
+        self.precompress = tuple(precompress)
+        self.entries = OrderedDict()    # block hash -> CachedBlock
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _insert(self, block_hash: str, cached: CachedBlock):
+        previous = self.entries.pop(block_hash, None)
+        if previous is not None:
+            self.current_bytes -= previous.size
+        self.entries[block_hash] = cached
+        self.current_bytes += cached.size
+        self._evict()
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.current_bytes -= evicted.size
+
+    def store(self, block) -> CachedBlock:
+        """Serialize and precompress a freshly saved block"""
+        cached = serialize_block(block)
+        for encoding in self.precompress:
+            cached.segments[encoding] = compress_segment(cached.raw, encoding)
+        with self.lock:
+            self._insert(block.hash, cached)
+        return cached
+
+    def get(self, block, encoding: Optional[str] = None) -> CachedBlock:
+        """Cached form of a block, rendering it (and the requested segment) on a miss"""
+        with self.lock:
+            cached = self.entries.get(block.hash)
+            if cached is not None:
+                self.entries.move_to_end(block.hash)
+                if not encoding or encoding in cached.segments:
+                    self.hits += 1
+                    return cached
+            self.misses += 1
+
+        # Render and compress outside the lock; entries are only changed (and their
+        # size accounted) under it, so current_bytes always matches the cached bytes
+        rendered = cached or serialize_block(block)
+        segment = compress_segment(rendered.raw, encoding) if encoding else None
+        with self.lock:
+            current = self.entries.get(block.hash)
+            if current is None:
+                current = CachedBlock(rendered.raw, rendered.tx_spans)
+                current.segments.update(rendered.segments)
+                if segment is not None:
+                    current.segments[encoding] = segment
+                self._insert(block.hash, current)
+            elif segment is not None and encoding not in current.segments:
+                current.segments[encoding] = segment
+                self.current_bytes += len(segment)
+                self._evict()
+        return current
+
+    def render_chain(self, blocks, encoding: Optional[str] = None) -> bytes:
+        """
+        Build the /blockchain body (a JSON array of blocks plus jsonify's trailing newline)
+        from cached per-block pieces, compressing only the separators per request
+        """
+        if not encoding:
+            return b'[' + b','.join(self.get(block).raw for block in blocks) + b']\n'
+
+        separators = {
+            piece: (piece, compress_segment(piece, encoding))
+            for piece in (b'[', b',', b']\n')
+        }
+        pieces = [separators[b'[']]
+        for position, block in enumerate(blocks):
+            if position:
+                pieces.append(separators[b','])
+            cached = self.get(block, encoding)
+            pieces.append((cached.raw, cached.segments[encoding]))
+        pieces.append(separators[b']\n'])
+        return join_segments(pieces, encoding)
+
+    def render_transactions(self, blocks) -> bytes:
+        """Build a flat JSON array of every transaction in blocks from cached buffers"""
+        return b'[' + b','.join(
+            tx for block in blocks for tx in self.get(block).transactions()
+        ) + b']\n'
@@ -1,6 +1,7 @@
 # blockchain.py
 import hashlib
 import json
+import math
 import time
 from datetime import datetime, timedelta
 import os
@@ -8,12 +9,21 @@ import pgpy
 from pgpy.constants import PubKeyAlgorithm, KeyFlags, HashAlgorithm, SymmetricKeyAlgorithm
 import threading
 import secrets
+from collections import deque
+from concurrent.futures import as_completed
 from typing import List, Dict, Optional
+import database
 from database import init_db, db_connection
+from chain_storage import TieredChain
+import wallet_keys
+from events import EventFeed
+from block_cache import BlockCache
+from metrics import BLOCK_PHASE_LATENCY, PGP_LATENCY, TX_ADMISSION_LATENCY, TX_ADMITTED
 import logging
+from logging_config import apply_log_levels, configure_logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (asynchronous queue pipeline, levels from KRISYS_LOG_* env vars)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # DEV NOTE: POLICY will define many parameters to be tailored by the crisis management host and blockchain maintainer, things like class priority of transactions (org, user, warnings, alert, etc)
@@ -33,6 +43,87 @@ logger = logging.getLogger(__name__)
 
 # PRODUCTION: Implement proper session storage for private keys
 
+DUPLICATE_TX_ERROR = "Duplicate transaction ID"
+MEMPOOL_FULL_ERROR = "Mempool is saturated"
+
+# Mempool admission control: at a high watermark only essential traffic is admitted until
+# the next block (a block takes the whole mempool, so there is no separate low watermark)
+MEMPOOL_HIGH_COUNT = int(os.getenv('KRISYS_MEMPOOL_HIGH_COUNT', 50_000))
+MEMPOOL_HIGH_BYTES = int(os.getenv('KRISYS_MEMPOOL_HIGH_BYTES', 64 * 1024 * 1024))
+MINING_RATE_WINDOW = 20     # recent blocks the measured mining rate is averaged over
+ESSENTIAL_TYPES = frozenset({'alert', 'check_in'})
+ESSENTIAL_CATEGORIES = ('evacuation', 'medical')    # policy priority_levels keys admitted under pressure
+
+
+class DuplicateTransactionError(ValueError):
+    """The transaction (same content-addressed ID) is already pending or mined"""
+
+
+class MempoolFullError(ValueError):
+    """Non-essential transaction refused while the mempool is above its high watermark"""
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def alert_summary(transaction, pending: bool) -> Dict:
+    """Compact client-facing form of an alert transaction"""
+    return {
+        "transaction_id": transaction.transaction_id,
+        "timestamp": transaction.timestamp_created,
+        "priority_level": transaction.priority_level,
+        "station_address": transaction.station_address,
+        "message": transaction.message_data,
+        "pending": pending,
+    }
+
+# Compiled, read-only form of one policy's validation rules
+class PolicyValidator:
+    """
+    Built once when a policy is created, so validating a transaction is a handful of
+    constant-time checks (frozenset membership, integer compares) plus one size measurement
+    - Immutable: a policy change swaps in a new validator rather than editing this one
+    """
+    __slots__ = ('policy_id', 'types', 'priorities', 'size_limit', 'rate_limit', 'block_interval',
+                 'essential_priorities')
+
+    def __init__(self, policy_id: str, settings: dict):
+        for name, value in (
+            ('policy_id', policy_id),
+            ('types', frozenset(settings['types'])),
+            ('priorities', frozenset(settings['priority_levels'].values())),
+            ('size_limit', settings['size_limit']),
+            ('rate_limit', settings['rate_limit']),
+            ('block_interval', settings['block_interval']),
+            ('essential_priorities', frozenset({1}) | frozenset(
+                settings['priority_levels'][category] for category in ESSENTIAL_CATEGORIES
+                if category in settings['priority_levels'])),
+        ):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PolicyValidator is immutable")
+
+    def validate(self, transaction) -> int:
+        """Raise ValueError if the transaction breaks the policy, otherwise return its serialized size"""
+        # Type validation
+        if transaction.type_field not in self.types:
+            raise ValueError(f"Invalid transaction type: {transaction.type_field}")
+
+        # Priority validation
+        if transaction.priority_level not in self.priorities:
+            raise ValueError(f"Invalid priority level: {transaction.priority_level}")
+
+        # Size validation (the only per-transaction serialization)
+        tx_size = len(json.dumps(transaction.to_dict()))
+        if tx_size > self.size_limit:
+            raise ValueError(f"Transaction exceeds size limit ({tx_size}/{self.size_limit} bytes)")
+        return tx_size
+
+    def is_essential(self, transaction) -> bool:
+        """Admitted even when the mempool is saturated (alerts, check-ins, life-safety priorities)"""
+        return transaction.type_field in ESSENTIAL_TYPES or transaction.priority_level in self.essential_priorities
+
 # Policy system for setting up a new KriSYS blockchain
 class PolicySystem:
     # Required policy fields with default values
@@ -49,10 +140,138 @@ class PolicySystem:
         'types': ['check_in', 'message', 'alert']
     }
     
+    # Seconds between checks of the persisted policy version (bounds how stale a worker can be)
+    POLICY_RELOAD_INTERVAL = 5
+    
     def __init__(self):
         self.policies = {}
-        self.current_policy = "default"
+        self.validators = {}    # policy_id -> PolicyValidator, compiled when the policy is created
+        self.version = 0    # Bumped on every policy change, used for /policy ETags
+        self._current_policy = "default"
         self._create_default_policy()   
+        self.validator = self.validators['default']  # Active validator, swapped as a single reference
+        self.persistent = False     # Set by attach_storage() once the database exists
+        self.db_path = None     # Database of the chain this policy system belongs to
+        self._last_reload_check = 0.0
+        self._reload_lock = threading.Lock()
+
+    @property
+    def current_policy(self):
+        return self._current_policy
+
+    @current_policy.setter
+    def current_policy(self, policy_id):
+        self._current_policy = policy_id
+        self.validator = self.validators.get(policy_id, self.validators['default'])
+        self.version += 1
+        if self.persistent:
+            with db_connection(path=self.db_path) as conn:
+                conn.execute(
+                    'UPDATE policy_state SET current_policy = ?, version = version + 1, updated_at = ? WHERE id = 1',
+                    (policy_id, time.time())
+                )
+                self.version = conn.execute('SELECT version FROM policy_state WHERE id = 1').fetchone()['version']
+                conn.commit()
+        self._log_policy_change()
+
+    def attach_storage(self, db_path: Optional[str] = None):
+        """
+        Persist policies in the crises table and follow changes made by other workers
+        - Policies created before the database existed (e.g. at app import) are written only if
+          not stored yet, so edits made through the API survive restarts
+        - The stored active policy wins over the in-memory one
+        """
+        self.db_path = db_path or database.DB_PATH
+        with db_connection(path=self.db_path) as conn:
+            stored = {row['id'] for row in conn.execute('SELECT id FROM crises WHERE policy IS NOT NULL')}
+            for policy_id, policy in self.policies.items():
+                if policy_id not in stored:
+                    self._write_policy(conn, policy)
+            conn.execute(
+                'INSERT OR IGNORE INTO policy_state (id, current_policy, version, updated_at) VALUES (1, ?, 1, ?)',
+                (self._current_policy, time.time())
+            )
+            conn.commit()
+        self.persistent = True
+        self.reload(force=True)
+
+    @staticmethod
+    def _write_policy(conn, policy):
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO crises (id, name, organization, contact, description, created_at, policy)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (policy['id'], policy['name'], policy['organization'], policy['contact'],
+             policy['description'], policy['created_at'], json.dumps(policy['policy']))
+        )
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Pick up policy changes persisted by any worker
+        - Cheap enough to call on every request: at most one single-row version lookup
+          per POLICY_RELOAD_INTERVAL, and a full reload only when the version moved
+        - Policies, validators and the active validator are rebuilt aside and swapped in,
+          so readers never see a half-applied policy
+        - Returns True if a new version was loaded
+        """
+        if not self.persistent:
+            return False
+        now = time.monotonic()
+        if not force and now - self._last_reload_check < self.POLICY_RELOAD_INTERVAL:
+            return False
+        if not self._reload_lock.acquire(blocking=force):
+            return False    # another thread is already checking
+        try:
+            self._last_reload_check = now
+            with db_connection(path=self.db_path) as conn:
+                state = conn.execute('SELECT current_policy, version FROM policy_state WHERE id = 1').fetchone()
+                if state is None or (not force and state['version'] == self.version):
+                    return False
+                rows = conn.execute('SELECT * FROM crises WHERE policy IS NOT NULL').fetchall()
+
+            policies, validators = {'default': self.policies['default']}, {'default': self.validators['default']}
+            for row in rows:
+                settings = self.REQUIRED_POLICY_FIELDS.copy()
+                settings.update(json.loads(row['policy']))
+                policies[row['id']] = {
+                    "name": row['name'],
+                    "id": row['id'],
+                    "organization": row['organization'],
+                    "contact": row['contact'],
+                    "description": row['description'],
+                    "policy": settings,
+                    "created_at": row['created_at'],
+                }
+                validators[row['id']] = PolicyValidator(row['id'], settings)
+
+            self.policies = policies
+            self.validators = validators
+            self._current_policy = state['current_policy']
+            self.validator = validators.get(state['current_policy'], validators['default'])
+            self.version = state['version']
+        finally:
+            self._reload_lock.release()
+        self._log_policy_change()
+        return True
+
+    def _log_policy_change(self):
+        """One structured event per policy activation (replaces dumping the policy on every transaction)"""
+        policy = self.get_policy()
+        settings = policy['policy']
+        apply_log_levels(settings.get('log_levels'))
+        logger.info(
+            f"Policy activated: {policy['id']} ({policy['name']}, {policy['organization']})",
+            extra={
+                "event": "policy_change",
+                "policy_id": policy['id'],
+                "policy_version": self.version,
+                "block_interval": settings['block_interval'],
+                "size_limit": settings['size_limit'],
+                "rate_limit": settings['rate_limit'],
+                "types": list(settings['types']),
+            },
+        )
 
     def _create_default_policy(self):
         """Create a base default policy"""
@@ -65,6 +284,7 @@ class PolicySystem:
             'description': "Standard policy for crisis response",
             'policy': self.REQUIRED_POLICY_FIELDS,
         }
+        self.validators['default'] = PolicyValidator('default', self.REQUIRED_POLICY_FIELDS)
     
     def create_crisis_policy(self, 
         name: str, organization: str, 
@@ -101,36 +321,32 @@ class PolicySystem:
             "created_at": datetime.now().isoformat(),
         }
         
-        # Store the policy in the system
+        # Store the policy in the system, compiled for validation
+        validator = PolicyValidator(policy_id, full_policy)
         self.policies[policy_id] = policy_data
+        self.validators[policy_id] = validator
+        if policy_id == self._current_policy:
+            self.validator = validator
+        self.version += 1
+        
+        # Persist and bump the shared version so other workers reload it
+        if self.persistent:
+            with db_connection(path=self.db_path) as conn:
+                self._write_policy(conn, policy_data)
+                conn.execute('UPDATE policy_state SET version = version + 1, updated_at = ? WHERE id = 1', (time.time(),))
+                self.version = conn.execute('SELECT version FROM policy_state WHERE id = 1').fetchone()['version']
+                conn.commit()
         
         return policy_id
         
     
     def get_policy(self, name=None):
         policy_id = name or self.current_policy
-        policy = self.policies.get(policy_id, self.policies['default'])
-        policy['id'] = policy_id
-        return policy
+        return self.policies.get(policy_id, self.policies['default'])
     
-    def validate_transaction(self, transaction):
-        policy = self.get_policy()['policy']
-        
-        # Type validation
-        if transaction.type_field not in policy['types']:
-            raise ValueError(f"Invalid transaction type: {transaction.type_field}")
-        
-        # Size validation
-        tx_size = len(json.dumps(transaction.to_dict()))
-        if tx_size > policy['size_limit']:
-            raise ValueError(f"Transaction exceeds size limit ({tx_size}/{policy['size_limit']} bytes)")
-        
-        # Priority validation
-        valid_priorities = policy['priority_levels'].values()
-        if transaction.priority_level not in valid_priorities:
-            raise ValueError(f"Invalid priority level: {transaction.priority_level}")
-        
-        return True
+    def validate_transaction(self, transaction) -> int:
+        """Validate against the active policy, returns the transaction's serialized size"""
+        return self.validator.validate(transaction)
 
 class Transaction:
     def __init__(
@@ -154,7 +370,6 @@ class Transaction:
         - priority_level: From 1 (highest) to 5 (lowest)
         """
         
-        self.transaction_id = transaction_id or self.generate_id(timestamp_created, station_address)
         self.timestamp_created = timestamp_created
         self.timestamp_posted = timestamp_posted or time.time()
         self.station_address = station_address
@@ -164,10 +379,31 @@ class Transaction:
         self.posted_id = posted_id
         self.type_field = type_field
         self.priority_level = priority_level
+        self.transaction_id = transaction_id or self.generate_id()
 
-    @staticmethod
-    def generate_id(timestamp: float, address: str) -> str:
-        return hashlib.sha256(f"{timestamp}{address}".encode()).hexdigest()
+    def generate_id(self, recipient_id: str = "") -> str:
+        """
+        Content-addressed ID: sha256 of the canonical client-supplied body
+        - Two transactions differing in any field (e.g. the wallet checked in) never collide
+        - A client retrying the same body gets the same ID, so the retry is caught as a duplicate
+        - timestamp_posted is set by the server on receipt and is deliberately excluded
+        - Messages the server encrypts (randomized) are hashed before encryption, with their
+          recipient wallet, and the ID carried over to the encrypted transaction
+        """
+        fields = {
+            "timestamp_created": self.timestamp_created,
+            "station_address": self.station_address,
+            "message_data": self.message_data,
+            "related_addresses": self.related_addresses,
+            "type_field": self.type_field,
+            "priority_level": self.priority_level,
+            "relay_hash": self.relay_hash,
+            "posted_id": self.posted_id,
+        }
+        if recipient_id:
+            fields["recipient_id"] = recipient_id
+        body = json.dumps(fields, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(body.encode()).hexdigest()
 
     def to_dict(self) -> Dict:
         return {
@@ -229,6 +465,32 @@ class Block:
             "nonce": self.nonce,
             "signature": self.signature,
         }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Block":
+        """Rebuild a block from to_dict() output, keeping its stored hash"""
+        block = cls(
+            block_index=data['block_index'],
+            timestamp=data['timestamp'],
+            transactions=[Transaction(**tx) for tx in data['transactions']],
+            previous_hash=data['previous_hash'],
+            nonce=data['nonce'],
+            signature=data['signature'],
+        )
+        block.hash = data['hash']
+        return block
+
+    def signing_header(self) -> str:
+        """Canonical JSON the master key signs (see Blockchain.sign_block)"""
+        return json.dumps(
+            {
+                "block_index": self.block_index,
+                "previous_hash": self.previous_hash,
+                "hash": self.hash,
+            },
+            sort_keys=True,
+            separators=(',', ':'),  # match JSON.stringify (no spaces)
+        )
         
 class Wallet:
     def __init__(self, family_id, crisis_id):
@@ -307,32 +569,69 @@ class WalletManager:
         master_encrypted_private_key = self.encrypt_with_master_key(user_encrypted_private_key)
         
         # Save wallet data and keys to database
-        with db_connection() as conn:
-            # Save lean wallet data
-            serializable_members = [{
-                "id": m["id"],
-                "name": m["name"],
-                "address": m["address"]
-            } for m in wallet.members]
-            
-            conn.execute(
+        self._store_wallets([(wallet, master_encrypted_private_key, public_key)])
+        logger.info(f"Created wallet {family_id} with {len(wallet.members)} members")
+        return wallet
+
+    def create_wallets(self, families, crisis_id, pool=None):
+        """
+        Bulk creation for registration drives
+        - families: [{"family_id": ..., "members": [{"name": ...}], "passphrase": ...}]
+        - Keygen, passphrase protection and master-key wrapping fan out over a process
+          pool (wallet_keys.keygen_pool); yields (position, Wallet) as each one completes
+        - Every row is inserted in one transaction once the last key is ready, so the
+          database write lock is held for milliseconds, not for the keygens. Nothing is
+          stored if the caller stops consuming early
+        """
+        pool = pool or wallet_keys.keygen_pool()
+        futures = {}
+        for position, family in enumerate(families):
+            wallet = Wallet(family['family_id'], crisis_id)
+            for member in family['members']:
+                wallet.add_member(member['name'])
+            future = pool.submit(wallet_keys.generate_wallet_keys, family.get('passphrase', ''),
+                                 self.blockchain.master_public_key)
+            futures[future] = (position, wallet)
+
+        completed = []
+        try:
+            for future in as_completed(futures):
+                position, wallet = futures[future]
+                wrapped_private_key, public_key = future.result()
+                completed.append((wallet, wrapped_private_key, public_key))
+                yield position, wallet
+        finally:
+            if len(completed) < len(futures):
+                for future in futures:
+                    future.cancel()
+
+        self._store_wallets(completed)
+        logger.info(f"Created {len(completed)} wallets in one batch")
+
+    def _store_wallets(self, wallets):
+        """Insert (wallet, wrapped private key, public key) rows in a single transaction"""
+        with db_connection(path=self.blockchain.db_path) as conn:
+            # Members live in wallet_members; the legacy JSON columns are left empty
+            conn.executemany(
                 "INSERT INTO wallets (family_id, crisis_id, members, devices) VALUES (?, ?, ?, ?)",
-                (family_id, crisis_id, json.dumps(serializable_members), json.dumps([]))
+                [(wallet.family_id, wallet.crisis_id, json.dumps([]), json.dumps([])) for wallet, _, _ in wallets]
+            )
+            conn.executemany(
+                "INSERT INTO wallet_members (family_id, position, member_id, name, address) VALUES (?, ?, ?, ?, ?)",
+                [(wallet.family_id, position, m["id"], m["name"], m["address"])
+                 for wallet, _, _ in wallets for position, m in enumerate(wallet.members)]
             )
             
             # Save keys separately
-            conn.execute(
+            conn.executemany(
                 "INSERT INTO wallet_keys (family_id, encrypted_private_key, public_key) VALUES (?, ?, ?)",
-                # "INSERT INTO wallet_keys (family_id, encrypted_private_key, public_key) VALUES (?, ?, ?)",
-                (family_id, master_encrypted_private_key, public_key)
+                [(wallet.family_id, wrapped, public_key) for wallet, wrapped, public_key in wallets]
             )
             
             conn.commit()
         
         # Cache in memory
-        self.wallets[family_id] = wallet
-        logger.info(f"Created wallet {family_id} with {len(wallet.members)} members")
-        return wallet
+        self.wallets.update((wallet.family_id, wallet) for wallet, _, _ in wallets)
 
 
     def encrypt_with_master_key(self, data):
@@ -342,8 +641,9 @@ class WalletManager:
         pub_key.parse(self.blockchain.master_public_key)
         
         # Encrypt the data from the user for obfuscation of direct messages
-        message = pgpy.PGPMessage.new(data)
-        return str(pub_key.encrypt(message))
+        with PGP_LATENCY.labels(operation='encrypt').time():
+            message = pgpy.PGPMessage.new(data)
+            return str(pub_key.encrypt(message))
 
 
     def authenticate_and_get_private_key(self, family_id, passphrase):
@@ -353,7 +653,7 @@ class WalletManager:
         2. Decrypt with master private key
         3. Decrypt with user passphrase
         """
-        with db_connection() as conn:
+        with db_connection(path=self.blockchain.db_path) as conn:
             cursor = conn.execute(
                 "SELECT encrypted_private_key FROM wallet_keys WHERE family_id = ?",
                 (family_id,)
@@ -379,43 +679,77 @@ class WalletManager:
 
         
     def get_wallet(self, family_id):
+        return self.get_wallets([family_id]).get(family_id)
+
+    def get_wallets(self, family_ids) -> Dict[str, Wallet]:
+        """
+        Batched fetch: family_id -> Wallet for the ids that exist
+        - Cached wallets are served from memory; the rest are assembled with one
+          indexed query per table (wallets, wallet_members, wallet_devices)
+        """
         # First check in-memory cache
-        if family_id in self.wallets:
-            return self.wallets[family_id]
-                
+        found = {fid: self.wallets[fid] for fid in family_ids if fid in self.wallets}
+        missing = [fid for fid in dict.fromkeys(family_ids) if fid not in found]
+        if not missing:
+            return found
+
         # Then check database
-        with db_connection() as conn:
-            cursor = conn.execute(
-                "SELECT * FROM wallets WHERE family_id = ?",
-                (family_id,)
+        placeholders = ','.join('?' * len(missing))
+        with db_connection(path=self.blockchain.db_path) as conn:
+            loaded = {
+                row['family_id']: Wallet(row['family_id'], row['crisis_id'])
+                for row in conn.execute(
+                    f"SELECT family_id, crisis_id FROM wallets WHERE family_id IN ({placeholders})", missing
+                )
+            }
+            for row in conn.execute(
+                f"SELECT family_id, member_id, name, address FROM wallet_members "
+                f"WHERE family_id IN ({placeholders}) ORDER BY family_id, position", missing
+            ):
+                loaded[row['family_id']].members.append(
+                    {"id": row['member_id'], "name": row['name'], "address": row['address']}
+                )
+            for row in conn.execute(
+                f"SELECT family_id, device_id, public_key, registered_at FROM wallet_devices "
+                f"WHERE family_id IN ({placeholders}) ORDER BY registered_at", missing
+            ):
+                loaded[row['family_id']].devices.append(
+                    {"device_id": row['device_id'], "public_key": row['public_key'],
+                     "registered_at": row['registered_at']}
+                )
+
+        # Add to cache
+        self.wallets.update(loaded)
+        found.update(loaded)
+        return found
+
+    def wallet_for_address(self, address) -> Optional[str]:
+        """Family ID owning a member address (reverse index), or None"""
+        with db_connection(path=self.blockchain.db_path) as conn:
+            row = conn.execute("SELECT family_id FROM wallet_members WHERE address = ?", (address,)).fetchone()
+        return row['family_id'] if row else None
+
+    def add_device_to_wallet(self, family_id, device_id, public_key_str):
+        """Register (or re-key) a device for a wallet and persist it, returns the device"""
+        wallet = self.get_wallet(family_id)
+        if wallet is None:
+            raise ValueError(f"Wallet {family_id} not found")
+
+        with db_connection(path=self.blockchain.db_path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO wallet_devices (family_id, device_id, public_key, registered_at) VALUES (?, ?, ?, ?)",
+                (family_id, device_id, public_key_str, time.time())
             )
-            row = cursor.fetchone()
-            
-            if row:
-                # Convert Row to dictionary
-                columns = [col[0] for col in cursor.description]
-                row_dict = dict(zip(columns, row))
-                
-                # Reconstruct wallet from database
-                wallet = Wallet(row_dict['family_id'], row_dict['crisis_id'])
-                wallet.members = json.loads(row_dict['members'])
-                
-                # Handle devices if present
-                if 'devices' in row_dict and row_dict['devices']:
-                    wallet.devices = json.loads(row_dict['devices'])
-                else:
-                    wallet.devices = []
-                
-                # Add to cache
-                self.wallets[family_id] = wallet
-                return wallet
-        
-        return None
+            conn.commit()
+
+        wallet.devices = [d for d in wallet.devices if d['device_id'] != device_id]
+        wallet.register_device(device_id, public_key_str)
+        logger.info(f"Registered device {device_id} for wallet {family_id}")
+        return wallet.devices[-1]
     
-    # To obfuscate p2p messages, recipient's public_key is retrieved to encryt message prior to posting to blockchain
     def get_wallet_public_key(self, family_id):
         """Get public key for encrypting messages to this wallet"""
-        with db_connection() as conn:
+        with db_connection(path=self.blockchain.db_path) as conn:
             cursor = conn.execute(
                 "SELECT public_key FROM wallet_keys WHERE family_id = ?",
                 (family_id,)
@@ -426,7 +760,77 @@ class WalletManager:
                 return row['public_key']
         return None
 
-    
+    def wallet_range(self, after, devices_since, limit):
+        """
+        Public wallet rows after a wallet id cursor, plus devices registered since a timestamp
+        - Private keys are never included; more is True when either page came back full
+        """
+        with db_connection(path=self.blockchain.db_path) as conn:
+            wallets = {
+                row['family_id']: {"id": row['id'], "family_id": row['family_id'], "crisis_id": row['crisis_id'],
+                                   "created_at": row['created_at'], "public_key": row['public_key'], "members": []}
+                for row in conn.execute(
+                    "SELECT w.id, w.family_id, w.crisis_id, w.created_at, k.public_key FROM wallets w "
+                    "JOIN wallet_keys k ON k.family_id = w.family_id WHERE w.id > ? ORDER BY w.id LIMIT ?",
+                    (after, limit)
+                )
+            }
+            if wallets:
+                placeholders = ','.join('?' * len(wallets))
+                for row in conn.execute(
+                    f"SELECT family_id, member_id, name, address FROM wallet_members "
+                    f"WHERE family_id IN ({placeholders}) ORDER BY family_id, position", list(wallets)
+                ):
+                    wallets[row['family_id']]['members'].append(
+                        {"id": row['member_id'], "name": row['name'], "address": row['address']}
+                    )
+            devices = [dict(row) for row in conn.execute(
+                "SELECT family_id, device_id, public_key, registered_at FROM wallet_devices "
+                "WHERE registered_at > ? ORDER BY registered_at LIMIT ?", (devices_since, limit)
+            )]
+        return {"wallets": list(wallets.values()), "devices": devices,
+                "more": len(wallets) == limit or len(devices) == limit}
+
+    def replication_cursor(self):
+        """(last wallet id, last device registered_at) already copied from the primary"""
+        with db_connection(path=self.blockchain.db_path) as conn:
+            row = conn.execute(
+                "SELECT (SELECT COALESCE(MAX(id), 0) FROM wallets) AS after, "
+                "(SELECT COALESCE(MAX(registered_at), 0) FROM wallet_devices) AS devices_since"
+            ).fetchone()
+        return row['after'], row['devices_since']
+
+    def apply_replicated_wallets(self, wallets, devices):
+        """
+        Store wallet rows served by a primary's /replication/wallets (replicas only)
+        - Wallet ids are kept so the replica's MAX(id) is its cursor; the private key column
+          stays empty, replicas never hold wallet private keys
+        """
+        with db_connection(path=self.blockchain.db_path) as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO wallets (id, family_id, crisis_id, created_at, members, devices) "
+                "VALUES (?, ?, ?, ?, '[]', '[]')",
+                [(w['id'], w['family_id'], w['crisis_id'], w['created_at']) for w in wallets]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO wallet_members (family_id, position, member_id, name, address) VALUES (?, ?, ?, ?, ?)",
+                [(w['family_id'], position, m['id'], m['name'], m['address'])
+                 for w in wallets for position, m in enumerate(w['members'])]
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO wallet_keys (family_id, encrypted_private_key, public_key) VALUES (?, '', ?)",
+                [(w['family_id'], w['public_key']) for w in wallets]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO wallet_devices (family_id, device_id, public_key, registered_at) VALUES (?, ?, ?, ?)",
+                [(d['family_id'], d['device_id'], d['public_key'], d['registered_at']) for d in devices]
+            )
+            conn.commit()
+
+        # Re-keyed devices change cached wallets
+        for device in devices:
+            self.wallets.pop(device['family_id'], None)
+
     def delete_wallet(self, family_id):
         """Delete wallet and its keys"""
         # Remove from cache
@@ -434,42 +838,86 @@ class WalletManager:
             del self.wallets[family_id]
 
         # Delete from database
-        with db_connection() as conn:
+        with db_connection(path=self.blockchain.db_path) as conn:
+            conn.execute("DELETE FROM wallet_members WHERE family_id = ?", (family_id,))
+            conn.execute("DELETE FROM wallet_devices WHERE family_id = ?", (family_id,))
             conn.execute("DELETE FROM wallets WHERE family_id = ?", (family_id,))
             conn.execute("DELETE FROM wallet_keys WHERE family_id = ?", (family_id,))
             conn.commit()
     
 
 class Blockchain:
-    def __init__(self, policy_system=None):
+    def __init__(self, policy_system=None, start_miner: bool = True, db_path: Optional[str] = None,
+                 replica: bool = False):
+        """
+        - replica: read-only follower of another node (see replication.py): no master key,
+          no genesis block and no miner; blocks only arrive through apply_replicated()
+        """
+        self.startup_profile = {}   # phase -> seconds, reported by /debug/startup
+        phase_started = time.perf_counter()
+        
+        def phase(name):
+            nonlocal phase_started
+            now = time.perf_counter()
+            self.startup_profile[name] = round(now - phase_started, 4)
+            phase_started = now
+        
         self.policy_system = policy_system or PolicySystem()    # Use provided policy or default if none provided
-        self.crisis_metadata = self.policy_system.get_policy()
-        self.chain: List[Block] = []
+        self.db_path = db_path or database.DB_PATH  # Own SQLite file when hosted in a CrisisRegistry
+        
+        init_db(self.db_path)       # Initialize database
+        self.policy_system.attach_storage(self.db_path)     # Persisted policies win over the ones created at startup
+        phase('init_db')
+        
+        self.crisis_metadata = dict(self.policy_system.get_policy())
+        self.chain = TieredChain(self.segment_dir())    # hot blocks in memory, older epochs sealed on disk
         self.pending_transactions: List[Transaction] = []
+        self.pending_bytes = 0  # Serialized size of the mempool
+        self.pending_positions: Dict[str, int] = {}   # transaction_id -> index in pending_transactions
+        self.pending_alerts: List[Transaction] = []   # alerts in pending_transactions, for GET /alerts
+        self.unsaved_alerts: Dict[int, List[Transaction]] = {}  # block_index -> alerts mined, not yet in the alerts table
+        self.mined_history = deque(maxlen=MINING_RATE_WINDOW)   # (timestamp, transaction count) of recent blocks
         self.wallets = WalletManager(self)
-        
-        # Get policy values from PolicySystem
-        policy_settings = self.policy_system.get_policy()['policy']
-        self.block_interval = policy_settings['block_interval']
-        self.max_tx_size = policy_settings['size_limit']
-        self.tx_rate_limit = policy_settings['rate_limit']
+        self.lock = threading.RLock()   # Guards pending_transactions between request threads and the miner
+        self.events = EventFeed()   # Push feed of committed blocks for SSE / long-poll clients
+        self.block_cache = BlockCache()     # Pre-serialized JSON / compressed bytes per mined block
+        self.miner_thread = None
+        self._miner_pid = None
+        self.replica = replica
         
         # Generate master keypair when new KriSYS Blockchain is instantiated
-        self.master_public_key = self.load_or_generate_master_key()
-        logger.info(f"Master public key: {self.master_public_key}")
+        # (a replica verifies with the primary's public key instead, pinned by its follower)
+        self.master_public_key = None if replica else self.load_or_generate_master_key()
+        logger.debug(f"Master public key: {self.master_public_key}")
+        phase('master_key')
         
         # Store public key in crisis metadata
-        self.crisis_metadata['public_key'] = str(self.master_public_key)
+        # (None until a replica's follower pins the primary's key, served as null)
+        self.crisis_metadata['public_key'] = str(self.master_public_key) if self.master_public_key else None
         
-        init_db()       # Initialize database
-        
-        if not self.load_chain():   # Load existing chain or create genesis block for new blockchain
+        if not self.load_chain() and not replica:   # Load existing chain or create genesis block for new blockchain
             self.create_genesis_block()
+        phase('load_chain')
         
-        # Start automatic background miner
-        self.miner_thread = threading.Thread(target=self.miner_loop, daemon=True)
-        self.miner_thread.start()
-        
+        # Start automatic background miner (tools and benchmarks mine explicitly instead,
+        # app.py starts it per worker after gunicorn forks)
+        if start_miner:
+            self.start_miner()
+
+    def start_miner(self):
+        """
+        Start the background miner thread in this process
+        - Idempotent, and safe after fork: threads do not survive fork(), so a
+          worker inheriting a preloaded Blockchain starts its own miner on first use
+        """
+        if self._miner_pid == os.getpid() or self.replica:
+            return
+        with self.lock:
+            if self._miner_pid == os.getpid():
+                return
+            self._miner_pid = os.getpid()
+            self.miner_thread = threading.Thread(target=self.miner_loop, daemon=True)
+            self.miner_thread.start()
 
     def load_or_generate_master_key(self):
         """
@@ -491,7 +939,8 @@ class Blockchain:
                 return f.read()
         else:
             # Generate new keypair
-            key = pgpy.PGPKey.new(PubKeyAlgorithm.RSAEncryptOrSign, 4096)
+            with PGP_LATENCY.labels(operation='keygen').time():
+                key = pgpy.PGPKey.new(PubKeyAlgorithm.RSAEncryptOrSign, 4096)
             uid = pgpy.PGPUID.new('KriSYS Blockchain', comment='Master Key')
             key.add_uid(uid, 
                 usage={KeyFlags.Sign, KeyFlags.EncryptCommunications},
@@ -529,8 +978,9 @@ class Blockchain:
             key.parse(key_str)
             
             # Decrypt the data
-            enc_message = pgpy.PGPMessage.from_blob(encrypted_data)
-            decrypted = key.decrypt(enc_message)
+            with PGP_LATENCY.labels(operation='decrypt').time():
+                enc_message = pgpy.PGPMessage.from_blob(encrypted_data)
+                decrypted = key.decrypt(enc_message)
             return str(decrypted.message)
         except Exception as e:
             logger.error(f"Decryption failed: {str(e)}")
@@ -538,6 +988,20 @@ class Blockchain:
     
     
     
+    # Policy-derived settings always read the active validator, so a policy swap
+    # (local or reloaded from another worker) changes all of them at once
+    @property
+    def block_interval(self):
+        return self.policy_system.validator.block_interval
+
+    @property
+    def max_tx_size(self):
+        return self.policy_system.validator.size_limit
+
+    @property
+    def tx_rate_limit(self):
+        return self.policy_system.validator.rate_limit
+
     def get_wallet(self, family_id):
         """Get wallet by family ID"""
         return self.wallets.get_wallet(family_id)
@@ -545,62 +1009,295 @@ class Blockchain:
     def add_transaction(self, transaction: Transaction, rate_limit_override: bool = False):
         """Add transaction with policy enforcement"""
         
-        # Get current policy settings
-        policy_config = self.policy_system.get_policy()['policy']
-        ############# DEVELOPMENT ONLY ################
-        if policy_config: 
-            for item in policy_config:
-                logger.info(f'{item}: {policy_config[item]}')
-                logger.info('-'*20)
-        ############################################
-        
-        # 1. Validate transaction against policy
-        self.policy_system.validate_transaction(transaction)
-        
-        # 2. Size check
-        tx_size = len(json.dumps(transaction.to_dict()))
-        if tx_size > self.max_tx_size:
-            raise ValueError(
-                f"Transaction exceeds size limit ({tx_size}/{self.max_tx_size} bytes)"
-            )
-        
-        # 3. Deduplication
-        if any(tx.transaction_id == transaction.transaction_id 
-               for tx in self.pending_transactions):
-            raise ValueError("Duplicate transaction ID")
-        
-        # 4. Rate limiting
-        if not rate_limit_override:
-            recent_txs = [
-                tx for tx in self.pending_transactions 
-                if tx.station_address == transaction.station_address
-                and (time.time() - tx.timestamp_created) < policy_config['rate_limit']
-            ]
-            if recent_txs:
-                raise ValueError(
-                    f"Only one transaction per station every {policy_config['rate_limit']} seconds"
-                )
-        
-        self.pending_transactions.append(transaction)
-        logger.info(f"Added transaction: {transaction.transaction_id} to blockchain.pending_transactions")
+        error = self.add_transactions([transaction], rate_limit_override)[0]
+        if error and error.startswith(DUPLICATE_TX_ERROR):
+            raise DuplicateTransactionError(error)
+        if error and error.startswith(MEMPOOL_FULL_ERROR):
+            raise MempoolFullError(error, self.retry_after())
+        if error:
+            raise ValueError(error)
+        logger.debug(f"Added transaction: {transaction.transaction_id} to blockchain.pending_transactions")
+
+    def add_transactions(self, transactions: List[Transaction], rate_limit_override: bool = False) -> List[Optional[str]]:
+        """
+        Admit a batch of transactions, e.g. a relay uploading its offline backlog
+        - Policy and size validation run per item before the mempool lock is taken
+        - Deduplication and rate limiting are checked against the mempool and the
+          batch itself under a single lock acquisition, then admitted items are appended at once
+        - Returns: one error message per transaction, None where it was admitted
+        """
+        start = time.perf_counter()
+        errors: List[Optional[str]] = [None] * len(transactions)
+        sizes = [0] * len(transactions)
+        validator = self.policy_system.validator   # one consistent policy snapshot per batch
+        rate_limit = validator.rate_limit
+
+        # 1. Validate transactions against policy, 2. Size check (both by the validator)
+        for position, transaction in enumerate(transactions):
+            try:
+                sizes[position] = validator.validate(transaction)
+            except ValueError as e:
+                errors[position] = str(e)
+
+        # Transactions in sealed epochs are no longer in the hot index: look them up in the
+        # durable transaction_index first (a block is saved there long before it is sealed)
+        sealed = self._indexed_block_indexes([
+            tx.transaction_id for position, tx in enumerate(transactions)
+            if not errors[position] and self.chain.block_index_of(tx.transaction_id) is None
+        ])
+
+        admitted = []
+        with self.lock:
+            now = time.time()
+            pending_ids = {tx.transaction_id for tx in self.pending_transactions}
+            recent_stations = {
+                tx.station_address for tx in self.pending_transactions
+                if (now - tx.timestamp_created) < rate_limit
+            }
+            for position, transaction in enumerate(transactions):
+                if errors[position]:
+                    continue
+
+                # 3. Deduplication, against the mempool and the hot chain (mined blocks are
+                # appended under this lock, so a retry can never reach save_block twice)
+                if transaction.transaction_id in pending_ids:
+                    errors[position] = DUPLICATE_TX_ERROR
+                    continue
+                mined_in = self.chain.block_index_of(transaction.transaction_id)
+                if mined_in is None:
+                    mined_in = sealed.get(transaction.transaction_id)
+                if mined_in is not None:
+                    errors[position] = f"{DUPLICATE_TX_ERROR} (already in block #{mined_in})"
+                    continue
+
+                # 4. Rate limiting
+                if not rate_limit_override and transaction.station_address in recent_stations:
+                    errors[position] = f"Only one transaction per station every {rate_limit} seconds"
+                    continue
+
+                # 5. Admission control: past a high watermark only essential traffic gets in
+                saturated = (len(self.pending_transactions) + len(admitted) >= MEMPOOL_HIGH_COUNT
+                             or self.pending_bytes >= MEMPOOL_HIGH_BYTES)
+                if saturated and not validator.is_essential(transaction):
+                    errors[position] = MEMPOOL_FULL_ERROR
+                    continue
+
+                pending_ids.add(transaction.transaction_id)
+                if (now - transaction.timestamp_created) < rate_limit:
+                    recent_stations.add(transaction.station_address)
+                admitted.append(transaction)
+                self.pending_bytes += sizes[position]
+
+            for offset, transaction in enumerate(admitted, start=len(self.pending_transactions)):
+                self.pending_positions[transaction.transaction_id] = offset
+            self.pending_transactions.extend(admitted)
+            alerts = [tx for tx in admitted if tx.type_field == 'alert']
+            self.pending_alerts.extend(alerts)
+
+        # Alerts are pushed on admission, not when mined: they are the most latency-sensitive data
+        for alert in alerts:
+            self.events.publish("alert", alert_summary(alert, pending=True))
+
+        TX_ADMISSION_LATENCY.observe(time.perf_counter() - start)
+        TX_ADMITTED.labels(result='admitted').inc(len(admitted))
+        TX_ADMITTED.labels(result='rejected').inc(len(transactions) - len(admitted))
+
+        if len(transactions) > 1:
+            logger.info(f"Added {len(admitted)}/{len(transactions)} batched transactions to blockchain.pending_transactions")
+        return errors
         
     
+    @property
+    def mempool_saturated(self) -> bool:
+        """At a high watermark: only essential transactions are admitted until the next block"""
+        return len(self.pending_transactions) >= MEMPOOL_HIGH_COUNT or self.pending_bytes >= MEMPOOL_HIGH_BYTES
+
+    def mining_interval(self) -> float:
+        """Measured seconds between recent blocks, or the policy block_interval before there are two"""
+        if len(self.mined_history) < 2:
+            return self.block_interval
+        return (self.mined_history[-1][0] - self.mined_history[0][0]) / (len(self.mined_history) - 1)
+
+    def retry_after(self) -> int:
+        """Seconds until the next block is expected to drain the mempool, for Retry-After"""
+        remaining = self.mining_interval()
+        if self.mined_history:
+            remaining -= time.time() - self.mined_history[-1][0]
+        return max(1, math.ceil(remaining))
+
+    def mempool_status(self) -> Dict:
+        """Queue depth against the admission high watermarks, plus the measured mining rate"""
+        with self.lock:
+            count, size, saturated = len(self.pending_transactions), self.pending_bytes, self.mempool_saturated
+            history = list(self.mined_history)
+        span = history[-1][0] - history[0][0] if len(history) > 1 else 0
+        return {
+            "transactions": count,
+            "bytes": size,
+            "saturated": saturated,
+            "high_watermark": {"transactions": MEMPOOL_HIGH_COUNT, "bytes": MEMPOOL_HIGH_BYTES},
+            "mining": {
+                "blocks_sampled": len(history),
+                "interval_seconds": round(self.mining_interval(), 3),
+                "tx_per_second": round(sum(n for _, n in history[1:]) / span, 3) if span else None,
+            },
+            "retry_after": self.retry_after() if saturated else 0,
+        }
+
+    def _indexed_block_indexes(self, transaction_ids: List[str]) -> Dict[str, int]:
+        """transaction_id -> block_index for the given IDs found in the transaction_index table"""
+        found = {}
+        if not transaction_ids:
+            return found
+        with db_connection(path=self.db_path) as conn:
+            for start in range(0, len(transaction_ids), 500):   # stay well under SQLite's variable limit
+                chunk = transaction_ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT transaction_id, block_index FROM transaction_index "
+                    f"WHERE transaction_id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update((row['transaction_id'], row['block_index']) for row in rows)
+        return found
+
+    def last_checkins(self, addresses: List[str]) -> Dict[str, Optional[Dict]]:
+        """Newest mined check-in per address (None if never checked in), from the last_checkins view"""
+        found = {}
+        with db_connection(path=self.db_path) as conn:
+            for start in range(0, len(addresses), 500):     # stay well under SQLite's variable limit
+                chunk = addresses[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT * FROM last_checkins WHERE address IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update((row['address'], {
+                    "station_id": row['station_address'],
+                    "timestamp": row['timestamp'],
+                    "block_index": row['block_index'],
+                    "transaction_id": row['transaction_id'],
+                }) for row in rows)
+        return {address: found.get(address) for address in addresses}
+
+    def alerts_since(self, since: float, max_priority: Optional[int] = None, limit: int = 200) -> List[Dict]:
+        """
+        Alerts created at or after since, oldest first: mined ones from the alerts index
+        (plus blocks mined but not yet saved), then those still in the mempool (flagged pending)
+        - max_priority: only alerts at least this urgent (1 is the highest priority)
+        """
+        def wanted(tx):
+            return tx.timestamp_created >= since and (max_priority is None or tx.priority_level <= max_priority)
+
+        # In-memory alerts are snapshotted before the table is read: an alert whose block
+        # is saved in between is then seen in one place or both, never in neither
+        with self.lock:
+            unsaved = [(block_index, tx) for block_index, alerts in self.unsaved_alerts.items() for tx in alerts]
+            pending = list(self.pending_alerts)
+
+        where, params = 'timestamp >= ?', [since]
+        if max_priority is not None:
+            where += ' AND priority_level <= ?'
+            params.append(max_priority)
+        with db_connection(path=self.db_path) as conn:
+            rows = conn.execute(
+                f'SELECT * FROM alerts WHERE {where} ORDER BY timestamp LIMIT ?', params + [limit]
+            ).fetchall()
+
+        alerts = [{
+            "transaction_id": row['transaction_id'],
+            "timestamp": row['timestamp'],
+            "priority_level": row['priority_level'],
+            "station_address": row['station_address'],
+            "message": row['message_data'],
+            "pending": False,
+            "block_index": row['block_index'],
+        } for row in rows]
+        seen = {alert['transaction_id'] for alert in alerts}
+        alerts.extend(
+            {**alert_summary(tx, pending=False), "block_index": block_index} for block_index, tx in unsaved
+            if wanted(tx) and tx.transaction_id not in seen
+        )
+        alerts.sort(key=lambda alert: alert['timestamp'])
+        seen.update(tx.transaction_id for _, tx in unsaved)
+        alerts.extend(
+            alert_summary(tx, pending=True) for tx in pending
+            if wanted(tx) and tx.transaction_id not in seen
+        )
+        return alerts[:limit]
+
+    def find_transaction(self, transaction_id: str) -> Optional[Dict]:
+        """
+        Status of one transaction by ID, or None if unknown
+        - Pending: its position in the mempool (next block takes the whole mempool)
+        - Mined: its block and confirmation depth (1 = in the head block)
+        - Mempool and hot blocks are in-memory dict lookups; sealed epochs go through
+          the transaction_index table, then load only the one block needed
+        """
+        with self.lock:
+            position = self.pending_positions.get(transaction_id)
+            if position is not None:
+                return {
+                    "status": "pending",
+                    "transaction": self.pending_transactions[position].to_dict(),
+                    "mempool_position": position,
+                    "mempool_size": len(self.pending_transactions),
+                }
+            block_index = self.chain.block_index_of(transaction_id)
+
+        if block_index is None:
+            with db_connection(path=self.db_path) as conn:
+                row = conn.execute(
+                    'SELECT block_index FROM transaction_index WHERE transaction_id = ?', (transaction_id,)
+                ).fetchone()
+            if row is None:
+                return None
+            block_index = row['block_index']
+
+        height = len(self.chain)
+        if block_index >= height:
+            return None
+        block = self.chain[block_index]
+        transaction = next((tx for tx in block.transactions if tx.transaction_id == transaction_id), None)
+        if transaction is None:
+            return None
+        return {
+            "status": "confirmed",
+            "transaction": transaction.to_dict(),
+            "block_index": block.block_index,
+            "block_hash": block.hash,
+            "confirmations": height - block.block_index,
+        }
+
+    def segment_dir(self) -> str:
+        """Sealed segment files live next to the chain's database"""
+        return os.path.splitext(self.db_path)[0] + '.segments'
+
     def load_chain(self) -> bool:
         """Load blockchain from database, return True if successful"""
         try:
-            with db_connection() as conn:
-                # Load blocks
+            # Sealed epochs: only their indexes are read here, blocks load on demand
+            first_hot = self.chain.open()
+            
+            with db_connection(path=self.db_path) as conn:
+                # Finish a seal interrupted between writing its segment and deleting the rows
+                if first_hot:
+                    conn.execute(
+                        'DELETE FROM transactions WHERE block_id IN (SELECT id FROM blocks WHERE block_index < ?)',
+                        (first_hot,)
+                    )
+                    conn.execute('DELETE FROM blocks WHERE block_index < ?', (first_hot,))
+                    conn.commit()
+                
+                # Load hot blocks
                 blocks = conn.execute(
-                    'SELECT * FROM blocks ORDER BY block_index'
+                    'SELECT * FROM blocks WHERE block_index >= ? ORDER BY block_index',
+                    (first_hot,)
                 ).fetchall()
                 
-                if not blocks:
+                if not blocks and not first_hot:
                     return False
                 
                 for db_block in blocks:
                     # Load transactions for this block
                     transactions_data = conn.execute(
-                        'SELECT * FROM transactions WHERE block_id = ?',
+                        'SELECT * FROM transactions WHERE block_id = ? ORDER BY id',
                         (db_block['id'],)
                     ).fetchall()
                     
@@ -610,7 +1307,8 @@ class Blockchain:
                             timestamp_created=tx_data['timestamp_created'],
                             station_address=tx_data['station_address'],
                             message_data=tx_data['message_data'],
-                            related_addresses=tx_data['related_addresses'].split(','),
+                            # ''.split(',') would be [''], changing the hash of blocks with address-less transactions
+                            related_addresses=tx_data['related_addresses'].split(',') if tx_data['related_addresses'] else [],
                             type_field=tx_data['type_field'],
                             priority_level=tx_data['priority_level'],
                             transaction_id=tx_data['transaction_id'],
@@ -632,7 +1330,11 @@ class Blockchain:
                     block.hash = db_block['hash']
                     self.chain.append(block)
                 
-                logger.info(f"Loaded {len(self.chain)} blocks from database")
+                if first_hot and (not self.chain.hot or self.chain.hot[0].previous_hash != self.chain.segments[-1].last_hash):
+                    logger.error(f"Hot blocks do not continue sealed segment ending at block #{first_hot - 1}")
+                
+                logger.info(f"Loaded {len(self.chain)} blocks ({len(self.chain.hot)} hot, "
+                            f"{len(self.chain.segments)} sealed segments)")
                 return True
                 
         except Exception as e:
@@ -645,7 +1347,7 @@ class Blockchain:
         if not block.signature:
             block.signature = self.sign_block(block)
         
-        with db_connection() as conn:
+        with db_connection(path=self.db_path) as conn:
             # Save block
             cur = conn.execute(
                 '''
@@ -688,8 +1390,54 @@ class Blockchain:
                         tx.priority_level
                     )
                 )
+            # Incrementally maintained "last seen" per address, committed with the block
+            conn.executemany(database.UPSERT_LAST_CHECKIN, [
+                (address, tx.station_address, tx.timestamp_created, block.block_index, tx.transaction_id)
+                for tx in block.transactions if tx.type_field == 'check_in'
+                for address in tx.related_addresses
+            ])
+
+            # Alerts index for GET /alerts
+            conn.executemany(
+                'INSERT OR IGNORE INTO alerts (transaction_id, timestamp, priority_level, station_address, message_data, block_index) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(tx.transaction_id, tx.timestamp_created, tx.priority_level, tx.station_address, tx.message_data,
+                  block.block_index) for tx in block.transactions if tx.type_field == 'alert']
+            )
+
+            # Hourly analytics rollups, also committed with the block
+            database.write_rollups(conn, (
+                (tx.timestamp_created, tx.station_address, tx.type_field, tx.priority_level, tx.related_addresses)
+                for tx in block.transactions
+            ))
+
+            # Durable ID -> block lookup; kept when the block's epoch is sealed. OR IGNORE keeps
+            # the first block if an ID ever repeats, rather than failing the whole block commit
+            # (the block is already in the in-memory chain)
+            conn.executemany(
+                'INSERT OR IGNORE INTO transaction_index (transaction_id, block_index) VALUES (?, ?)',
+                [(tx.transaction_id, block.block_index) for tx in block.transactions]
+            )
             conn.commit()
             logger.info(f"Saved block #{block.block_index} to database")
+        with self.lock:
+            self.unsaved_alerts.pop(block.block_index, None)
+
+        # Mined blocks never change: render their JSON and compressed bytes once, here
+        self.block_cache.store(block)
+
+        # Notify subscribers only once the block is durable
+        self.events.publish(
+            "block",
+            {
+                "block_index": block.block_index,
+                "hash": block.hash,
+                "previous_hash": block.previous_hash,
+                "timestamp": block.timestamp,
+                "transaction_count": len(block.transactions),
+            },
+            addresses={addr for tx in block.transactions for addr in tx.related_addresses},
+        )
 
     # def create_genesis_block(self):
     #     """Create and save the genesis block"""
@@ -739,18 +1487,25 @@ class Blockchain:
 
     def mine_block(self) -> Block:
         """Create new block with pending transactions"""
-        if not self.pending_transactions:
-            raise ValueError("No transactions to mine")
-            
-        last_block = self.chain[-1]
-        new_block = Block(
-            block_index=last_block.block_index + 1,
-            timestamp=time.time(),
-            transactions=self.pending_transactions.copy(),
-            previous_hash=last_block.hash
-        )
-        self.pending_transactions = []
-        self.chain.append(new_block)
+        with self.lock:
+            if not self.pending_transactions:
+                raise ValueError("No transactions to mine")
+                
+            last_block = self.chain[-1]
+            new_block = Block(
+                block_index=last_block.block_index + 1,
+                timestamp=time.time(),
+                transactions=self.pending_transactions.copy(),
+                previous_hash=last_block.hash
+            )
+            self.pending_transactions = []
+            self.pending_bytes = 0
+            self.pending_positions = {}
+            if self.pending_alerts:     # served from here until save_block has committed them
+                self.unsaved_alerts[new_block.block_index] = self.pending_alerts
+            self.pending_alerts = []
+            self.chain.append(new_block)
+            self.mined_history.append((new_block.timestamp, len(new_block.transactions)))
         logger.info(f"Mined block #{new_block.block_index}")
         return new_block
 
@@ -758,23 +1513,68 @@ class Blockchain:
     def mine_and_save(self):
         """Mine block and persist to database"""
         if self.pending_transactions:
-            block = self.mine_block()
-            self.save_block(block)
+            with BLOCK_PHASE_LATENCY.labels(phase='build').time():
+                block = self.mine_block()
+            with BLOCK_PHASE_LATENCY.labels(phase='sign').time():
+                block.signature = self.sign_block(block)
+            with BLOCK_PHASE_LATENCY.labels(phase='persist').time():
+                self.save_block(block)
         
+    def apply_replicated(self, blocks: List[Block]):
+        """
+        Append blocks already verified by a follower (replication.py)
+        - Persisted, cached and published exactly like locally mined blocks
+        """
+        for block in blocks:
+            with self.lock:
+                if block.block_index != len(self.chain):
+                    raise ValueError(f"Block #{block.block_index} does not extend chain of height {len(self.chain)}")
+                self.chain.append(block)
+            self.save_block(block)
+
+    def seal_cold_blocks(self, now: Optional[float] = None) -> int:
+        """
+        Move complete epochs older than the hot window out of memory and SQLite
+        - Each epoch becomes one read-only, compressed segment file with an address index
+        - The segment is durable before the blocks leave the hot list and the database
+        - Returns the number of blocks sealed
+        """
+        sealed = 0
+        for blocks in self.chain.cold_ranges(now or time.time()):
+            segment = self.chain.write_segment(blocks)
+            with self.lock:
+                self.chain.retire(segment)
+            with db_connection(path=self.db_path) as conn:
+                conn.execute(
+                    'DELETE FROM transactions WHERE block_id IN (SELECT id FROM blocks WHERE block_index BETWEEN ? AND ?)',
+                    (segment.start, segment.end)
+                )
+                conn.execute('DELETE FROM blocks WHERE block_index BETWEEN ? AND ?', (segment.start, segment.end))
+                conn.commit()
+            logger.info(f"Sealed blocks #{segment.start}-#{segment.end} (epoch {segment.epoch}) into {segment.path}")
+            sealed += len(blocks)
+        return sealed
+
     def miner_loop(self):
         """Background thread for automatic block mining"""
+        last_mined = time.time()
         while True:
             try:
-                # Get current block interval from policy
-                block_interval = self.policy_system.get_policy()['policy']['block_interval']
+                # Pick up policy changes persisted by other workers
+                self.policy_system.reload()
+                block_interval = self.block_interval
                 
-                # Only mine if we have transactions
-                if self.pending_transactions:
-                    self.mine_and_save()
+                # Mine on each block interval boundary, only if we have transactions
+                if time.time() - (time.time() % block_interval) > last_mined:
+                    last_mined = time.time()
+                    if self.pending_transactions:
+                        self.mine_and_save()
+                    self.seal_cold_blocks()
                 
-                # Sleep for the remaining time in the block interval
+                # Sleep for the remaining time in the block interval, waking up often enough
+                # that a new block_interval takes effect within POLICY_RELOAD_INTERVAL
                 sleep_time = block_interval - (time.time() % block_interval)
-                time.sleep(sleep_time)
+                time.sleep(min(sleep_time, self.policy_system.POLICY_RELOAD_INTERVAL))
             except Exception as e:
                 logger.error(f"Mining error: {str(e)}")
                 time.sleep(5)  # Wait before retrying
@@ -825,18 +1625,11 @@ class Blockchain:
             key = pgpy.PGPKey()
             key.parse(key_str)
 
-            header = json.dumps(
-                {
-                    "block_index": block.block_index,
-                    "previous_hash": block.previous_hash,
-                    "hash": block.hash,
-                },
-                sort_keys=True,
-                separators=(',', ':'),  # match JSON.stringify (no spaces)
-            )
+            header = block.signing_header()
 
-            message = pgpy.PGPMessage.new(header)
-            sig = key.sign(message, detached=True)
+            with PGP_LATENCY.labels(operation='sign').time():
+                message = pgpy.PGPMessage.new(header)
+                sig = key.sign(message, detached=True)
             return str(sig)
         except Exception as e:
             logger.error(f"Block signing failed: {str(e)}")
@@ -851,11 +1644,5 @@ class WalletAuth:
     # DEV NOTE: update passphrase code here, empty string only valid for development!!!!!
     def generate_keypair(self, passphrase=""):
         """Generate PGP key pair for wallet"""
-        key = pgpy.PGPKey.new(PubKeyAlgorithm.RSAEncryptOrSign, 4096)
-        uid = pgpy.PGPUID.new('KriSYS Wallet', comment='Auto-generated')
-        key.add_uid(uid, usage={KeyFlags.Sign, KeyFlags.EncryptCommunications},
-                    hashes=[HashAlgorithm.SHA256],
-                    ciphers=[SymmetricKeyAlgorithm.AES256])
-              
-        key.protect(passphrase, SymmetricKeyAlgorithm.AES256, HashAlgorithm.SHA256)
-        return key
+        with PGP_LATENCY.labels(operation='keygen').time():
+            return wallet_keys.generate_keypair(passphrase)
@@ -0,0 +1,282 @@
+# chain_storage.py
+import bisect
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Blocks are partitioned into epochs by timestamp. The newest HOT_EPOCHS epochs stay in
+# memory and SQLite; older complete epochs are sealed into read-only segment files.
+EPOCH_SECONDS = int(os.getenv('KRISYS_EPOCH_SECONDS', 24 * 3600))
+HOT_EPOCHS = int(os.getenv('KRISYS_HOT_EPOCHS', 2))
+MAX_LOADED_SEGMENTS = 4     # cold segments kept decoded in memory (LRU)
+
+
+class Segment:
+    """
+    One sealed, read-only range of blocks
+    - <start>-<end>.seg.gz: gzip JSON lines, one block.to_dict() per line
+    - <start>-<end>.idx.json: range, boundary hashes, checksum and an address -> block
+      index map, so lookups know which segments to open without decompressing any
+    """
+    __slots__ = ('start', 'end', 'epoch', 'path', 'last_hash', 'addresses')
+
+    def __init__(self, start: int, end: int, epoch: int, path: str, last_hash: str, addresses: Dict[str, List[int]]):
+        self.start = start
+        self.end = end
+        self.epoch = epoch
+        self.path = path
+        self.last_hash = last_hash
+        self.addresses = addresses
+
+    @property
+    def index_path(self) -> str:
+        return self.path[:-len('.seg.gz')] + '.idx.json'
+
+
+def _block_from_dict(data: dict):
+    from blockchain import Block    # blockchain.py imports this module
+    return Block.from_dict(data)
+
+
+def _write_readonly(path: str, data: bytes):
+    """Write via a temp file + rename so a crash never leaves a partial segment"""
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.chmod(tmp, 0o444)
+    os.replace(tmp, path)
+
+
+class TieredChain:
+    """
+    List-like view of a chain whose older blocks live in sealed segment files
+    - Indexing, slicing, len() and iteration behave like the old List[Block]
+      (block_index == position); cold blocks are decoded on demand, segment by segment
+    - State is one (segments, segment starts, hot, hot address index) tuple swapped
+      atomically, so readers never see a block counted both hot and sealed
+    - append() and retire() must be called under Blockchain.lock
+    - Hot transactions are indexed by ID; sealed ones are found through the database's
+      transaction_index (Blockchain.add_transactions / find_transaction)
+    """
+    def __init__(self, directory: str, epoch_seconds: int = EPOCH_SECONDS, hot_epochs: int = HOT_EPOCHS,
+                 max_loaded_segments: int = MAX_LOADED_SEGMENTS):
+        self.directory = directory
+        self.epoch_seconds = epoch_seconds
+        self.hot_epochs = hot_epochs
+        self.max_loaded_segments = max_loaded_segments
+        # (sealed segments in order, their start indexes for bisect, hot blocks,
+        #  address -> ascending hot block indexes)
+        self._state = ((), (), [], {})
+        self._hot_tx_index = {}     # transaction_id -> block_index, hot blocks only
+        self._loaded = OrderedDict()    # segment start -> decoded blocks
+        self._load_lock = threading.Lock()
+
+    # List interface
+    @property
+    def segments(self):
+        return self._state[0]
+
+    @property
+    def hot(self) -> list:
+        return self._state[2]
+
+    @staticmethod
+    def _hot_start(segments) -> int:
+        return segments[-1].end + 1 if segments else 0
+
+    def __len__(self) -> int:
+        segments, _, hot, _ = self._state
+        return self._hot_start(segments) + len(hot)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+        segments, starts, hot, _ = self._state
+        hot_start = self._hot_start(segments)
+        length = hot_start + len(hot)
+        if item < 0:
+            item += length
+        if not 0 <= item < length:
+            raise IndexError("chain index out of range")
+        if item >= hot_start:
+            return hot[item - hot_start]
+        segment = segments[bisect.bisect_right(starts, item) - 1]
+        return self._load(segment)[item - segment.start]
+
+    def __iter__(self):
+        # Snapshot: blocks mined or sealed while iterating are not included or repeated.
+        # Segment by segment, so each sealed segment is decoded once per pass
+        segments, _, hot, _ = self._state
+        hot = list(hot)
+        for segment in segments:
+            yield from self._load(segment)
+        yield from hot
+
+    def append(self, block):
+        _, _, hot, hot_addresses = self._state
+        hot.append(block)
+        for tx in block.transactions:
+            self._hot_tx_index[tx.transaction_id] = block.block_index
+        for address in {a for tx in block.transactions for a in tx.related_addresses}:
+            hot_addresses.setdefault(address, []).append(block.block_index)
+
+    def block_index_of(self, transaction_id: str) -> Optional[int]:
+        """Index of the hot block containing transaction_id, or None"""
+        return self._hot_tx_index.get(transaction_id)
+
+    # Lookups that can skip cold segments
+    def blocks_for_addresses(self, addresses: Iterable[str], since_block: int = -1,
+                             until_block: Optional[int] = None) -> list:
+        """
+        Blocks (oldest first) with a transaction related to any of addresses
+        - since_block / until_block: only blocks with since_block < index <= until_block
+        - Sealed segments answer from their address index, hot blocks from the hot
+          address index, so the cost follows the matches rather than the chain length
+        """
+        addresses = set(addresses)
+        segments, _, hot, hot_addresses = self._state
+        if until_block is None:
+            until_block = self._hot_start(segments) + len(hot) - 1
+        blocks = []
+        for segment in segments:
+            if segment.end <= since_block or segment.start > until_block:
+                continue
+            indices = sorted({i for address in addresses for i in segment.addresses.get(address, ())
+                              if since_block < i <= until_block})
+            if indices:
+                decoded = self._load(segment)
+                blocks.extend(decoded[i - segment.start] for i in indices)
+
+        hot_start = self._hot_start(segments)
+        indices = sorted({i for address in addresses for i in list(hot_addresses.get(address, ()))
+                          if since_block < i <= until_block and i >= hot_start})
+        blocks.extend(hot[i - hot_start] for i in indices if i - hot_start < len(hot))
+        return blocks
+
+    def blocks_from(self, start: int):
+        """Blocks with index >= start, oldest first; segments that end before start are not opened"""
+        segments, _, hot, _ = self._state
+        for segment in segments:
+            if segment.end >= start:
+                yield from (block for block in self._load(segment) if block.block_index >= start)
+        yield from (block for block in list(hot) if block.block_index >= start)
+
+    # Segment files
+    def open(self) -> int:
+        """Register the sealed segments on disk (indexes only), returns the first hot index"""
+        segments = []
+        if os.path.isdir(self.directory):
+            for name in sorted(os.listdir(self.directory)):
+                if not name.endswith('.idx.json'):
+                    continue
+                with open(os.path.join(self.directory, name)) as f:
+                    index = json.load(f)
+                segments.append(Segment(
+                    index['start'], index['end'], index['epoch'],
+                    os.path.join(self.directory, name[:-len('.idx.json')] + '.seg.gz'),
+                    index['last_hash'], index['addresses'],
+                ))
+        segments.sort(key=lambda s: s.start)
+        for previous, segment in zip(segments, segments[1:]):
+            if segment.start != previous.end + 1:
+                raise RuntimeError(f"Gap in sealed segments between blocks {previous.end} and {segment.start}")
+        self._state = (tuple(segments), tuple(s.start for s in segments), [], {})
+        self._hot_tx_index = {}
+        return self._hot_start(segments)
+
+    def _load(self, segment: Segment) -> list:
+        with self._load_lock:
+            blocks = self._loaded.get(segment.start)
+            if blocks is not None:
+                self._loaded.move_to_end(segment.start)
+                return blocks
+
+        with open(segment.path, 'rb') as f:
+            raw = gzip.decompress(f.read())
+        blocks = [_block_from_dict(json.loads(line)) for line in raw.splitlines()]
+        logger.debug(f"Loaded sealed segment {segment.start}-{segment.end} ({len(blocks)} blocks)")
+
+        with self._load_lock:
+            self._loaded[segment.start] = blocks
+            while len(self._loaded) > self.max_loaded_segments:
+                self._loaded.popitem(last=False)
+        return blocks
+
+    # Sealing
+    def epoch_of(self, block) -> int:
+        return int(block.timestamp // self.epoch_seconds)
+
+    def cold_ranges(self, now: float) -> List[list]:
+        """
+        Leading runs of hot blocks, one per epoch, that are old enough to seal
+        - The chain head always stays hot
+        """
+        cutoff = int(now // self.epoch_seconds) - self.hot_epochs
+        hot = list(self.hot)[:-1]
+        ranges = []
+        for block in hot:
+            epoch = self.epoch_of(block)
+            if epoch > cutoff:
+                break
+            if ranges and self.epoch_of(ranges[-1][0]) == epoch:
+                ranges[-1].append(block)
+            else:
+                ranges.append([block])
+        return ranges
+
+    def write_segment(self, blocks: list) -> Segment:
+        """Write blocks to a compressed segment file plus its index (not yet part of the chain)"""
+        os.makedirs(self.directory, exist_ok=True)
+        start, end = blocks[0].block_index, blocks[-1].block_index
+        base = os.path.join(self.directory, f"{start:010d}-{end:010d}")
+
+        lines = b'\n'.join(json.dumps(block.to_dict(), sort_keys=True, separators=(',', ':')).encode()
+                           for block in blocks)
+        data = gzip.compress(lines, mtime=0)
+        addresses: Dict[str, List[int]] = {}
+        for block in blocks:
+            for address in {a for tx in block.transactions for a in tx.related_addresses}:
+                addresses.setdefault(address, []).append(block.block_index)
+
+        segment = Segment(start, end, self.epoch_of(blocks[0]), base + '.seg.gz', blocks[-1].hash, addresses)
+        _write_readonly(segment.path, data)
+        _write_readonly(segment.index_path, json.dumps({
+            "start": start,
+            "end": end,
+            "epoch": segment.epoch,
+            "first_previous_hash": blocks[0].previous_hash,
+            "last_hash": segment.last_hash,
+            "block_count": len(blocks),
+            "transaction_count": sum(len(block.transactions) for block in blocks),
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "addresses": addresses,
+        }, sort_keys=True).encode())
+        return segment
+
+    def retire(self, segment: Segment):
+        """Swap the sealed blocks out of the hot list (they must be its first blocks)"""
+        segments, starts, hot, _ = self._state
+        count = segment.end - segment.start + 1
+        if not hot or hot[0].block_index != segment.start or len(hot) < count:
+            raise RuntimeError(f"Segment {segment.start}-{segment.end} does not match the hot blocks")
+        hot_addresses = {}
+        for address, indices in self._state[3].items():
+            remaining = [i for i in indices if i > segment.end]
+            if remaining:
+                hot_addresses[address] = remaining
+        self._state = (segments + (segment,), starts + (segment.start,), hot[count:], hot_addresses)
+        for block in hot[:count]:
+            for tx in block.transactions:
+                self._hot_tx_index.pop(tx.transaction_id, None)
@@ -0,0 +1,108 @@
+# compression.py
+import gzip
+import json
+import struct
+import zlib
+from typing import Iterable, Optional
+import logging
+
+# Optional encoders, only advertised when the library is installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Responses smaller than this are sent as-is, compressing them costs more than it saves
+MIN_COMPRESS_SIZE = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+# Server preference order when the client rates several encodings equally
+ENCODING_PREFERENCE = [
+    enc for enc, available in (
+        ('zstd', zstandard is not None),
+        ('br', brotli is not None),
+        ('gzip', True),
+    ) if available
+]
+
+# Encodings whose streams can be built by concatenating independently compressed pieces,
+# so each mined block only ever has to be compressed once (brotli has no such framing)
+SEGMENTED_ENCODINGS = [enc for enc in ENCODING_PREFERENCE if enc in ('zstd', 'gzip')]
+
+# Fixed gzip header (no filename, mtime 0 so identical chains give identical bytes) and
+# the empty final deflate block that terminates a run of sync-flushed segments
+_GZIP_HEADER = b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+_DEFLATE_FINAL_BLOCK = b'\x03\x00'
+
+
+def negotiate_encoding(accept_encodings, supported: Optional[Iterable[str]] = None) -> Optional[str]:
+    """
+    Pick the best content-coding for a request
+    - accept_encodings: werkzeug Accept object (request.accept_encodings)
+    - supported: candidate encodings in server preference order (defaults to all installed)
+    - Returns: encoding name, or None for identity
+    """
+    best, best_quality = None, 0
+    for encoding in (supported or ENCODING_PREFERENCE):
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a complete response body with the given content-coding"""
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    if encoding == 'zstd' and zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+def compress_segment(data: bytes, encoding: str) -> bytes:
+    """
+    Compress one piece of a segmented response
+    - gzip: raw deflate ending on a sync flush, so segments can be appended to each other
+    - zstd: a complete frame, concatenated frames are a valid zstd stream
+    """
+    if encoding == 'gzip':
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    if encoding == 'zstd' and zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    raise ValueError(f"Encoding {encoding} cannot be segmented")
+
+
+def join_segments(pieces, encoding: str) -> bytes:
+    """
+    Assemble a full response body from (raw_bytes, compressed_segment) pairs
+    - gzip needs the CRC32 and length of the uncompressed data for its trailer,
+      which is cheap next to re-compressing
+    """
+    if encoding == 'gzip':
+        crc, size, body = 0, 0, []
+        for raw, segment in pieces:
+            crc = zlib.crc32(raw, crc)
+            size += len(raw)
+            body.append(segment)
+        body.append(_DEFLATE_FINAL_BLOCK)
+        trailer = struct.pack('<II', crc & 0xffffffff, size & 0xffffffff)
+        return _GZIP_HEADER + b''.join(body) + trailer
+    return b''.join(segment for _, segment in pieces)
+
+
+def render_json(obj) -> bytes:
+    """Serialize exactly like Flask's jsonify (sorted keys, compact separators)"""
+    return json.dumps(obj, sort_keys=True, separators=(',', ':')).encode('utf-8')
@@ -0,0 +1,44 @@
+# conftest.py
+import os
+import shutil
+import pytest
+import database
+from blockchain import Blockchain
+
+
+@pytest.fixture(scope='session')
+def master_key_dir(tmp_path_factory):
+    """Generate the RSA-4096 master keypair once per test session"""
+    root = tmp_path_factory.mktemp('master_key')
+    cwd, db_path = os.getcwd(), database.DB_PATH
+    os.chdir(root)
+    database.DB_PATH = str(root / 'blockchain.db')
+    try:
+        Blockchain()
+    finally:
+        os.chdir(cwd)
+        database.DB_PATH = db_path
+    return root / 'blockchain'
+
+
+@pytest.fixture
+def isolated_env(tmp_path, monkeypatch, master_key_dir):
+    """Run a test in its own directory with a fresh database and a copy of the master key"""
+    shutil.copytree(master_key_dir, tmp_path / 'blockchain')
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(database, 'DB_PATH', str(tmp_path / 'blockchain.db'))
+    return tmp_path
+
+
+@pytest.fixture
+def app_module(isolated_env, monkeypatch):
+    """The Flask app module wired to a blockchain in the isolated environment"""
+    import app as app_module
+
+    monkeypatch.setattr(app_module, 'blockchain', Blockchain(app_module.policy_system, start_miner=False))
+    return app_module
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
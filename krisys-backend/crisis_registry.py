@@ -0,0 +1,109 @@
+# crisis_registry.py
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+import logging
+import database
+from blockchain import Blockchain, PolicySystem
+
+logger = logging.getLogger(__name__)
+
+CRISIS_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')    # also a safe file name
+
+
+class CrisisRegistry:
+    """
+    Hosts many independent crisis chains in one process
+    - Each crisis has its own Blockchain (chain, mempool, policy system, event feed,
+      block cache) stored in its own SQLite file <data_dir>/<crisis_id>.db
+    - Each chain runs its own miner thread on its own policy's block_interval, so a busy
+      crisis mining large blocks does not hold back another crisis's schedule
+    - Crises created earlier are reopened lazily from their files on first access
+    - The master keypair (and so the admin token) is shared by all crises of this host
+    """
+    def __init__(self, data_dir: Optional[str] = None):
+        self._data_dir = data_dir
+        self.chains: Dict[str, Blockchain] = {}
+        self._creating = set()  # crisis IDs whose chain is being built by create()
+        self.lock = threading.Lock()
+
+    @property
+    def data_dir(self) -> str:
+        # Resolved on use so KRISYS_CRISIS_DIR / DB_PATH changes (tests, benchmarks) apply
+        return (self._data_dir or os.getenv('KRISYS_CRISIS_DIR')
+                or os.path.join(os.path.dirname(database.DB_PATH) or '.', 'crises'))
+
+    def db_path(self, crisis_id: str) -> str:
+        if not CRISIS_ID_PATTERN.match(crisis_id):
+            raise ValueError(f"Invalid crisis ID: {crisis_id}")
+        return os.path.join(self.data_dir, f"{crisis_id}.db")
+
+    def register(self, crisis_id: str, blockchain: Blockchain):
+        """Host an already built chain (the process's primary crisis) under crisis_id"""
+        with self.lock:
+            self.chains[crisis_id] = blockchain
+
+    def get(self, crisis_id: str) -> Optional[Blockchain]:
+        """The chain for crisis_id, reopened from disk if needed, or None if unknown"""
+        chain = self.chains.get(crisis_id)
+        if chain is not None or not CRISIS_ID_PATTERN.match(crisis_id):
+            return chain
+
+        path = self.db_path(crisis_id)
+        with self.lock:
+            if crisis_id in self._creating or not os.path.exists(path):
+                return None
+        # Opened outside the lock so other crises stay reachable meanwhile; if two
+        # requests race, the first chain registered wins and the other is dropped
+        # (the crisis policy and its activation are persisted in the chain's own database)
+        chain = Blockchain(PolicySystem(), start_miner=False, db_path=path)
+        with self.lock:
+            if crisis_id not in self.chains:
+                self.chains[crisis_id] = chain
+                logger.info(f"Reopened crisis {crisis_id} from {path}")
+            return self.chains[crisis_id]
+
+    def create(self, crisis_id: str, name: str, organization: str, contact: str,
+               description: str, policy_settings: dict) -> Blockchain:
+        """
+        Start a new crisis chain with its own policy
+        - Raises ValueError for an invalid or already hosted crisis_id
+        - The ID is reserved under the lock; the chain (database, genesis signing) is
+          built outside it, so lookups of other crises are not held up
+        """
+        path = self.db_path(crisis_id)
+        with self.lock:
+            if crisis_id in self.chains or crisis_id in self._creating or os.path.exists(path):
+                raise ValueError(f"Crisis {crisis_id} already exists")
+            self._creating.add(crisis_id)
+
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
+            policy_system = PolicySystem()
+            policy_system.create_crisis_policy(
+                name=name,
+                organization=organization,
+                contact=contact,
+                description=description,
+                policy_settings=policy_settings,
+                policy_id=crisis_id,
+            )
+            policy_system.current_policy = crisis_id
+            chain = Blockchain(policy_system, start_miner=False, db_path=path)
+            with self.lock:
+                self.chains[crisis_id] = chain
+        finally:
+            with self.lock:
+                self._creating.discard(crisis_id)
+
+        logger.info(f"Created crisis {crisis_id} ({name}, {organization}) in {path}")
+        return chain
+
+    def crisis_ids(self) -> List[str]:
+        """Hosted crises: loaded chains plus chains on disk not opened yet"""
+        ids = set(self.chains)
+        if os.path.isdir(self.data_dir):
+            ids.update(name[:-3] for name in os.listdir(self.data_dir)
+                       if name.endswith('.db') and CRISIS_ID_PATTERN.match(name[:-3]))
+        return sorted(ids)
@@ -1,26 +1,75 @@
 # database.py
 import sqlite3
 import os
+import sys
+import time
+from collections import Counter
 from contextlib import contextmanager
 import logging
+from logging_config import configure_logging
+from metrics import DB_LATENCY
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (asynchronous queue pipeline, levels from KRISYS_LOG_* env vars)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 DB_PATH = os.getenv('BLOCKCHAIN_DB_PATH', 'app/blockchain.db')
 
+# Keep only the newest check-in per address (a relay may deliver an older one late)
+UPSERT_LAST_CHECKIN = '''
+INSERT INTO last_checkins (address, station_address, timestamp, block_index, transaction_id)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(address) DO UPDATE SET
+    station_address = excluded.station_address,
+    timestamp = excluded.timestamp,
+    block_index = excluded.block_index,
+    transaction_id = excluded.transaction_id
+WHERE excluded.timestamp >= last_checkins.timestamp
+'''
+
+# Analytics rollups: transaction counts per hour x station x type x priority, and the
+# addresses active in each hour, maintained per mined block (see analytics.py)
+ROLLUP_BUCKET_SECONDS = 3600
+
+def write_rollups(conn, records):
+    """
+    Add a batch of transactions to the rollup tables (caller commits)
+    - records: (timestamp_created, station_address, type_field, priority_level, related_addresses)
+    """
+    counts = Counter()
+    active = set()
+    for timestamp, station, type_field, priority, addresses in records:
+        bucket = int(timestamp // ROLLUP_BUCKET_SECONDS) * ROLLUP_BUCKET_SECONDS
+        counts[(bucket, station, type_field, priority)] += 1
+        active.update((bucket, address) for address in addresses if address)
+    conn.executemany('''
+    INSERT INTO rollup_counts (bucket, station_address, type_field, priority_level, count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(bucket, station_address, type_field, priority_level) DO UPDATE SET count = count + excluded.count
+    ''', [(*key, count) for key, count in counts.items()])
+    conn.executemany('INSERT OR IGNORE INTO rollup_addresses (bucket, address) VALUES (?, ?)', sorted(active))
+
+def db_connection(site=None, path=None):
+    """
+    Open a connection for a with-block
+    - site: label for the query-time metric, defaults to the calling function's name
+    - path: database file of a specific crisis chain, defaults to DB_PATH
+    """
+    return _timed_connection(site or sys._getframe(1).f_code.co_name, path or DB_PATH)
+
 @contextmanager
-def db_connection():
-    conn = sqlite3.connect(DB_PATH)
+def _timed_connection(site, path):
+    start = time.perf_counter()
+    conn = sqlite3.connect(path)
     conn.row_factory = sqlite3.Row  # Enable column access by name
     try:
         yield conn
     finally:
         conn.close()
+        DB_LATENCY.labels(site=site).observe(time.perf_counter() - start)
 
-def init_db():
-    with db_connection() as conn:
+def init_db(path=None):
+    with db_connection(path=path) as conn:
         conn.execute('''
         CREATE TABLE IF NOT EXISTS blocks (
             id INTEGER PRIMARY KEY,
@@ -50,6 +99,111 @@ def init_db():
         )
         ''')
         
+        # Durable transaction_id -> block index lookup for GET /transaction/<id>; unlike
+        # `transactions` its rows stay when a block's epoch is sealed into a segment file
+        index_exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transaction_index'"
+        ).fetchone()
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS transaction_index (
+            transaction_id TEXT PRIMARY KEY,
+            block_index INTEGER NOT NULL
+        ) WITHOUT ROWID
+        ''')
+        if not index_exists:
+            # Backfill once from blocks stored before the index existed
+            conn.execute('''
+            INSERT OR IGNORE INTO transaction_index (transaction_id, block_index)
+            SELECT t.transaction_id, b.block_index FROM transactions t JOIN blocks b ON b.id = t.block_id
+            ''')
+            conn.commit()
+        
+        # Materialized "last seen" view: newest check-in per address, maintained by save_block
+        checkins_exist = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'last_checkins'"
+        ).fetchone()
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS last_checkins (
+            address TEXT PRIMARY KEY,
+            station_address TEXT NOT NULL,
+            timestamp REAL NOT NULL,
+            block_index INTEGER NOT NULL,
+            transaction_id TEXT NOT NULL
+        ) WITHOUT ROWID
+        ''')
+        if not checkins_exist:
+            # Backfill once from the check-ins stored before the view existed
+            rows = conn.execute('''
+            SELECT t.related_addresses, t.station_address, t.timestamp_created, b.block_index, t.transaction_id
+            FROM transactions t JOIN blocks b ON b.id = t.block_id
+            WHERE t.type_field = 'check_in'
+            ''').fetchall()
+            conn.executemany(UPSERT_LAST_CHECKIN, [
+                (address, row['station_address'], row['timestamp_created'], row['block_index'], row['transaction_id'])
+                for row in rows for address in row['related_addresses'].split(',') if address
+            ])
+            conn.commit()
+        
+        # Analytics rollups (see write_rollups)
+        rollups_exist = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rollup_counts'"
+        ).fetchone()
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS rollup_counts (
+            bucket INTEGER NOT NULL,
+            station_address TEXT NOT NULL,
+            type_field TEXT NOT NULL,
+            priority_level INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (bucket, station_address, type_field, priority_level)
+        ) WITHOUT ROWID
+        ''')
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS rollup_addresses (
+            bucket INTEGER NOT NULL,
+            address TEXT NOT NULL,
+            PRIMARY KEY (bucket, address)
+        ) WITHOUT ROWID
+        ''')
+        if not rollups_exist:
+            # Backfill once from the transactions stored before the rollups existed
+            write_rollups(conn, (
+                (row['timestamp_created'], row['station_address'], row['type_field'], row['priority_level'],
+                 row['related_addresses'].split(','))
+                for row in conn.execute(
+                    'SELECT timestamp_created, station_address, type_field, priority_level, related_addresses '
+                    'FROM transactions WHERE block_id IS NOT NULL'
+                ).fetchall()
+            ))
+            conn.commit()
+        
+        # Alerts index by time and priority for GET /alerts (alerts carry no addresses,
+        # so no address lookup finds them)
+        alerts_exist = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'alerts'"
+        ).fetchone()
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS alerts (
+            transaction_id TEXT PRIMARY KEY,
+            timestamp REAL NOT NULL,
+            priority_level INTEGER NOT NULL,
+            station_address TEXT NOT NULL,
+            message_data TEXT NOT NULL,
+            block_index INTEGER NOT NULL
+        )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON alerts (timestamp)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_alerts_priority ON alerts (priority_level, timestamp)')
+        if not alerts_exist:
+            # Backfill once from the alerts stored before the index existed
+            conn.execute('''
+            INSERT OR IGNORE INTO alerts
+            SELECT t.transaction_id, t.timestamp_created, t.priority_level, t.station_address, t.message_data, b.block_index
+            FROM transactions t JOIN blocks b ON b.id = t.block_id
+            WHERE t.type_field = 'alert'
+            ''')
+            conn.commit()
+        
         # Add wallets table
         conn.execute('''
         CREATE TABLE IF NOT EXISTS wallets (
@@ -62,6 +216,47 @@ def init_db():
         )
         ''')
         
+        # Normalized wallet members and devices (the JSON columns above are legacy):
+        # the UNIQUE address gives the address -> wallet reverse index
+        members_exist = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'wallet_members'"
+        ).fetchone()
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS wallet_members (
+            family_id TEXT NOT NULL REFERENCES wallets(family_id),
+            position INTEGER NOT NULL,
+            member_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            address TEXT UNIQUE NOT NULL,
+            PRIMARY KEY (family_id, position)
+        ) WITHOUT ROWID
+        ''')
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS wallet_devices (
+            family_id TEXT NOT NULL REFERENCES wallets(family_id),
+            device_id TEXT NOT NULL,
+            public_key TEXT NOT NULL,
+            registered_at REAL NOT NULL,
+            PRIMARY KEY (family_id, device_id)
+        ) WITHOUT ROWID
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_wallet_devices_device ON wallet_devices (device_id)')
+        if not members_exist:
+            # Migrate once from the JSON columns
+            conn.execute('''
+            INSERT OR IGNORE INTO wallet_members (family_id, position, member_id, name, address)
+            SELECT w.family_id, m.key, json_extract(m.value, '$.id'), json_extract(m.value, '$.name'),
+                   json_extract(m.value, '$.address')
+            FROM wallets w, json_each(w.members) AS m
+            ''')
+            conn.execute('''
+            INSERT OR IGNORE INTO wallet_devices (family_id, device_id, public_key, registered_at)
+            SELECT w.family_id, json_extract(d.value, '$.device_id'), json_extract(d.value, '$.public_key'),
+                   COALESCE(json_extract(d.value, '$.registered_at'), w.created_at)
+            FROM wallets w, json_each(COALESCE(NULLIF(w.devices, ''), '[]')) AS d
+            ''')
+            conn.commit()
+        
         # Add particular crisis details tables
         conn.execute('''
         CREATE TABLE IF NOT EXISTS crises (
@@ -74,6 +269,22 @@ def init_db():
         )
         ''')
         
+        # Crisis policies are persisted as JSON settings on the crisis row (column added after the table shipped)
+        crisis_columns = {row['name'] for row in conn.execute("PRAGMA table_info(crises)")}
+        if 'policy' not in crisis_columns:
+            conn.execute("ALTER TABLE crises ADD COLUMN policy TEXT")
+
+        # Single-row record of the active policy; version is bumped on every change so
+        # each worker can cheaply notice it is out of date and reload
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS policy_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            current_policy TEXT NOT NULL,
+            version INTEGER NOT NULL DEFAULT 1,
+            updated_at REAL DEFAULT (strftime('%s', 'now'))
+        )
+        ''')
+        
         # Add keypairs lookup table, with private keys salted by users' passphrase to unlock and decrypt personal messages locally
         conn.execute('''
         CREATE TABLE IF NOT EXISTS wallet_keys (
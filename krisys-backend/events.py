@@ -0,0 +1,79 @@
+# events.py
+import threading
+from collections import deque
+from typing import Iterable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EventFeed:
+    """
+    Shared, bounded log of chain events for push delivery (SSE / long-poll)
+    - publish() appends one event and wakes every waiting subscriber with a single notify_all
+    - Subscribers only hold a cursor (last seen event id), there are no per-subscriber
+      queues, so publishing costs the same for one or thousands of idle subscribers
+    - Subscribers that fall further behind than max_events get a 'reset' event telling
+      them to re-fetch instead of a partial history
+    """
+    def __init__(self, max_events: int = 1024):
+        self.events = deque(maxlen=max_events)
+        self.sequence = 0
+        self.condition = threading.Condition()
+
+    def publish(self, event_type: str, data: dict, addresses: Iterable[str] = ()) -> int:
+        """
+        Append an event and wake subscribers
+        - addresses: wallet addresses the event concerns, used for subscription filters
+        - Returns: the event id
+        """
+        with self.condition:
+            self.sequence += 1
+            self.events.append({
+                "id": self.sequence,
+                "type": event_type,
+                "data": data,
+                "addresses": frozenset(addresses),
+            })
+            self.condition.notify_all()
+            return self.sequence
+
+    def _since(self, cursor: int) -> list:
+        if not self.events or cursor >= self.sequence:
+            return []
+        oldest = self.events[0]['id']
+        if cursor < oldest - 1:
+            return [{"id": self.sequence, "type": "reset", "data": {}, "addresses": frozenset()}]
+        # Event ids are contiguous, so the cursor maps straight to a deque offset
+        # (indexing from the right end is cheap, and subscribers are usually one event behind)
+        return [self.events[i] for i in range(cursor - oldest + 1, len(self.events))]
+
+    def since(self, cursor: int) -> list:
+        """Events published after cursor, without waiting"""
+        with self.condition:
+            return self._since(cursor)
+
+    def wait(self, cursor: int, timeout: Optional[float] = None) -> list:
+        """Block until an event newer than cursor is published (or timeout), then return them"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.sequence > cursor, timeout)
+            return self._since(cursor)
+
+
+# Delivered to every subscriber whatever their address filter
+BROADCAST_EVENTS = frozenset({'reset', 'alert'})
+
+
+def matches(event: dict, addresses: Optional[set]) -> bool:
+    """Subscription filter: no filter sees everything, otherwise the event must touch one of the addresses"""
+    if not addresses or event['type'] in BROADCAST_EVENTS:
+        return True
+    return not event['addresses'].isdisjoint(addresses)
+
+
+def public_event(event: dict, addresses: Optional[set] = None) -> dict:
+    """Client-facing form of an event, listing only the subscribed addresses it touched"""
+    payload = {"id": event['id'], "type": event['type'], **event['data']}
+    if addresses:
+        payload['addresses'] = sorted(event['addresses'] & addresses)
+    return payload
@@ -0,0 +1,74 @@
+# idempotency.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL = 24 * 3600     # seconds a stored response is replayed for a retried key
+MAX_IDEMPOTENCY_KEYS = 10_000
+
+
+class IdempotencyConflict(Exception):
+    """The key is in flight, or was first used with a different request body"""
+
+
+class IdempotencyCache:
+    """
+    Bounded, expiring store of responses by Idempotency-Key
+    - A retry with the same key and body gets the stored response back without the
+      request being validated, encrypted or queued again
+    - Keys are scoped by the caller (e.g. request path + key) and live for ttl seconds;
+      the oldest keys are evicted first once max_entries is reached
+    - Only this process's retries are covered; across workers the content-addressed
+      transaction ID still rejects the duplicate at admission
+    """
+    def __init__(self, max_entries: int = MAX_IDEMPOTENCY_KEYS, ttl: float = IDEMPOTENCY_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()    # key -> (expires_at, fingerprint, response or None while in flight)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _expire(self, now: float):
+        # Insertion order is expiry order (one ttl for every key)
+        while self.entries and next(iter(self.entries.values()))[0] <= now:
+            self.entries.popitem(last=False)
+
+    def begin(self, key: str, fingerprint: str) -> Optional[Tuple[int, bytes, str]]:
+        """
+        Claim key for a new request, or return the stored (status, body, mimetype)
+        - Raises IdempotencyConflict while the first request is still running, or if
+          the key is reused for a different body
+        """
+        now = time.time()
+        with self.lock:
+            self._expire(now)
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                self.entries[key] = (now + self.ttl, fingerprint, None)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+                return None
+            _, stored_fingerprint, response = entry
+            if stored_fingerprint != fingerprint:
+                raise IdempotencyConflict("Idempotency-Key was already used for a different request")
+            if response is None:
+                raise IdempotencyConflict("A request with this Idempotency-Key is still in progress")
+            self.hits += 1
+            return response
+
+    def complete(self, key: str, status: int, body: bytes, mimetype: str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries[key] = (entry[0], entry[1], (status, body, mimetype))
+
+    def release(self, key: str):
+        """Forget a claimed key (the request failed in a way worth retrying)"""
+        with self.lock:
+            self.entries.pop(key, None)
@@ -0,0 +1,131 @@
+# logging_config.py
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+
+# Environment knobs
+#   KRISYS_LOG_LEVEL=INFO                          root level
+#   KRISYS_LOG_LEVELS=blockchain=WARNING,app=DEBUG per-subsystem (logger name) levels
+#   KRISYS_LOG_FORMAT=json                         one JSON object per line instead of plain text
+#   KRISYS_DEBUG_SAMPLE_RATE=0.1                   fraction of DEBUG records actually written
+DEFAULT_LEVEL = 'INFO'
+DEFAULT_DEBUG_SAMPLE_RATE = 0.1
+LOG_QUEUE_SIZE = 10000
+
+_configured = False
+_configure_lock = threading.Lock()
+_listener = None
+
+# Attributes every LogRecord has; anything else came in through extra= and is structured data
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, including any extra={...} fields"""
+    def format(self, record):
+        payload = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update({k: v for k, v in vars(record).items() if k not in _RECORD_ATTRS})
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Let through only a fraction of DEBUG records so debug logging can stay on under load"""
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never block a request thread on logging: drop records if the writer falls behind"""
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def parse_levels(spec: str) -> dict:
+    """'blockchain=WARNING,app=DEBUG' -> {'blockchain': 'WARNING', 'app': 'DEBUG'}"""
+    levels = {}
+    for item in (spec or '').split(','):
+        if '=' in item:
+            name, level = item.split('=', 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def apply_log_levels(levels: dict):
+    """Set per-subsystem levels, e.g. from the environment or a crisis policy's 'log_levels'"""
+    for name, level in (levels or {}).items():
+        try:
+            logging.getLogger(name).setLevel(level.upper() if isinstance(level, str) else level)
+        except (ValueError, TypeError):
+            logging.getLogger(__name__).warning(f"Ignoring invalid log level {level!r} for {name}")
+
+
+def configure_logging():
+    """
+    Install the asynchronous logging pipeline once per process
+    - Request threads only enqueue records (QueueHandler); a background QueueListener
+      thread does the formatting and I/O
+    - Safe to call from every module, only the first call does anything
+    """
+    global _configured, _listener
+    with _configure_lock:
+        if _configured:
+            return
+        _configured = True
+
+        stream = logging.StreamHandler()
+        if os.getenv('KRISYS_LOG_FORMAT', '').lower() == 'json':
+            stream.setFormatter(JsonFormatter())
+        else:
+            stream.setFormatter(logging.Formatter('%(levelname)s:%(name)s:%(message)s'))
+
+        handler = _DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        handler.addFilter(DebugSampler(float(os.getenv('KRISYS_DEBUG_SAMPLE_RATE', DEFAULT_DEBUG_SAMPLE_RATE))))
+
+        root = logging.getLogger()
+        root.setLevel(os.getenv('KRISYS_LOG_LEVEL', DEFAULT_LEVEL).upper())
+        root.addHandler(handler)
+        apply_log_levels(parse_levels(os.getenv('KRISYS_LOG_LEVELS', '')))
+
+        _listener = logging.handlers.QueueListener(handler.queue, stream, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_stop_listener)    # flush what is still queued on shutdown
+        os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def _stop_listener():
+    _listener.stop()    # looked up at exit: after fork this is the child's own listener
+
+
+def _restart_after_fork():
+    """
+    The listener thread does not survive fork() (e.g. gunicorn --preload workers):
+    give the child a fresh queue, whose lock cannot be held by a dead thread, and its own listener
+    """
+    global _listener
+    if _listener is None:
+        return
+    fresh = queue.Queue(LOG_QUEUE_SIZE)
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, _DroppingQueueHandler):
+            handler.queue = fresh
+    _listener = logging.handlers.QueueListener(fresh, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
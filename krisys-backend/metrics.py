@@ -0,0 +1,220 @@
+# metrics.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds: sub-millisecond admission up to multi-second RSA keygen
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(labelnames, values, extra=None) -> str:
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    __slots__ = ('value', 'lock')
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value):
+        self.value = value
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+
+class _HistogramChild:
+    __slots__ = ('buckets', 'counts', 'sum', 'lock')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)     # last slot is +Inf
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Metric:
+    """
+    A named metric family with optional labels
+    - Unlabelled metrics are used directly (metric.inc(), metric.observe(...))
+    - Labelled metrics go through metric.labels(route='/blockchain').observe(...)
+    """
+    kind = 'untyped'
+    child_class = _CounterChild
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children = {}
+        self.lock = threading.Lock()
+
+    def _new_child(self):
+        return self.child_class()
+
+    def labels(self, *values, **kwargs):
+        key = tuple(str(v) for v in values) or tuple(str(kwargs[name]) for name in self.labelnames)
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.setdefault(key, self._new_child())
+        return child
+
+    def __getattr__(self, attr):
+        # Unlabelled shortcut: forward inc/set/observe/time to the single child
+        if attr in ('inc', 'set', 'dec', 'observe', 'time') and not self.labelnames:
+            return getattr(self.labels(), attr)
+        raise AttributeError(attr)
+
+    def samples(self):
+        for key, child in list(self.children.items()):
+            yield self.name, _format_labels(self.labelnames, key), child.value
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+    child_class = _GaugeChild
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def samples(self):
+        for key, child in list(self.children.items()):
+            with child.lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield f'{self.name}_bucket', _format_labels(self.labelnames, key, ('le', _format_value(bound))), cumulative
+            yield f'{self.name}_sum', _format_labels(self.labelnames, key), total
+            yield f'{self.name}_count', _format_labels(self.labelnames, key), cumulative
+
+
+class CallbackMetric(Metric):
+    """
+    Gauge/counter whose value is read at scrape time, for state that already exists
+    elsewhere (mempool length, cache hit counters) so the hot path pays nothing
+    - callback returns a number, or a dict of {label value tuple: number}
+    """
+    def __init__(self, name, documentation, callback: Callable, kind='gauge', labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def samples(self):
+        try:
+            value = self.callback()
+        except Exception as e:
+            logger.error(f"Metric callback {self.name} failed: {str(e)}")
+            return
+        values = value if isinstance(value, dict) else {(): value}
+        for key, sample in values.items():
+            yield self.name, _format_labels(self.labelnames, key), sample
+
+
+class Registry:
+    """Process-wide collection of metrics, rendered in the Prometheus text format"""
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None and not isinstance(metric, CallbackMetric):
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def callback(self, name, documentation, callback, kind='gauge', labelnames=()) -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, callback, kind, labelnames))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# Hot-path instruments shared by blockchain.py, database.py and app.py
+REQUEST_LATENCY = REGISTRY.histogram(
+    'krisys_http_request_duration_seconds', 'HTTP request latency by route', ('method', 'route', 'status'))
+TX_ADMISSION_LATENCY = REGISTRY.histogram(
+    'krisys_tx_admission_duration_seconds', 'Time to validate and admit a batch of transactions to the mempool')
+TX_ADMITTED = REGISTRY.counter(
+    'krisys_tx_admitted_total', 'Transactions admitted to or rejected from the mempool', ('result',))
+BLOCK_PHASE_LATENCY = REGISTRY.histogram(
+    'krisys_block_phase_duration_seconds', 'Block build/sign/persist durations inside mine_and_save', ('phase',))
+PGP_LATENCY = REGISTRY.histogram(
+    'krisys_pgp_duration_seconds', 'PGP operation durations', ('operation',))
+DB_LATENCY = REGISTRY.histogram(
+    'krisys_sqlite_duration_seconds', 'Time a SQLite connection is held, by call site', ('site',))
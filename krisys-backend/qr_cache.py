@@ -0,0 +1,67 @@
+# qr_cache.py
+import base64
+import threading
+from collections import OrderedDict
+from io import BytesIO
+import logging
+import qrcode
+import qrcode.image.svg
+
+logger = logging.getLogger(__name__)
+
+# Supported output formats -> content type
+QR_FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+
+def render_qr(address: str, fmt: str = 'png') -> bytes:
+    """Render one address as a QR image in the given format"""
+    buffered = BytesIO()
+    if fmt == 'svg':
+        qrcode.make(address, image_factory=qrcode.image.svg.SvgPathImage).save(buffered)
+    else:
+        qrcode.make(address).save(buffered, "PNG")
+    return buffered.getvalue()
+
+
+class QRCache:
+    """
+    Bounded LRU of rendered QR images keyed by (address, format)
+    - A wallet address never changes, so its image is rendered once and reused
+      for every card print / reprint at the registration desk
+    - Rendering happens outside the lock; two threads racing on the same miss
+      simply render the same bytes twice
+    """
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()    # (address, fmt) -> image bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, address: str, fmt: str = 'png') -> bytes:
+        if fmt not in QR_FORMATS:
+            raise ValueError(f"Unsupported QR format: {fmt}")
+        key = (address, fmt)
+        with self.lock:
+            image = self.entries.get(key)
+            if image is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+
+        image = render_qr(address, fmt)
+        with self.lock:
+            self.entries[key] = image
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return image
+
+    def data_uri(self, address: str, fmt: str = 'png') -> str:
+        """Image as a data: URI, the shape the JSON endpoints have always returned"""
+        encoded = base64.b64encode(self.get(address, fmt)).decode('utf-8')
+        return f"data:{QR_FORMATS[fmt]};base64,{encoded}"
@@ -0,0 +1,229 @@
+# replication.py
+"""
+Pull-based chain replication: a read replica follows a primary KriSYS backend.
+
+    python replication.py follow --primary http://primary:5000 --interval 10
+
+Header first: the follower reads GET /blockchain/head, then fetches the missing range
+with GET /blocks?start=&end= in batches. Every block is checked before it is applied:
+its recomputed hash, its previous_hash link to the block before it, and the master-key
+signature over its header. The primary's public key is pinned on first contact.
+
+Wallets are not on the chain, so with KRISYS_REPLICATION_TOKEN set (the same value as on
+the primary) the follower also copies the public wallet rows from GET /replication/wallets:
+members, wallet public keys and devices. Wallet private keys never leave the primary.
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+import time
+import urllib.request
+import warnings
+from typing import Callable, List, Optional
+import logging
+import pgpy
+from blockchain import Block, Blockchain
+from metrics import PGP_LATENCY, REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 200    # blocks per /blocks request (the primary caps ranges at MAX_BLOCK_RANGE)
+DEFAULT_INTERVAL = 10       # seconds between head checks when caught up
+PINNED_KEY_FILE = os.path.join('blockchain', 'primary_public_key.asc')
+
+REPLICATED_BLOCKS = REGISTRY.counter(
+    'krisys_replicated_blocks_total', 'Blocks verified and applied from the primary')
+
+
+class ReplicationError(Exception):
+    """The primary served something that does not verify; nothing from that batch is applied"""
+
+
+def verify_signature(block: Block, public_key: pgpy.PGPKey) -> bool:
+    try:
+        signature = pgpy.PGPSignature.from_blob(block.signature)
+    except Exception:
+        return False
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')     # pgpy warns about unimplemented self-sig checks
+        with PGP_LATENCY.labels(operation='verify').time():
+            return bool(public_key.verify(block.signing_header(), signature))
+
+
+def verify_block(block: Block, previous: Optional[Block], public_key: pgpy.PGPKey):
+    """Raise ReplicationError unless block is a correctly signed successor of previous"""
+    expected_index = previous.block_index + 1 if previous else 0
+    if block.block_index != expected_index:
+        raise ReplicationError(f"Expected block #{expected_index}, got #{block.block_index}")
+    if block.previous_hash != (previous.hash if previous else "0"):
+        raise ReplicationError(f"Block #{block.block_index} does not link to the previous block")
+    if block.calculate_hash() != block.hash:
+        raise ReplicationError(f"Block #{block.block_index} hash mismatch")
+    if not block.signature or not verify_signature(block, public_key):
+        raise ReplicationError(f"Block #{block.block_index} has an invalid master-key signature")
+
+
+def http_fetch(base_url: str, replication_token: Optional[str] = None) -> Callable[[str], bytes]:
+    """GET base_url + path, asking for gzip (blocks are precompressed on the primary)"""
+    headers = {'Accept-Encoding': 'gzip'}
+    if replication_token:
+        headers['X-Replication-Token'] = replication_token
+    def fetch(path: str) -> bytes:
+        request = urllib.request.Request(base_url.rstrip('/') + path, headers=headers)
+        with urllib.request.urlopen(request, timeout=30) as response:
+            body = response.read()
+            if response.headers.get('Content-Encoding') == 'gzip':
+                body = gzip.decompress(body)
+            return body
+    return fetch
+
+
+class Follower:
+    """
+    Keeps a replica Blockchain caught up with a primary
+    - fetch: callable(path) -> response bytes (HTTP by default, a test client in tests)
+    - public_key: armored primary key; defaults to the pinned key file, or the key the
+      primary announces on /crisis the first time (trust on first use, then pinned)
+    - replication_token: enables wallet sync (defaults to KRISYS_REPLICATION_TOKEN); without
+      it only blocks are replicated and the replica's wallet routes return 404
+    """
+    def __init__(self, blockchain: Blockchain, primary_url: str = '', batch_size: int = DEFAULT_BATCH_SIZE,
+                 fetch: Optional[Callable[[str], bytes]] = None, public_key: Optional[str] = None,
+                 replication_token: Optional[str] = None):
+        self.blockchain = blockchain
+        self.primary_url = primary_url
+        self.batch_size = batch_size
+        self.replication_token = replication_token or os.getenv('KRISYS_REPLICATION_TOKEN')
+        self.fetch = fetch or http_fetch(primary_url, self.replication_token)
+        if not self.replication_token:
+            logger.warning("KRISYS_REPLICATION_TOKEN is not set: wallets will not be replicated")
+        self.armored_key = public_key
+        self.public_key = None
+        self.thread = None
+        self._thread_pid = None
+
+    def _get_json(self, path: str):
+        return json.loads(self.fetch(path))
+
+    def _pin_primary(self):
+        """Adopt the primary's crisis metadata and pin its master public key"""
+        crisis = self._get_json('/crisis')
+        announced = crisis['block_public_key']
+        if self.armored_key is None and os.path.exists(PINNED_KEY_FILE):
+            with open(PINNED_KEY_FILE) as f:
+                self.armored_key = f.read()
+        if self.armored_key is None:
+            os.makedirs(os.path.dirname(PINNED_KEY_FILE), exist_ok=True)
+            with open(PINNED_KEY_FILE, 'w') as f:
+                f.write(announced)
+            self.armored_key = announced
+            logger.warning(f"Pinned primary public key from {self.primary_url or 'primary'} to {PINNED_KEY_FILE}")
+        if announced.strip() != self.armored_key.strip():
+            raise ReplicationError("Primary announces a different master public key than the pinned one")
+
+        self.public_key = pgpy.PGPKey()
+        self.public_key.parse(self.armored_key)
+        self.blockchain.master_public_key = self.armored_key
+        self.blockchain.crisis_metadata.update({
+            "id": crisis['crisis_id'],
+            "name": crisis['name'],
+            "organization": crisis['organization'],
+            "contact": crisis['contact'],
+            "description": crisis['description'],
+            "created_at": crisis['created_at'],
+            "public_key": self.armored_key,
+        })
+
+    def sync_wallets(self) -> int:
+        """Copy wallets and devices added on the primary since the last sync, returns the wallet count"""
+        wallets = self.blockchain.wallets
+        copied = 0
+        while True:
+            after, devices_since = wallets.replication_cursor()
+            page = self._get_json(f'/replication/wallets?after={after}&devices_since={devices_since!r}')
+            wallets.apply_replicated_wallets(page['wallets'], page['devices'])
+            copied += len(page['wallets'])
+            if not page['more']:
+                break
+        if copied:
+            logger.info(f"Replicated {copied} wallets")
+        return copied
+
+    def sync_once(self) -> int:
+        """Catch up to the primary's current head, returns the number of blocks applied"""
+        if self.public_key is None:
+            self._pin_primary()
+        if self.replication_token:
+            self.sync_wallets()     # before blocks, so new transactions never reference an unknown wallet
+
+        head = self._get_json('/blockchain/head')
+        chain = self.blockchain.chain
+        if len(chain) > head['block_index'] + 1:
+            raise ReplicationError(f"Replica is ahead of the primary (head #{head['block_index']})")
+        if len(chain) == head['block_index'] + 1:
+            if chain[-1].hash != head['hash']:
+                raise ReplicationError(f"Replica diverged from the primary at block #{head['block_index']}")
+            return 0
+
+        applied = 0
+        while len(chain) <= head['block_index']:
+            start = len(chain)
+            end = min(start + self.batch_size, head['block_index'] + 1)
+            blocks: List[Block] = [Block.from_dict(data) for data in self._get_json(f'/blocks?start={start}&end={end}')]
+            if not blocks:
+                raise ReplicationError(f"Primary returned no blocks for range {start}-{end}")
+
+            previous = chain[-1] if chain else None
+            for block in blocks:
+                verify_block(block, previous, self.public_key)
+                previous = block
+
+            self.blockchain.apply_replicated(blocks)
+            REPLICATED_BLOCKS.inc(len(blocks))
+            applied += len(blocks)
+
+        self.blockchain.seal_cold_blocks()
+        logger.info(f"Replicated {applied} blocks, now at #{self.blockchain.chain[-1].block_index}")
+        return applied
+
+    def run(self, interval: float = DEFAULT_INTERVAL):
+        while True:
+            try:
+                self.sync_once()
+            except ReplicationError as e:
+                logger.critical(f"Replication halted: {str(e)}")
+                return
+            except Exception as e:
+                logger.error(f"Replication error: {str(e)}")
+            time.sleep(interval)
+
+    def start(self, interval: float = DEFAULT_INTERVAL):
+        """Run in a background thread, once per process (safe after fork, like the miner)"""
+        if self._thread_pid == os.getpid():
+            return
+        self._thread_pid = os.getpid()
+        self.thread = threading.Thread(target=self.run, args=(interval,), daemon=True)
+        self.thread.start()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KriSYS read replica follower")
+    sub = parser.add_subparsers(dest="command", required=True)
+    follow = sub.add_parser("follow", help="replicate a primary into this directory's database")
+    follow.add_argument("--primary", required=True, help="base URL of the primary, e.g. http://primary:5000")
+    follow.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    follow.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    follow.add_argument("--once", action="store_true", help="catch up once and exit")
+    args = parser.parse_args(argv)
+
+    follower = Follower(Blockchain(start_miner=False, replica=True), args.primary, args.batch_size)
+    if args.once:
+        follower.sync_once()
+    else:
+        follower.run(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import base64
+import time
+
+
+def _alert(client, admin, message, priority):
+    response = client.post('/admin/alert', headers=admin, json={"message": message, "priority": priority})
+    assert response.status_code == 201
+    return response.json['transaction_id']
+
+
+def test_alert_feed_includes_mined_and_pending(app_module, client):
+    admin = {'X-Admin-Token': base64.b64encode(app_module.get_admin_token().encode()).decode()}
+    since = time.time() - 1
+    cursor = client.get('/events/poll').json['cursor']
+
+    first = _alert(client, admin, "Evacuate zone A", 1)
+    app_module.blockchain.mine_and_save()
+    time.sleep(0.01)    # alerts share the ADMIN_ALERT station and are created a moment apart
+    second = _alert(client, admin, "Water at shelter 3", 3)
+
+    alerts = client.get(f'/alerts?since={since}').json['alerts']
+    assert [(a['transaction_id'], a['pending']) for a in alerts] == [(first, False), (second, True)]
+    assert alerts[0]['block_index'] == 1 and alerts[0]['message'] == "Evacuate zone A"
+
+    urgent = client.get(f'/alerts?since={since}&max_priority=2').json['alerts']
+    assert [a['transaction_id'] for a in urgent] == [first]
+    assert client.get(f'/alerts?since={time.time() + 60}').json['alerts'] == []
+    assert client.get('/alerts?since=yesterday').status_code == 400
+
+    # Pushed to every subscriber on admission, whatever their address filter
+    events = client.get(f'/events/poll?since={cursor}&timeout=0&address=family-00000001').json['events']
+    assert [e['transaction_id'] for e in events if e['type'] == 'alert'] == [first, second]
+
+
+def test_alerts_mined_but_not_yet_saved_stay_visible(app_module, client):
+    admin = {'X-Admin-Token': base64.b64encode(app_module.get_admin_token().encode()).decode()}
+    since = time.time() - 1
+    chain = app_module.blockchain
+    alert_id = _alert(client, admin, "Bridge closed", 1)
+
+    block = chain.mine_block()    # signing and saving still to come
+    alerts = client.get(f'/alerts?since={since}').json['alerts']
+    assert [(a['transaction_id'], a['pending'], a['block_index']) for a in alerts] == [(alert_id, False, block.block_index)]
+
+    block.signature = chain.sign_block(block)
+    chain.save_block(block)
+    alerts = client.get(f'/alerts?since={since}').json['alerts']
+    assert [(a['transaction_id'], a['pending']) for a in alerts] == [(alert_id, False)]
+    assert chain.unsaved_alerts == {}
@@ -0,0 +1,76 @@
+import base64
+import io
+import time
+import pytest
+import analytics
+from blockchain import Transaction
+
+HOUR = 3600
+START = 1_700_000_000 // HOUR * HOUR
+
+
+def _tx(station, type_field, priority, offset, address="addr-1"):
+    return Transaction(timestamp_created=START + offset, station_address=station, message_data="x",
+                       related_addresses=[address], type_field=type_field, priority_level=priority)
+
+
+@pytest.fixture
+def admin_client(app_module):
+    chain = app_module.blockchain
+    chain.add_transactions([
+        _tx("SHELTER_1", "check_in", 1, 10),
+        _tx("SHELTER_1", "check_in", 1, 20, "addr-2"),
+        _tx("HOSPITAL_2", "check_in", 1, 30),
+        _tx("ADMIN_ALERT", "alert", 2, HOUR + 5, "addr-3"),
+    ], rate_limit_override=True)
+    chain.mine_and_save()
+    chain.add_transactions([_tx("SHELTER_1", "check_in", 1, HOUR + 10)], rate_limit_override=True)
+    chain.mine_and_save()
+    admin = {'X-Admin-Token': base64.b64encode(app_module.get_admin_token().encode()).decode()}
+    return app_module.app.test_client(), admin
+
+
+def test_checkins_per_station_per_hour(admin_client):
+    client, admin = admin_client
+    window = f"since={START}&until={START + 2 * HOUR}"
+    body = client.get(f'/admin/analytics?{window}&type=check_in&group_by=station', headers=admin).json
+    assert [(r['bucket'], r['station'], r['count']) for r in body['series']] == [
+        (START, "HOSPITAL_2", 1), (START, "SHELTER_1", 2), (START + HOUR, "SHELTER_1", 1)]
+    assert [(a['bucket'], a['active_addresses']) for a in body['active']] == [(START, 2), (START + HOUR, 2)]
+
+    daily = client.get(f'/admin/analytics?{window}&bucket={2 * HOUR}&group_by=type', headers=admin).json
+    assert {(r['type'], r['count']) for r in daily['series']} == {("check_in", 4), ("alert", 1)}
+    assert client.get(f'/admin/analytics?group_by=color', headers=admin).status_code == 400
+    assert client.get(f'/admin/analytics?bucket=60', headers=admin).status_code == 400
+    assert client.get('/admin/analytics').status_code == 401
+
+
+def test_columnar_export(admin_client):
+    client, admin = admin_client
+    response = client.get(f'/admin/analytics/export?since={START}&until={START + 2 * HOUR}', headers=admin)
+    if analytics.numpy is None:
+        assert response.status_code == 501
+        return
+    columns = analytics.numpy.load(io.BytesIO(response.data))
+    assert len(columns['timestamp']) == 5
+    assert list(columns['type_names']) == ["check_in", "alert"]
+
+
+def test_export_window_applies_to_transactions_not_blocks(app_module, admin_client):
+    client, admin = admin_client
+    ahead = time.time() + 600     # station clock ahead: created after its block was mined
+    chain = app_module.blockchain
+    chain.add_transactions([Transaction(ahead, "FIELD_1", "x", ["addr-9"], "check_in", 1)], rate_limit_override=True)
+    chain.mine_and_save()
+
+    response = client.get(f'/admin/analytics/export?since={ahead - 1}&until={ahead + 1}', headers=admin)
+    if analytics.numpy is None:
+        assert response.status_code == 501
+        return
+    columns = analytics.numpy.load(io.BytesIO(response.data))
+    assert list(columns['timestamp']) == [ahead]
+    assert response.headers['X-Next-Block'] == str(len(chain.chain))
+
+    response = client.get(f'/admin/analytics/export?since=0&until={ahead + 1}&since_block={len(chain.chain)}',
+                          headers=admin)
+    assert len(analytics.numpy.load(io.BytesIO(response.data))['timestamp']) == 0
@@ -0,0 +1,64 @@
+import time
+import pytest
+import blockchain as blockchain_module
+from blockchain import MempoolFullError, Transaction
+
+
+@pytest.fixture
+def small_mempool(monkeypatch):
+    monkeypatch.setattr(blockchain_module, 'MEMPOOL_HIGH_COUNT', 2)
+
+
+def _message(station, priority=3):
+    return {
+        "timestamp_created": time.time(),
+        "station_address": station,
+        "message_data": "Need blankets",
+        "related_addresses": ["family-00000001"],
+        "type_field": "message",
+        "priority_level": priority,
+    }
+
+
+def test_low_priority_is_throttled_above_the_high_watermark(app_module, client, small_mempool):
+    chain = app_module.blockchain
+    assert client.post('/transaction', json=_message("STATION_A")).status_code == 201
+    assert client.post('/transaction', json=_message("STATION_B")).status_code == 201
+
+    payload = _message("STATION_C")
+    throttled = client.post('/transaction', json=payload, headers={'Idempotency-Key': 'k1'})
+    assert throttled.status_code == 429
+    assert int(throttled.headers['Retry-After']) >= 1
+    assert client.get('/mempool').json['saturated'] is True
+
+    # Priority-1 traffic and essential types are still admitted
+    assert client.post('/transaction', json=_message("STATION_D", priority=1)).status_code == 201
+    chain.add_transaction(Transaction(time.time(), "STATION_E", "Check-in", ["addr-1"], "check_in", 4))
+    with pytest.raises(MempoolFullError):
+        chain.add_transaction(Transaction(time.time(), "STATION_F", "Roof damage", ["addr-1"], "damage_report", 4))
+
+    chain.mine_and_save()
+    assert client.get('/mempool').json['saturated'] is False
+    retried = client.post('/transaction', json=payload, headers={'Idempotency-Key': 'k1'})
+    assert retried.status_code == 201     # the 429 was not stored for replay
+
+
+def test_batch_rejections_carry_retry_after(client, small_mempool):
+    batch = [_message(f"STATION_{i}") for i in range(3)]
+    response = client.post('/transactions/batch', json=batch)
+    assert [r['status'] for r in response.json['results']] == ["accepted", "accepted", "rejected"]
+    assert response.json['results'][2]['error'] == blockchain_module.MEMPOOL_FULL_ERROR
+    assert 'Retry-After' in response.headers
+
+
+def test_retry_after_follows_the_measured_block_rate(app_module):
+    chain = app_module.blockchain
+    assert chain.retry_after() == chain.block_interval    # nothing measured yet
+
+    now = time.time()
+    chain.mined_history.extend([(now - 25, 10), (now - 15, 30), (now - 5, 20)])
+    assert chain.mining_interval() == pytest.approx(10)
+    assert chain.retry_after() == 5
+    status = chain.mempool_status()
+    assert status['mining']['tx_per_second'] == pytest.approx(2.5)
+    assert status['high_watermark']['transactions'] == blockchain_module.MEMPOOL_HIGH_COUNT
@@ -0,0 +1,59 @@
+import json
+import time
+
+
+def _message(station, text="Queued while offline", **extra):
+    payload = {
+        "timestamp_created": time.time(),
+        "station_address": station,
+        "message_data": text,
+        "related_addresses": ["family-00000001"],
+        "type_field": "message",
+        "priority_level": 5,
+        "relay_hash": "relay-abc",
+    }
+    payload.update(extra)
+    return payload
+
+
+def test_batch_reports_per_item_status(app_module, client):
+    good = [_message(f"device_{i}") for i in range(3)]
+    missing = {"station_address": "device_x", "type_field": "message"}
+    bad_type = _message("device_y", type_field="damage_report")
+    bad_priority = _message("device_z", priority_level=99)
+
+    response = client.post('/transactions/batch', json=good + [missing, bad_type, bad_priority, good[0]])
+    body = response.json
+
+    assert response.status_code == 200
+    assert body['accepted'] == 3
+    assert [r['status'] for r in body['results']] == ['accepted'] * 3 + ['rejected'] * 4
+    assert body['results'][3]['error'].startswith('Missing field')
+    assert body['results'][6]['error'] == 'Duplicate transaction ID'
+    pending = {tx.transaction_id for tx in app_module.blockchain.pending_transactions}
+    assert pending == {r['transaction_id'] for r in body['results'][:3]}
+
+
+def test_batch_applies_rate_limit_within_batch(app_module, client):
+    now = time.time()
+    batch = [_message("device_1", timestamp_created=now), _message("device_1", timestamp_created=now + 1)]
+
+    limited = client.post('/transactions/batch', json={"transactions": batch}).json
+    assert [r['status'] for r in limited['results']] == ['accepted', 'rejected']
+
+    batch = [_message("device_2", timestamp_created=now), _message("device_2", timestamp_created=now + 1)]
+    override = client.post('/transactions/batch', json=batch, headers={'X-Dev-Rate-Override': 'true'}).json
+    assert override['accepted'] == 2
+
+
+def test_batch_accepts_ndjson(app_module, client):
+    lines = "\n".join(json.dumps(_message(f"device_{i}")) for i in range(4))
+    response = client.post('/transactions/batch', data=lines, content_type='application/x-ndjson')
+
+    assert response.json['accepted'] == 4
+    assert len(app_module.blockchain.pending_transactions) == 4
+
+
+def test_batch_rejects_empty_or_malformed(client):
+    assert client.post('/transactions/batch', json=[]).status_code == 400
+    assert client.post('/transactions/batch', data="{not json", content_type='application/x-ndjson').status_code == 400
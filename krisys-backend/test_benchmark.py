@@ -0,0 +1,17 @@
+import json
+import benchmark
+
+
+def test_core_and_http_benchmarks_smoke(tmp_path):
+    core = benchmark.bench_core([50], repeat=4)
+    assert set(core['50']) >= {'add_transaction', 'calculate_hash', 'save_block', 'sign_block',
+                               'load_chain', 'address_lookup'}
+
+    http = benchmark.bench_http(requests_per_endpoint=5, concurrency=2, chain_size=20)
+    assert all(result['errors'] == 0 for result in http.values())
+
+    output = tmp_path / 'results.json'
+    args = benchmark.argparse.Namespace(command='core')
+    benchmark.write_results(str(output), 'core', core, args)
+    benchmark.write_results(str(output), 'http', http, args)
+    assert set(json.loads(output.read_text())) == {'meta', 'core', 'http'}
@@ -0,0 +1,77 @@
+import json
+import time
+from blockchain import Transaction
+from block_cache import BlockCache, serialize_block
+from compression import render_json
+
+
+def _mine_messages(blockchain, count):
+    for i in range(count):
+        blockchain.add_transaction(Transaction(
+            timestamp_created=time.time(),
+            station_address=f"station_{i}",
+            message_data=f"Message {i} é☃",
+            related_addresses=[f"family-{i:08x}"],
+            type_field="message",
+            priority_level=5,
+        ), rate_limit_override=True)
+    blockchain.mine_and_save()
+
+
+def test_serialized_block_matches_jsonify(app_module):
+    blockchain = app_module.blockchain
+    _mine_messages(blockchain, 3)
+
+    for block in blockchain.chain:
+        cached = serialize_block(block)
+        assert cached.raw == render_json(block.to_dict())
+        assert [bytes(tx) for tx in cached.transactions()] == [render_json(tx.to_dict()) for tx in block.transactions]
+
+
+def test_save_block_prerenders(app_module):
+    blockchain = app_module.blockchain
+    _mine_messages(blockchain, 2)
+
+    head = blockchain.chain[-1]
+    assert head.hash in blockchain.block_cache.entries
+    assert 'gzip' in blockchain.block_cache.entries[head.hash].segments
+
+
+def test_debug_endpoints_use_cached_buffers(app_module, client, monkeypatch):
+    blockchain = app_module.blockchain
+    _mine_messages(blockchain, 2)
+    expected_chain = [block.to_dict() for block in blockchain.chain]
+    expected_txs = [tx for block in expected_chain for tx in block['transactions']]
+
+    # Once cached, responses must not re-serialize anything
+    blockchain.block_cache.render_chain(blockchain.chain)
+    monkeypatch.setattr(Transaction, 'to_dict', lambda self: (_ for _ in ()).throw(AssertionError))
+
+    assert json.loads(client.get('/debug/blockchain').data) == expected_chain
+    assert json.loads(client.get('/debug/transactions').data) == expected_txs
+    assert json.loads(client.get('/blockchain').data) == expected_chain
+
+
+def test_cache_is_bounded(app_module):
+    blockchain = app_module.blockchain
+    for _ in range(3):
+        _mine_messages(blockchain, 1)
+
+    cache = BlockCache(max_bytes=1, precompress=())
+    for block in blockchain.chain:
+        cache.get(block)
+    assert len(cache.entries) == 1
+    assert cache.current_bytes == cache.entries[blockchain.chain[-1].hash].size
+
+
+def test_lazy_encoding_fill_is_accounted(app_module):
+    blockchain = app_module.blockchain
+    _mine_messages(blockchain, 2)
+
+    cache = BlockCache(precompress=())
+    for block in blockchain.chain:
+        cache.store(block)
+    for block in blockchain.chain:
+        assert 'gzip' in cache.get(block, 'gzip').segments     # hit without the encoding
+    assert cache.current_bytes == sum(entry.size for entry in cache.entries.values())
+    assert cache.misses == len(blockchain.chain)
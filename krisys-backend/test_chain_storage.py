@@ -0,0 +1,94 @@
+import os
+import time
+import database
+from blockchain import Block, Blockchain, Transaction
+
+
+def _append_block(blockchain, timestamp, address):
+    tx = Transaction(timestamp_created=timestamp, station_address="station", message_data="m",
+                     related_addresses=[address], type_field="message", priority_level=1)
+    last = blockchain.chain[-1]
+    block = Block(last.block_index + 1, timestamp, [tx], last.hash, signature="TEST")
+    blockchain.chain.append(block)
+    blockchain.save_block(block)
+
+
+def _old_chain(now):
+    """Genesis plus two blocks in each of the epochs now-3 .. now (100s epochs)"""
+    blockchain = Blockchain(start_miner=False)
+    blockchain.chain.epoch_seconds, blockchain.chain.hot_epochs = 100, 2
+    blockchain.chain.hot[0].timestamp = now - 1000  # genesis, in memory only
+    for i in range(1, 9):
+        _append_block(blockchain, now - 300 + ((i - 1) // 2) * 100 + i, f"addr-{i}")
+    return blockchain
+
+
+def test_seal_moves_old_epochs_to_segments(isolated_env):
+    now = (time.time() // 100) * 100
+    blockchain = _old_chain(now)
+    hashes = [block.hash for block in blockchain.chain]
+
+    assert blockchain.seal_cold_blocks(now) == 5   # genesis + 2 epochs of 2, current and previous stay hot
+    assert [(s.start, s.end) for s in blockchain.chain.segments] == [(0, 0), (1, 2), (3, 4)]
+    assert [block.block_index for block in blockchain.chain.hot] == [5, 6, 7, 8]
+    assert [block.hash for block in blockchain.chain] == hashes
+    assert blockchain.chain[-1].hash == hashes[-1]
+
+    with database.db_connection() as conn:
+        indices = [row['block_index'] for row in conn.execute('SELECT block_index FROM blocks ORDER BY block_index')]
+    assert indices == [5, 6, 7, 8]
+    segment = blockchain.chain.segments[1]
+    assert oct(os.stat(segment.path).st_mode & 0o777) == oct(0o444)
+
+
+def test_address_lookup_opens_only_matching_segments(isolated_env):
+    now = (time.time() // 100) * 100
+    blockchain = _old_chain(now)
+    blockchain.seal_cold_blocks(now)
+    blockchain.chain._loaded.clear()
+
+    blocks = blockchain.chain.blocks_for_addresses(["addr-3", "addr-8"])
+    assert [block.block_index for block in blocks] == [3, 8]
+    assert list(blockchain.chain._loaded) == [3]
+
+
+def test_blocks_from_skips_segments_before_the_cursor(isolated_env):
+    now = (time.time() // 100) * 100
+    blockchain = _old_chain(now)
+    blockchain.seal_cold_blocks(now)
+    blockchain.chain._loaded.clear()
+
+    assert [block.block_index for block in blockchain.chain.blocks_from(4)] == [4, 5, 6, 7, 8]
+    assert list(blockchain.chain._loaded) == [3]
+    assert list(blockchain.chain.blocks_from(9)) == []
+
+
+def test_reload_reads_segments_lazily(isolated_env):
+    now = (time.time() // 100) * 100
+    blockchain = _old_chain(now)
+    blockchain.seal_cold_blocks(now)
+    hashes = [block.hash for block in blockchain.chain]
+
+    reloaded = Blockchain(start_miner=False)
+    assert len(reloaded.chain) == len(hashes)
+    assert len(reloaded.chain.hot) == 4
+    assert not reloaded.chain._loaded
+    assert [block.hash for block in reloaded.chain] == hashes
+    assert reloaded.chain[1].transactions[0].related_addresses == ["addr-1"]
+
+
+def test_iteration_decodes_each_segment_once(isolated_env, monkeypatch):
+    import chain_storage
+    now = (time.time() // 100) * 100
+    blockchain = _old_chain(now)
+    hashes = [block.hash for block in blockchain.chain]
+    blockchain.seal_cold_blocks(now)
+    blockchain.chain.max_loaded_segments = 1
+    blockchain.chain._loaded.clear()
+
+    decodes = []
+    decompress = chain_storage.gzip.decompress
+    monkeypatch.setattr(chain_storage.gzip, 'decompress', lambda data: decodes.append(1) or decompress(data))
+    assert [block.hash for block in blockchain.chain] == hashes
+    assert len(decodes) == len(blockchain.chain.segments)
+    assert [blockchain.chain[i].hash for i in (0, 2, 4, 5)] == [hashes[i] for i in (0, 2, 4, 5)]
@@ -0,0 +1,86 @@
+import hashlib
+import time
+import pytest
+from database import db_connection
+
+API_KEY = "station-secret"
+
+
+@pytest.fixture
+def station(app_module):
+    """An active station with a known API key"""
+    crisis_id = app_module.blockchain.crisis_metadata['id']
+    app_module.ensure_station(crisis_id, "FIELD_001", "Field station", "shelter")
+    with db_connection() as conn:
+        conn.execute("UPDATE stations SET api_key_hash = ?, status = 'active' WHERE station_id = ?",
+                     (hashlib.sha256(API_KEY.encode()).hexdigest(), "FIELD_001"))
+        conn.commit()
+    return "FIELD_001"
+
+
+def _upload(client, station, scans, api_key=API_KEY):
+    return client.post('/checkin/batch', json={"station_id": station, "scans": scans},
+                       headers={'X-Station-API-Key': api_key})
+
+
+def test_offline_queue_is_admitted_at_once(app_module, client, station):
+    now = time.time()
+    scans = [
+        {"address": "addr-1", "scanned_at": now - 3600},
+        {"address": "addr-2", "scanned_at": now - 3590},
+        {"address": "addr-1", "scanned_at": now - 3500},    # double scan of the same person
+        {"address": "addr-1", "scanned_at": now - 60},
+        {"address": "", "scanned_at": now},
+        {"address": "addr-3", "scanned_at": now + 86400},   # clock far ahead
+    ]
+    response = _upload(client, station, scans)
+    assert response.status_code == 200
+    statuses = [result['status'] for result in response.json['results']]
+    assert statuses == ["accepted", "accepted", "rejected", "accepted", "rejected", "rejected"]
+    assert 'Repeat scan' in response.json['results'][2]['error']
+
+    pending = app_module.blockchain.pending_transactions
+    assert sorted(tx.timestamp_created for tx in pending) == [now - 3600, now - 3590, now - 60]
+    assert {tx.station_address for tx in pending} == {station}
+
+    retry = _upload(client, station, scans[:2])     # response was lost, queue replayed
+    assert retry.json['accepted'] == 0
+    assert all('Duplicate' in result['error'] for result in retry.json['results'])
+
+
+def test_backdated_scans_are_rejected(app_module, client, station, monkeypatch):
+    monkeypatch.setattr(app_module, 'MAX_OFFLINE_SECONDS', 3600)
+    now = time.time()
+    scans = [
+        {"address": "addr-1", "scanned_at": 0},
+        {"address": "addr-1", "scanned_at": now - 7200},
+        {"address": "addr-1", "scanned_at": now - 1800},
+    ]
+    response = _upload(client, station, scans)
+    assert [result['status'] for result in response.json['results']] == ["rejected", "rejected", "accepted"]
+    assert 'offline window' in response.json['results'][0]['error']
+    assert [tx.timestamp_created for tx in app_module.blockchain.pending_transactions] == [now - 1800]
+
+
+def test_station_is_authenticated_once_for_the_batch(client, station):
+    scans = [{"address": "addr-1", "scanned_at": time.time()}]
+    assert _upload(client, station, scans, api_key="wrong").status_code == 401
+    assert _upload(client, "UNKNOWN", scans).status_code == 400
+    assert client.post('/checkin/batch', json={"station_id": station, "scans": scans}).status_code == 401
+    assert _upload(client, station, []).status_code == 400
+
+
+def test_replay_requires_the_same_station_key(client, station):
+    body = {"station_id": station, "scans": [{"address": "addr-1", "scanned_at": time.time()}]}
+    first = client.post('/checkin/batch', json=body,
+                        headers={'X-Station-API-Key': API_KEY, 'Idempotency-Key': 'upload-1'})
+    assert first.json['accepted'] == 1
+
+    for headers in ({'X-Station-API-Key': 'stolen'}, {}):
+        replay = client.post('/checkin/batch', json=body, headers={**headers, 'Idempotency-Key': 'upload-1'})
+        assert replay.status_code == 401
+        assert 'Idempotent-Replayed' not in replay.headers
+
+    replay = client.post('/checkin/batch', json=body,
+                         headers={'X-Station-API-Key': API_KEY, 'Idempotency-Key': 'upload-1'})
+    assert replay.headers['Idempotent-Replayed'] == 'true'
@@ -0,0 +1,67 @@
+import gzip
+import json
+import time
+from werkzeug.http import parse_accept_header
+from blockchain import Transaction
+from block_cache import BlockCache
+from compression import compress_segment, join_segments, negotiate_encoding
+
+
+def test_negotiate_encoding_respects_quality():
+    assert negotiate_encoding(parse_accept_header('gzip')) == 'gzip'
+    assert negotiate_encoding(parse_accept_header('gzip;q=0, identity')) is None
+    assert negotiate_encoding(parse_accept_header('')) is None
+    assert negotiate_encoding(parse_accept_header('*')) is not None
+
+
+def test_gzip_segments_join_into_valid_stream():
+    parts = [b'[', b'{"a":1}', b',', b'{"b":"' + b'x' * 5000 + b'"}', b']']
+    body = join_segments([(p, compress_segment(p, 'gzip')) for p in parts], 'gzip')
+    assert gzip.decompress(body) == b''.join(parts)
+
+
+def _mine_messages(blockchain, count):
+    for i in range(count):
+        blockchain.add_transaction(Transaction(
+            timestamp_created=time.time(),
+            station_address=f"station_{i}",
+            message_data="Family safe at shelter 5 " * 60,
+            related_addresses=[f"family-{i:08x}"],
+            type_field="message",
+            priority_level=5,
+        ), rate_limit_override=True)
+    blockchain.mine_and_save()
+
+
+def test_blockchain_gzip_matches_identity(app_module, client):
+    _mine_messages(app_module.blockchain, 5)
+
+    plain = client.get('/blockchain')
+    compressed = client.get('/blockchain', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in plain.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert gzip.decompress(compressed.data) == plain.data
+    assert json.loads(plain.data) == [b.to_dict() for b in app_module.blockchain.chain]
+
+
+def test_block_compressed_once(app_module):
+    _mine_messages(app_module.blockchain, 3)
+    cache = BlockCache(precompress=())
+    blocks = list(app_module.blockchain.chain)
+
+    first = cache.render_chain(blocks, 'gzip')
+    segments = {h: entry.segments['gzip'] for h, entry in cache.entries.items()}
+    second = cache.render_chain(blocks, 'gzip')
+
+    assert first == second
+    assert all(cache.entries[h].segments['gzip'] is segments[h] for h in segments)
+
+
+def test_large_json_responses_are_compressed(app_module, client):
+    _mine_messages(app_module.blockchain, 5)
+    response = client.get('/address/family-00000001', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.data))[0]['related_addresses'] == ['family-00000001']
@@ -0,0 +1,70 @@
+import time
+from blockchain import Transaction
+
+
+def _add_message(blockchain, address="family-00000001"):
+    blockchain.add_transaction(Transaction(
+        timestamp_created=time.time(),
+        station_address="station1",
+        message_data="Test transaction",
+        related_addresses=[address],
+        type_field="message",
+        priority_level=5,
+    ), rate_limit_override=True)
+
+
+def test_blockchain_not_modified_until_new_block(app_module, client):
+    first = client.get('/blockchain')
+    etag = first.headers['ETag']
+
+    repeat = client.get('/blockchain', headers={'If-None-Match': etag})
+    assert repeat.status_code == 304
+    assert repeat.data == b''
+
+    _add_message(app_module.blockchain)
+    app_module.blockchain.mine_and_save()
+
+    changed = client.get('/blockchain', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+
+
+def test_not_modified_skips_handler(app_module, client, monkeypatch):
+    etag = client.get('/crisis').headers['ETag']
+
+    def fail(*args, **kwargs):
+        raise AssertionError("handler should not run")
+    monkeypatch.setitem(app_module.app.view_functions, 'get_crisis_info',
+                        app_module.conditional_on_chain_head()(fail))
+
+    assert client.get('/crisis', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_compressed_etag_is_distinct_but_revalidates(app_module, client):
+    plain = client.get('/blockchain').headers['ETag']
+    gzipped = client.get('/blockchain', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+
+    assert gzipped != plain
+    response = client.get('/blockchain', headers={'Accept-Encoding': 'gzip', 'If-None-Match': gzipped})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == gzipped
+
+
+def test_not_modified_echoes_the_matched_variant(client):
+    etag = client.get('/crisis').headers['ETag'].strip('"')
+    response = client.get('/crisis', headers={'If-None-Match': f'"{etag}-gzip"'})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == f'"{etag}-gzip"'
+
+    response = client.get('/crisis', headers={'If-None-Match': f'"other", "{etag}"'})
+    assert response.headers['ETag'] == f'"{etag}"'
+
+
+def test_policy_etag_follows_policy_version(app_module, client):
+    etag = client.get('/policy').headers['ETag']
+    assert client.get('/policy', headers={'If-None-Match': etag}).status_code == 304
+
+    policy_system = app_module.blockchain.policy_system
+    policy_system.current_policy = policy_system.current_policy
+
+    assert client.get('/policy', headers={'If-None-Match': etag}).status_code == 200
@@ -0,0 +1,123 @@
+import base64
+import os
+import time
+import pytest
+from crisis_registry import CrisisRegistry
+
+
+@pytest.fixture
+def hosted(app_module, monkeypatch):
+    """The app serving its primary crisis through the lazy proxy, plus a fresh registry"""
+    monkeypatch.setattr(app_module, 'blockchain', app_module.LocalProxy(app_module.get_blockchain))
+    monkeypatch.setattr(app_module, '_blockchain_instance', None)
+    monkeypatch.setattr(app_module, 'crisis_registry', CrisisRegistry())
+    admin = {'X-Admin-Token': base64.b64encode(app_module.get_admin_token().encode()).decode()}
+    return app_module, app_module.app.test_client(), admin
+
+
+def _create(client, admin, crisis_id, **settings):
+    return client.post('/admin/crises', headers=admin, json={
+        "crisis_id": crisis_id, "name": f"{crisis_id} response", "organization": "Org",
+        "policy_settings": settings,
+    })
+
+
+def _message(station):
+    return {
+        "timestamp_created": time.time(),
+        "station_address": station,
+        "message_data": "hello",
+        "related_addresses": ["family-00000001"],
+        "type_field": "message",
+        "priority_level": 1,
+    }
+
+
+def test_crises_have_independent_chains(hosted):
+    app_module, client, admin = hosted
+    assert _create(client, admin, "flood_2025", rate_limit=0).status_code == 201
+    assert _create(client, admin, "quake_2025", types=['alert']).status_code == 201
+
+    assert client.post('/crises/flood_2025/transaction', json=_message("s1")).status_code == 201
+    assert client.post('/crises/quake_2025/transaction', json=_message("s1")).status_code != 201  # policy: alerts only
+    assert client.post('/crises/flood_2025/admin/mine', headers=admin).status_code == 200
+
+    assert len(client.get('/crises/flood_2025/blockchain').json) == 2
+    assert len(client.get('/crises/quake_2025/blockchain').json) == 1
+    assert client.get('/crises/quake_2025/crisis').json['name'] == "quake_2025 response"
+    assert client.get('/crises/flood_2025/policy').json['id'] == "flood_2025"
+
+    primary = app_module._blockchain_instance
+    assert len(primary.chain) == 1
+    assert client.get(f"/crises/{primary.crisis_metadata['id']}/crisis").status_code == 200
+
+    flood = app_module.crisis_registry.chains['flood_2025']
+    assert os.path.exists(flood.db_path)
+    assert flood.miner_thread.is_alive()
+
+    listed = client.get('/crises').json
+    assert {c['crisis_id'] for c in listed['crises']} == {primary.crisis_metadata['id'], 'flood_2025', 'quake_2025'}
+
+
+def test_unknown_and_invalid_crises(hosted):
+    app_module, client, admin = hosted
+    assert client.get('/crises/nope/blockchain').status_code == 404
+    assert _create(client, admin, "../escape").status_code == 400
+    assert _create(client, admin, "dup").status_code == 201
+    assert _create(client, admin, "dup").status_code == 400
+
+
+def test_crisis_reopens_from_disk(isolated_env):
+    registry = CrisisRegistry()
+    chain = registry.create("storm", "Storm", "Org", "c", "d", {'rate_limit': 0, 'block_interval': 30})
+    chain.add_transaction(app_tx())
+    chain.mine_and_save()
+
+    reopened = CrisisRegistry().get("storm")
+    assert [b.hash for b in reopened.chain] == [b.hash for b in chain.chain]
+    assert reopened.crisis_metadata['id'] == "storm"
+    assert reopened.block_interval == 30
+    assert CrisisRegistry().crisis_ids() == ["storm"]
+
+
+def app_tx():
+    from blockchain import Transaction
+    return Transaction(timestamp_created=time.time(), station_address="s", message_data="m",
+                       related_addresses=[], type_field="message", priority_level=1)
+
+
+def test_stations_are_provisioned_per_crisis(hosted):
+    app_module, client, admin = hosted
+    assert _create(client, admin, "flood_2025").status_code == 201
+    scan = {"address": "addr-1", "station_id": "BOAT_01"}
+
+    unknown = client.post('/crises/flood_2025/checkin', json=scan, headers={'X-Station-API-Key': 'x'})
+    assert unknown.status_code == 400 and unknown.json['error'] == "Unknown station_id"
+
+    assert client.post('/crises/flood_2025/admin/stations', json={"station_id": "BOAT_01"}).status_code == 401
+    provisioned = client.post('/crises/flood_2025/admin/stations', headers=admin,
+                              json={"station_id": "BOAT_01", "name": "Rescue boat", "type": "boat"})
+    assert provisioned.status_code == 201
+    key = {'X-Station-API-Key': provisioned.json['api_key']}
+
+    assert client.post('/crises/flood_2025/checkin', json=scan, headers=key).status_code == 201
+    batch = client.post('/crises/flood_2025/checkin/batch', headers=key, json={
+        "station_id": "BOAT_01", "scans": [{"address": "addr-2", "scanned_at": time.time()}]})
+    assert batch.json['accepted'] == 1
+    assert client.post('/checkin', json=scan, headers=key).status_code == 400     # not a primary-crisis station
+    assert len(app_module.crisis_registry.chains['flood_2025'].pending_transactions) == 2
+
+
+def test_chains_are_built_outside_the_registry_lock(isolated_env, monkeypatch):
+    import crisis_registry
+    registry = CrisisRegistry()
+    build = crisis_registry.Blockchain
+
+    def unlocked_build(*args, **kwargs):
+        assert not registry.lock.locked()
+        return build(*args, **kwargs)
+
+    monkeypatch.setattr(crisis_registry, 'Blockchain', unlocked_build)
+    registry.create("storm", "Storm", "Org", "c", "d", {})
+    registry.chains.clear()
+    assert registry.get("storm").crisis_metadata['id'] == "storm"
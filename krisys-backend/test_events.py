@@ -0,0 +1,74 @@
+import json
+import threading
+import time
+from blockchain import Transaction
+from events import EventFeed
+
+
+def test_feed_cursor_and_reset():
+    feed = EventFeed(max_events=3)
+    for i in range(5):
+        feed.publish("block", {"block_index": i}, addresses=[f"addr{i}"])
+
+    assert [e['id'] for e in feed.since(3)] == [4, 5]
+    assert feed.since(5) == []
+    assert feed.since(0)[0]['type'] == 'reset'
+
+
+def test_feed_wait_wakes_subscribers():
+    feed = EventFeed()
+    results = []
+    waiters = [threading.Thread(target=lambda: results.append(feed.wait(0, timeout=5))) for _ in range(20)]
+    for waiter in waiters:
+        waiter.start()
+    time.sleep(0.1)
+    feed.publish("block", {"block_index": 1})
+    for waiter in waiters:
+        waiter.join()
+
+    assert len(results) == 20
+    assert all(events[0]['id'] == 1 for events in results)
+
+
+def _mine_for(blockchain, address):
+    blockchain.add_transaction(Transaction(
+        timestamp_created=time.time(),
+        station_address="station1",
+        message_data="Test transaction",
+        related_addresses=[address],
+        type_field="message",
+        priority_level=5,
+    ), rate_limit_override=True)
+    blockchain.mine_and_save()
+
+
+def test_long_poll_filters_by_address(app_module, client):
+    blockchain = app_module.blockchain
+    cursor = client.get('/events/poll').json['cursor']
+
+    _mine_for(blockchain, "family-aaaaaaaa")
+    _mine_for(blockchain, "family-bbbbbbbb")
+
+    unfiltered = client.get(f'/events/poll?since={cursor}&timeout=0').json
+    assert [e['block_index'] for e in unfiltered['events']] == [1, 2]
+
+    filtered = client.get(f'/events/poll?since={cursor}&timeout=0&address=family-bbbbbbbb').json
+    assert [e['block_index'] for e in filtered['events']] == [2]
+    assert filtered['events'][0]['addresses'] == ['family-bbbbbbbb']
+    assert filtered['cursor'] == unfiltered['cursor']
+
+
+def test_sse_stream_emits_block_headers(app_module, client):
+    blockchain = app_module.blockchain
+    response = client.get('/events', buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    stream = iter(response.response)
+    assert next(stream).startswith(b'retry:')
+
+    threading.Timer(0.1, _mine_for, args=(blockchain, "family-cccccccc")).start()
+    chunk = next(stream).decode()
+    response.close()
+
+    assert chunk.startswith(f"id: {blockchain.events.sequence}\nevent: block\n")
+    data = json.loads(chunk.split('data: ', 1)[1])
+    assert data['hash'] == blockchain.chain[-1].hash
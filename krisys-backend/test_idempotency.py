@@ -0,0 +1,111 @@
+import time
+import pytest
+from blockchain import DUPLICATE_TX_ERROR, Transaction
+from idempotency import IdempotencyCache, IdempotencyConflict
+
+
+def _message(station="device_1", address="family-00000001", **extra):
+    payload = {
+        "timestamp_created": 1700000000.25,
+        "station_address": station,
+        "message_data": "Safe at the shelter",
+        "related_addresses": [address],
+        "type_field": "message",
+        "priority_level": 1,
+    }
+    payload.update(extra)
+    return payload
+
+
+def test_transaction_ids_are_content_addressed():
+    first = Transaction(**_message(address="family-00000001"))
+    other_wallet = Transaction(**_message(address="family-00000002"))
+    retry = Transaction(**_message(address="family-00000001"))
+
+    assert first.transaction_id != other_wallet.transaction_id    # same station, same timestamp
+    assert first.transaction_id == retry.transaction_id
+
+
+def test_retried_body_is_a_duplicate_even_after_mining(app_module, client):
+    first = client.post('/transaction', json=_message(), headers={'X-Dev-Rate-Override': 'true'})
+    assert first.status_code == 201
+    assert client.post('/transaction', json=_message(), headers={'X-Dev-Rate-Override': 'true'}).status_code == 409
+
+    app_module.blockchain.mine_and_save()
+    retry = client.post('/transaction', json=_message(), headers={'X-Dev-Rate-Override': 'true'})
+    assert retry.status_code == 409
+    assert retry.json['transaction_id'] == first.json['transaction_id']
+    assert 'already in block #1' in retry.json['error']
+
+
+def test_idempotency_key_replays_the_first_response(app_module, client):
+    headers = {'Idempotency-Key': 'retry-1'}
+    payload = _message(timestamp_created=time.time())
+    first = client.post('/transaction', json=payload, headers=headers)
+    assert first.status_code == 201
+    pending = len(app_module.blockchain.pending_transactions)
+
+    replay = client.post('/transaction', json=payload, headers=headers)
+    assert replay.status_code == 201
+    assert replay.headers['Idempotent-Replayed'] == 'true'
+    assert replay.json == first.json
+    assert len(app_module.blockchain.pending_transactions) == pending
+
+    reused = client.post('/transaction', json=_message(station="device_2"), headers=headers)
+    assert reused.status_code == 409
+
+
+def test_idempotency_cache_expires_and_is_bounded(monkeypatch):
+    cache = IdempotencyCache(max_entries=2, ttl=10)
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+
+    assert cache.begin('a', 'x') is None
+    with pytest.raises(IdempotencyConflict):
+        cache.begin('a', 'x')   # still in flight
+    cache.complete('a', 201, b'{}', 'application/json')
+    assert cache.begin('a', 'x') == (201, b'{}', 'application/json')
+
+    now[0] += 11
+    assert cache.begin('a', 'x') is None    # expired, claimed afresh
+    cache.begin('b', 'x')
+    cache.begin('c', 'x')
+    assert list(cache.entries) == ['b', 'c']
+
+
+def test_replay_of_a_sealed_transaction_is_a_duplicate(app_module, client):
+    chain = app_module.blockchain
+    payload = _message(timestamp_created=time.time())
+    tx_id = client.post('/transaction', json=payload).json['transaction_id']
+    chain.mine_and_save()
+    client.post('/transaction', json=_message(station="device_2", timestamp_created=time.time()))
+    chain.mine_and_save()
+    assert chain.seal_cold_blocks(now=time.time() + 10 * chain.chain.epoch_seconds) > 0
+    assert chain.chain.block_index_of(tx_id) is None    # only the transaction_index knows it now
+
+    replay = client.post('/transaction', json=payload, headers={'X-Dev-Rate-Override': 'true'})
+    assert replay.status_code == 409
+    assert 'already in block #1' in replay.json['error']
+    assert chain.add_transactions([Transaction(**payload)], rate_limit_override=True)[0].startswith(DUPLICATE_TX_ERROR)
+
+
+def test_encrypted_message_retry_is_a_duplicate_without_the_cache(app_module, client, monkeypatch):
+    wallet = app_module.blockchain.wallets.create_wallet(family_id="recipient0001", members=[{"name": "A"}],
+                                                         crisis_id="test")
+    payload = _message(timestamp_created=time.time(), recipient_id=wallet.family_id)
+    headers = {'X-Dev-Rate-Override': 'true'}
+
+    first = client.post('/transaction', json=payload, headers=headers)
+    assert first.status_code == 201
+    stored = app_module.blockchain.pending_transactions[-1]
+    assert stored.message_data.startswith('-----BEGIN PGP MESSAGE-----')
+
+    # Another worker (empty idempotency cache) encrypts the retry afresh, with new ciphertext
+    monkeypatch.setattr(app_module, 'idempotency_cache', IdempotencyCache())
+    retry = client.post('/transaction', json=payload, headers=headers)
+    assert retry.status_code == 409
+    assert retry.json['transaction_id'] == first.json['transaction_id']
+
+    by_member = client.post('/transaction', json={**payload, "recipient_id": wallet.members[0]['address']},
+                            headers=headers)
+    assert by_member.status_code == 409     # same wallet, addressed through a member
@@ -0,0 +1,46 @@
+import time
+import database
+from blockchain import Blockchain, Transaction
+
+
+def _checkin(station, address, timestamp):
+    return Transaction(timestamp_created=timestamp, station_address=station, message_data="Check-in",
+                       related_addresses=[address], type_field="check_in", priority_level=1)
+
+
+def _mine(chain, *transactions):
+    assert chain.add_transactions(list(transactions), rate_limit_override=True) == [None] * len(transactions)
+    chain.mine_and_save()
+
+
+def test_latest_checkin_per_address_and_wallet(app_module, client):
+    chain = app_module.blockchain
+    wallet = chain.wallets.create_wallet(family_id="lastseen0001", members=[{"name": "A"}, {"name": "B"}],
+                                         crisis_id="test")
+    first, second = [member['address'] for member in wallet.members]
+    now = time.time()
+
+    _mine(chain, _checkin("SHELTER_1", first, now - 60), _checkin("SHELTER_1", second, now - 50))
+    _mine(chain, _checkin("HOSPITAL_2", first, now), _checkin("CAMP_3", second, now - 600))  # late relay
+
+    assert client.get(f'/address/{first}/last-checkin').json['station_id'] == "HOSPITAL_2"
+    assert client.get(f'/address/{second}/last-checkin').json['station_id'] == "SHELTER_1"
+    assert client.get('/address/nobody/last-checkin').status_code == 404
+
+    family = client.get(f'/wallet/{wallet.family_id}/last-checkin').json
+    assert family['latest']['address'] == first
+    assert [m['last_checkin']['block_index'] for m in family['members']] == [2, 1]
+
+    batch = client.get(f'/last-checkins?address={first}&address=nobody').json['last_checkins']
+    assert batch[first]['station_id'] == "HOSPITAL_2" and batch['nobody'] is None
+    assert client.get('/last-checkins').status_code == 400
+
+
+def test_view_is_backfilled_for_existing_databases(app_module):
+    chain = app_module.blockchain
+    _mine(chain, _checkin("SHELTER_1", "addr-1", time.time()))
+    with database.db_connection() as conn:
+        conn.execute('DROP TABLE last_checkins')
+
+    reopened = Blockchain(app_module.policy_system, start_miner=False)
+    assert reopened.last_checkins(["addr-1"])["addr-1"]["station_id"] == "SHELTER_1"
@@ -0,0 +1,55 @@
+import json
+import logging
+import time
+from blockchain import Blockchain, PolicySystem, Transaction
+from logging_config import DebugSampler, JsonFormatter, apply_log_levels, parse_levels
+
+
+def test_parse_and_apply_levels():
+    levels = parse_levels("blockchain=warning, events=DEBUG,bogus")
+    assert levels == {"blockchain": "WARNING", "events": "DEBUG"}
+
+    apply_log_levels({"krisys_test_subsystem": "ERROR"})
+    assert logging.getLogger("krisys_test_subsystem").level == logging.ERROR
+
+
+def test_debug_sampler_only_thins_debug():
+    sampler = DebugSampler(rate=0.0)
+    debug = logging.LogRecord("x", logging.DEBUG, "", 0, "debug", (), None)
+    info = logging.LogRecord("x", logging.INFO, "", 0, "info", (), None)
+    assert not sampler.filter(debug)
+    assert sampler.filter(info)
+
+
+def test_json_formatter_includes_structured_fields():
+    record = logging.LogRecord("blockchain", logging.INFO, "", 0, "Policy activated: %s", ("x",), None)
+    record.event = "policy_change"
+    payload = json.loads(JsonFormatter().format(record))
+    assert payload["message"] == "Policy activated: x"
+    assert payload["event"] == "policy_change"
+
+
+def test_policy_change_logged_once_not_per_transaction(isolated_env, caplog):
+    caplog.set_level(logging.DEBUG)
+    policy_system = PolicySystem()
+    policy_id = policy_system.create_crisis_policy(
+        name="Flood", organization="Org", contact="c", description="d",
+        policy_settings={'rate_limit': 0},
+    )
+    policy_system.current_policy = policy_id
+    events = [r for r in caplog.records if getattr(r, "event", None) == "policy_change"]
+    assert len(events) == 1 and events[0].policy_id == policy_id
+
+    blockchain = Blockchain(policy_system, start_miner=False)
+    caplog.clear()
+    for i in range(3):
+        blockchain.add_transaction(Transaction(
+            timestamp_created=time.time(),
+            station_address=f"station{i}",
+            message_data="Test transaction",
+            related_addresses=["family-00000001"],
+            type_field="message",
+            priority_level=1,
+        ))
+    assert not any("rate_limit" in r.getMessage() for r in caplog.records)
+    assert not any(r.levelno >= logging.INFO for r in caplog.records)
@@ -0,0 +1,51 @@
+import time
+from blockchain import Transaction
+from metrics import Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram('test_seconds', 'Test latency', ('route',), buckets=(0.1, 1.0))
+    latency.labels(route='/a').observe(0.05)
+    latency.labels(route='/a').observe(0.5)
+    latency.labels(route='/a').observe(5)
+    counter = registry.counter('test_total', 'Test counter')
+    counter.inc(3)
+
+    text = registry.render()
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'test_seconds_count{route="/a"} 3' in text
+    assert 'test_total 3' in text
+
+
+def test_metrics_endpoint_exposes_hot_paths(app_module, client):
+    blockchain = app_module.blockchain
+    client.get('/blockchain')
+    blockchain.add_transaction(Transaction(
+        timestamp_created=time.time(),
+        station_address="station1",
+        message_data="Test transaction",
+        related_addresses=["family-00000001"],
+        type_field="message",
+        priority_level=5,
+    ))
+
+    pending = client.get('/metrics').get_data(as_text=True)
+    assert 'krisys_mempool_transactions 1' in pending
+    assert f'krisys_mempool_bytes {blockchain.pending_bytes}' in pending
+
+    blockchain.mine_and_save()
+    response = client.get('/metrics')
+    text = response.get_data(as_text=True)
+
+    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    assert 'krisys_http_request_duration_seconds_count{method="GET",route="/blockchain",status="200"}' in text
+    assert 'krisys_tx_admitted_total{result="admitted"}' in text
+    for phase in ('build', 'sign', 'persist'):
+        assert f'krisys_block_phase_duration_seconds_count{{phase="{phase}"}}' in text
+    assert 'krisys_pgp_duration_seconds_count{operation="sign"}' in text
+    assert 'krisys_sqlite_duration_seconds_count{site="save_block"}' in text
+    assert 'krisys_mempool_transactions 0' in text
+    assert 'krisys_cache_requests_total{cache="block",result="hit"}' in text
@@ -0,0 +1,71 @@
+import sqlite3
+import database
+from blockchain import Blockchain, PolicySystem
+
+
+def _attached(policy_system=None):
+    policy_system = policy_system or PolicySystem()
+    policy_system.attach_storage()
+    return policy_system
+
+
+def test_policy_change_reaches_other_workers(isolated_env, monkeypatch):
+    database.init_db()
+    monkeypatch.setattr(PolicySystem, 'POLICY_RELOAD_INTERVAL', 0)
+    worker_a, worker_b = _attached(), _attached()
+    blockchain_b = Blockchain(worker_b, start_miner=False)
+
+    policy_id = worker_a.create_crisis_policy(
+        name="Flood", organization="Org", contact="c", description="d",
+        policy_settings={'block_interval': 30, 'size_limit': 2048, 'rate_limit': 10},
+    )
+    worker_a.current_policy = policy_id
+
+    assert worker_b.reload()
+    assert worker_b.current_policy == policy_id
+    assert worker_b.version == worker_a.version
+    assert (blockchain_b.block_interval, blockchain_b.max_tx_size, blockchain_b.tx_rate_limit) == (30, 2048, 10)
+    assert not worker_b.reload()    # nothing new
+
+
+def test_reload_checks_are_rate_limited(isolated_env):
+    database.init_db()
+    worker_a, worker_b = _attached(), _attached()
+    worker_a.current_policy = 'default'
+
+    assert not worker_b.reload()    # checked during attach, interval has not elapsed
+    assert worker_b.reload(force=True)
+
+
+def test_policies_survive_restart(isolated_env):
+    database.init_db()
+    first = _attached()
+    policy_id = first.create_crisis_policy(
+        name="Quake", organization="Org", contact="c", description="d",
+        policy_settings={'types': ['alert']},
+    )
+    first.current_policy = policy_id
+
+    # A fresh process re-creating its hard-coded startup policy does not override the stored state
+    restarted = PolicySystem()
+    restarted.create_crisis_policy(
+        name="Quake", organization="Other", contact="c", description="d",
+        policy_settings={}, policy_id=policy_id,
+    )
+    restarted.current_policy = 'default'
+    _attached(restarted)
+
+    assert restarted.current_policy == policy_id
+    assert restarted.get_policy()['organization'] == "Org"
+    assert restarted.validator.types == frozenset({'alert'})
+
+
+def test_init_db_adds_policy_column(isolated_env):
+    with sqlite3.connect(database.DB_PATH) as conn:
+        conn.execute("CREATE TABLE crises (id TEXT PRIMARY KEY, name TEXT, organization TEXT, "
+                     "contact TEXT, description TEXT, created_at REAL)")
+    database.init_db()
+
+    with database.db_connection() as conn:
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(crises)")}
+    assert 'policy' in columns
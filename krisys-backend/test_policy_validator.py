@@ -0,0 +1,69 @@
+import base64
+import time
+import pytest
+from blockchain import Blockchain, PolicySystem, PolicyValidator, Transaction
+
+
+def _tx(type_field="message", priority_level=1, message="hello"):
+    return Transaction(
+        timestamp_created=time.time(),
+        station_address="station1",
+        message_data=message,
+        related_addresses=["family-00000001"],
+        type_field=type_field,
+        priority_level=priority_level,
+    )
+
+
+def test_validator_checks_and_is_immutable():
+    validator = PolicyValidator('p', {
+        'types': ['message'], 'priority_levels': {'medical': 1}, 'size_limit': 400,
+        'rate_limit': 0, 'block_interval': 60,
+    })
+    assert validator.validate(_tx()) > 0
+    with pytest.raises(ValueError, match="Invalid transaction type"):
+        validator.validate(_tx(type_field="alert"))
+    with pytest.raises(ValueError, match="Invalid priority level"):
+        validator.validate(_tx(priority_level=7))
+    with pytest.raises(ValueError, match="exceeds size limit"):
+        validator.validate(_tx(message="x" * 400))
+    with pytest.raises(AttributeError):
+        validator.size_limit = 10
+
+
+def test_activation_swaps_compiled_validator():
+    policy_system = PolicySystem()
+    default = policy_system.validator
+    policy_id = policy_system.create_crisis_policy(
+        name="Wildfire", organization="Org", contact="c", description="d",
+        policy_settings={'types': ['alert'], 'rate_limit': 5},
+    )
+    assert policy_system.validator is default
+
+    policy_system.current_policy = policy_id
+    assert policy_system.validator is policy_system.validators[policy_id]
+    assert policy_system.validator.types == frozenset({'alert'})
+    assert policy_system.get_policy()['id'] == policy_id
+
+
+def test_admission_serializes_transaction_once(isolated_env, monkeypatch):
+    blockchain = Blockchain(start_miner=False)
+    calls = []
+    original = Transaction.to_dict
+    monkeypatch.setattr(Transaction, 'to_dict', lambda self: calls.append(1) or original(self))
+
+    blockchain.add_transaction(_tx())
+    assert len(calls) == 1
+
+
+def test_admin_policy_endpoint_swaps_validator(app_module, client):
+    policy_system = app_module.blockchain.policy_system
+    admin = {'X-Admin-Token': base64.b64encode(app_module.get_admin_token().encode()).decode()}
+    previous = policy_system.current_policy
+
+    response = client.post('/admin/policy', json={'policy_id': 'default'}, headers=admin)
+    assert response.status_code == 200
+    try:
+        assert policy_system.validator is policy_system.validators['default']
+    finally:
+        policy_system.current_policy = previous
@@ -0,0 +1,54 @@
+import base64
+from qr_cache import QRCache
+
+
+def _create_wallet(app_module, members=2):
+    return app_module.blockchain.wallets.create_wallet(
+        family_id="qrfamily0001", members=[{"name": f"<Member {i}>"} for i in range(members)],
+        crisis_id="test",
+    )
+
+
+def test_cache_hits_and_evicts():
+    cache = QRCache(max_entries=2)
+    first = cache.get("addr-1")
+    assert cache.get("addr-1") is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.get("addr-1", "svg")
+    cache.get("addr-2")
+    assert set(cache.entries) == {("addr-1", "svg"), ("addr-2", "png")}
+    assert first.startswith(b"\x89PNG")
+
+
+def test_single_address_formats(app_module, client):
+    legacy = client.get('/wallet/fam/qr/fam-0001')
+    assert legacy.json['qr_code'].startswith('data:image/png;base64,')
+    assert 'Cache-Control' not in legacy.headers     # JSON body may change shape, only raw images are immutable
+
+    png = client.get('/wallet/fam/qr/fam-0001?format=png')
+    assert png.mimetype == 'image/png'
+    assert png.data == base64.b64decode(legacy.json['qr_code'].split(',', 1)[1])
+    assert 'immutable' in png.headers['Cache-Control']
+    assert client.get('/wallet/fam/qr/fam-0001?format=png',
+                      headers={'If-None-Match': png.headers['ETag']}).status_code == 304
+
+    svg = client.get('/wallet/fam/qr/fam-0001?format=svg')
+    assert svg.mimetype == 'image/svg+xml'
+    assert client.get('/wallet/fam/qr/fam-0001?format=gif').status_code == 400
+
+
+def test_wallet_sheet(app_module, client):
+    wallet = _create_wallet(app_module)
+
+    listing = client.get(f'/wallet/{wallet.family_id}/qr').json
+    assert [m['address'] for m in listing['members']] == [m['address'] for m in wallet.members]
+    assert all(m['qr_code'].startswith('data:image/png') for m in listing['members'])
+
+    sheet = client.get(f'/wallet/{wallet.family_id}/qr?format=html')
+    assert sheet.mimetype == 'text/html'
+    text = sheet.get_data(as_text=True)
+    assert text.count('<svg') == 2
+    assert '&lt;Member 0&gt;' in text
+
+    assert client.get('/wallet/unknown/qr').status_code == 404
@@ -0,0 +1,118 @@
+import base64
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import wallet_keys
+from blockchain import Blockchain
+from database import db_connection
+from replication import PINNED_KEY_FILE, Follower, ReplicationError
+
+
+@pytest.fixture
+def primary(app_module):
+    """The app's chain with a few mined blocks, plus a test client and admin headers"""
+    client = app_module.app.test_client()
+    admin = {'X-Admin-Token': base64.b64encode(app_module.get_admin_token().encode()).decode()}
+    for i in range(3):
+        response = client.post('/transaction', json={
+            "timestamp_created": time.time(),
+            "station_address": f"STATION_{i:03d}",   # one transaction per station (rate limit)
+            "message_data": f"check in {i}",
+            "related_addresses": [f"family-{i:08d}"],
+            "type_field": "message",
+            "priority_level": 1,
+        })
+        assert response.status_code == 201
+        assert client.post('/admin/mine', headers=admin).status_code == 200
+    return app_module.blockchain, client
+
+
+def _replica(isolated_env):
+    return Blockchain(start_miner=False, replica=True, db_path=str(isolated_env / 'replica.db'))
+
+
+def test_follower_catches_up_and_persists(primary, isolated_env):
+    chain, client = primary
+    replica = _replica(isolated_env)
+    follower = Follower(replica, fetch=lambda path: client.get(path).data, batch_size=2)
+
+    assert follower.sync_once() == len(chain.chain)
+    assert [b.hash for b in replica.chain] == [b.hash for b in chain.chain]
+    assert replica.crisis_metadata['id'] == chain.crisis_metadata['id']
+    assert os.path.exists(PINNED_KEY_FILE)
+    assert follower.sync_once() == 0
+
+    reopened = _replica(isolated_env)
+    assert [b.hash for b in reopened.chain] == [b.hash for b in chain.chain]
+    assert all(b.hash == b.calculate_hash() for b in reopened.chain)
+
+
+def test_tampered_block_is_rejected(primary, isolated_env):
+    chain, client = primary
+    chain.chain[2].transactions[0].message_data = "forged"
+    chain.block_cache = type(chain.block_cache)()  # drop the serialized originals
+    replica = _replica(isolated_env)
+    follower = Follower(replica, fetch=lambda path: client.get(path).data, public_key=chain.master_public_key)
+
+    with pytest.raises(ReplicationError, match="#2 hash mismatch"):
+        follower.sync_once()
+    assert len(replica.chain) == 0
+
+
+def test_head_and_block_range(primary):
+    chain, client = primary
+    head = client.get('/blockchain/head').json
+    assert head['block_index'] == len(chain.chain) - 1
+    assert head['hash'] == chain.chain[-1].hash
+
+    response = client.get('/blocks?start=1&end=3')
+    assert [b['block_index'] for b in response.json] == [1, 2]
+    assert 'immutable' in response.headers['Cache-Control']
+
+    response = client.get('/blocks?start=2')
+    assert [b['block_index'] for b in response.json] == [2, 3]
+    assert 'Cache-Control' not in response.headers
+    assert client.get('/blocks?start=3&end=1').status_code == 400
+
+
+def test_replica_rejects_writes(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'REPLICA_OF', 'http://primary:5000')
+    client = app_module.app.test_client()
+    response = client.post('/transaction', json={})
+    assert response.status_code == 403
+    assert response.json['primary'] == 'http://primary:5000'
+    assert client.get('/blockchain/head').status_code == 200
+
+
+def test_wallets_replicate_without_private_keys(app_module, primary, isolated_env, monkeypatch):
+    chain, client = primary
+    monkeypatch.setattr(wallet_keys, 'WALLET_KEY_BITS', 1024)
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(wallet_keys, 'keygen_pool', lambda: pool)
+    response = client.post('/wallets/batch', json={"families": [{"num_members": 2, "passphrase": "x"}]})
+    pool.shutdown()
+    family_id = json.loads(response.get_data(as_text=True).splitlines()[0])['family_id']
+    chain.wallets.add_device_to_wallet(family_id, "phone-1", "device-key")
+
+    assert client.get('/replication/wallets').status_code == 403     # disabled without a token
+    monkeypatch.setattr(app_module, 'REPLICATION_TOKEN', 'shared')
+    assert client.get('/replication/wallets', headers={'X-Replication-Token': 'guess'}).status_code == 401
+
+    replica = _replica(isolated_env)
+    assert replica.crisis_metadata['public_key'] is None     # null, not "None", until pinned
+    follower = Follower(replica, replication_token='shared',
+                        fetch=lambda path: client.get(path, headers={'X-Replication-Token': 'shared'}).data)
+    follower.sync_once()
+
+    wallet = replica.wallets.get_wallet(family_id)
+    assert wallet.members == chain.wallets.get_wallet(family_id).members
+    assert [d['device_id'] for d in wallet.devices] == ["phone-1"]
+    assert replica.wallets.get_wallet_public_key(family_id) == chain.wallets.get_wallet_public_key(family_id)
+    with db_connection(path=replica.db_path) as conn:
+        assert conn.execute("SELECT encrypted_private_key FROM wallet_keys").fetchone()[0] == ''
+
+    chain.wallets.add_device_to_wallet(family_id, "phone-2", "second-key")
+    assert follower.sync_wallets() == 0
+    assert [d['device_id'] for d in replica.wallets.get_wallet(family_id).devices] == ["phone-1", "phone-2"]
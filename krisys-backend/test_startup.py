@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+import benchmark
+
+
+def test_import_has_no_side_effects(tmp_path):
+    script = ("import os, app; "
+              "assert app._blockchain_instance is None; "
+              "assert not os.path.exists('blockchain'); "
+              "assert not os.path.exists(os.environ['BLOCKCHAIN_DB_PATH'])")
+    env = dict(os.environ, BLOCKCHAIN_DB_PATH=str(tmp_path / 'blockchain.db'),
+               PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, '-c', script], cwd=tmp_path, env=env, check=True)
+
+
+def test_blockchain_built_once_on_first_request(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'blockchain', app_module.LocalProxy(app_module.get_blockchain))
+    monkeypatch.setattr(app_module, '_blockchain_instance', None)
+    monkeypatch.setattr(app_module, 'STARTUP_PROFILE', {})
+    client = app_module.app.test_client()
+
+    assert client.get('/debug/startup').json['blockchain_ready'] is False
+    assert client.get('/crisis').status_code == 200
+    report = client.get('/debug/startup').json
+    assert report['blockchain_ready'] is True
+    assert set(report['phases']) >= {'init_db', 'master_key', 'load_chain', 'dev_stations', 'blockchain_total'}
+
+    instance = app_module.get_blockchain()
+    assert instance is app_module._blockchain_instance
+    assert instance.miner_thread.is_alive()
+
+
+def test_miner_restarts_after_fork(app_module):
+    blockchain = app_module.Blockchain(app_module.policy_system, start_miner=False)
+    assert blockchain.miner_thread is None
+
+    blockchain.start_miner()
+    first = blockchain.miner_thread
+    blockchain.start_miner()
+    assert blockchain.miner_thread is first
+
+    blockchain._miner_pid = -1  # as if inherited from the gunicorn master
+    blockchain.start_miner()
+    assert blockchain.miner_thread is not first
+
+
+def test_startup_benchmark_reports_target():
+    result = benchmark.bench_startup(chain_size=20, repeat=1)
+    assert result['target_s'] == benchmark.COLD_START_TARGET_SECONDS
+    assert result['phases']['load_chain'] >= 0
+    json.dumps(result)
@@ -0,0 +1,47 @@
+import time
+from blockchain import Blockchain
+
+
+def _message(station, address="family-00000001"):
+    return {
+        "timestamp_created": time.time(),
+        "station_address": station,
+        "message_data": "Safe at the shelter",
+        "related_addresses": [address],
+        "type_field": "message",
+        "priority_level": 1,
+    }
+
+
+def test_pending_then_confirmed(app_module, client):
+    ids = [client.post('/transaction', json=_message(f"device_{i}")).json['transaction_id'] for i in range(2)]
+
+    pending = client.get(f'/transaction/{ids[1]}').json
+    assert pending['status'] == 'pending'
+    assert (pending['mempool_position'], pending['mempool_size']) == (1, 2)
+
+    app_module.blockchain.mine_and_save()
+    client.post('/transaction', json=_message("device_9"))
+    app_module.blockchain.mine_and_save()
+
+    confirmed = client.get(f'/transaction/{ids[0]}').json
+    assert confirmed['status'] == 'confirmed'
+    assert confirmed['block_index'] == 1
+    assert confirmed['block_hash'] == app_module.blockchain.chain[1].hash
+    assert confirmed['confirmations'] == 2
+    assert confirmed['transaction']['station_address'] == 'device_0'
+    assert client.get('/transaction/not-a-transaction').status_code == 404
+
+
+def test_lookup_survives_sealing(app_module, client):
+    chain = app_module.blockchain
+    tx_id = client.post('/transaction', json=_message("device_1")).json['transaction_id']
+    chain.mine_and_save()
+    client.post('/transaction', json=_message("device_2"))
+    chain.mine_and_save()
+
+    assert chain.seal_cold_blocks(now=time.time() + 10 * chain.chain.epoch_seconds) > 0
+    reopened = Blockchain(app_module.policy_system, start_miner=False)
+    assert reopened.chain.block_index_of(tx_id) is None     # sealed: not in the hot index
+    result = reopened.find_transaction(tx_id)
+    assert result['status'] == 'confirmed' and result['block_index'] == 1
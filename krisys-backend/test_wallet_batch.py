@@ -0,0 +1,69 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import pgpy
+import wallet_keys
+from database import db_connection
+
+
+@pytest.fixture
+def fast_keygen(monkeypatch):
+    """Small keys on a thread pool, so batches don't pay for RSA-4096 in spawned workers"""
+    monkeypatch.setattr(wallet_keys, 'WALLET_KEY_BITS', 1024)
+    pool = ThreadPoolExecutor(max_workers=2)
+    monkeypatch.setattr(wallet_keys, 'keygen_pool', lambda: pool)
+    yield pool
+    pool.shutdown()
+
+
+def _count(app_module, table):
+    with db_connection(path=app_module.blockchain.db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_batch_streams_wallets_and_stores_them_together(app_module, client, fast_keygen):
+    response = client.post('/wallets/batch', json={"families": [
+        {"num_members": 2, "passphrase": "one"},
+        {"num_members": 1, "passphrase": "two"},
+        {"num_members": 3, "passphrase": "three"},
+    ]})
+    assert response.status_code == 201
+    assert response.mimetype == 'application/x-ndjson'
+
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines[-1] == {"done": True, "created": 3}
+    created = {line['index']: line for line in lines[:-1]}
+    assert sorted(created) == [0, 1, 2]
+    assert [len(created[i]['members']) for i in range(3)] == [2, 1, 3]
+
+    assert _count(app_module, 'wallets') == 3
+    assert _count(app_module, 'wallet_members') == 6
+    wallets = app_module.blockchain.wallets
+    member = created[2]['members'][0]['address']
+    assert wallets.wallet_for_address(member) == created[2]['family_id']
+
+    with db_connection(path=app_module.blockchain.db_path) as conn:
+        row = conn.execute("SELECT public_key FROM wallet_keys WHERE family_id = ?",
+                           (created[1]['family_id'],)).fetchone()
+    key, _ = pgpy.PGPKey.from_blob(row['public_key'])
+    assert key.is_public
+
+
+def test_batch_is_validated_before_any_keygen(client, fast_keygen):
+    response = client.post('/wallets/batch', json={"families": [
+        {"num_members": 1, "passphrase": "ok"},
+        {"num_members": 21, "passphrase": "too many"},
+    ]})
+    assert response.status_code == 400
+    assert 'families[1]' in response.json['error']
+    assert client.post('/wallets/batch', json={"families": []}).status_code == 400
+    assert client.post('/wallets/batch', json={"families": [{"passphrase": ""}]}).status_code == 400
+
+
+def test_abandoned_batch_stores_nothing(app_module, fast_keygen):
+    families = [{"family_id": f"drive{i:07d}", "members": [{"name": "A"}], "passphrase": "x"}
+                for i in range(3)]
+    batch = app_module.blockchain.wallets.create_wallets(families, "test")
+    next(batch)
+    batch.close()   # client went away after the first line
+    assert _count(app_module, 'wallets') == 0
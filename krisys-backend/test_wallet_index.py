@@ -0,0 +1,39 @@
+import json
+import database
+
+
+def test_members_and_devices_are_normalized(app_module, client):
+    wallets = app_module.blockchain.wallets
+    wallet = wallets.create_wallet(family_id="normal000001", members=[{"name": "A"}, {"name": "B"}],
+                                   crisis_id="test")
+    address = wallet.members[1]['address']
+
+    assert wallets.wallet_for_address(address) == wallet.family_id
+    assert client.get(f'/address/{address}/wallet').json['family_id'] == wallet.family_id
+    assert client.get('/address/nobody/wallet').status_code == 404
+
+    wallets.add_device_to_wallet(wallet.family_id, "phone-1", "PUBKEY-1")
+    wallets.add_device_to_wallet(wallet.family_id, "phone-1", "PUBKEY-2")   # re-keyed, not duplicated
+    wallets.wallets.clear()     # force the database path
+    reloaded = wallets.get_wallets([wallet.family_id, "missing"])
+    assert list(reloaded) == [wallet.family_id]
+    assert reloaded[wallet.family_id].members == wallet.members
+    assert [(d['device_id'], d['public_key']) for d in reloaded[wallet.family_id].devices] == [("phone-1", "PUBKEY-2")]
+
+
+def test_json_columns_are_migrated(app_module):
+    members = [{"id": "legacy-0001", "name": "Old", "address": "legacy-0001"}]
+    devices = [{"device_id": "tablet", "public_key": "KEY", "registered_at": 1.0}]
+    with database.db_connection() as conn:
+        conn.execute('DROP TABLE wallet_members')
+        conn.execute('DROP TABLE wallet_devices')
+        conn.execute("INSERT INTO wallets (family_id, crisis_id, members, devices) VALUES (?, ?, ?, ?)",
+                     ("legacy", "test", json.dumps(members), json.dumps(devices)))
+        conn.commit()
+
+    database.init_db()
+    wallets = app_module.blockchain.wallets
+    wallet = wallets.get_wallet("legacy")
+    assert wallet.members == members
+    assert wallet.devices == devices
+    assert wallets.wallet_for_address("legacy-0001") == "legacy"
@@ -0,0 +1,49 @@
+import time
+from blockchain import Transaction
+
+
+def _send(chain, address, type_field="message", offset=0.0):
+    chain.add_transaction(Transaction(
+        timestamp_created=time.time() + offset, station_address=f"station-{offset}", message_data="hi",
+        related_addresses=[address], type_field=type_field, priority_level=1,
+    ), rate_limit_override=True)
+    chain.mine_and_save()
+
+
+def test_delta_sync_and_counts(app_module, client):
+    chain = app_module.blockchain
+    wallet = chain.wallets.create_wallet(family_id="deltasync001", members=[{"name": "A"}], crisis_id="test")
+    address = wallet.members[0]['address']
+    url = f'/wallet/{wallet.family_id}/transactions'
+
+    _send(chain, address)
+    _send(chain, "someone-else", offset=1)
+    full = client.get(url).json
+    assert isinstance(full, list) and len(full) == 1
+
+    first = client.get(f'{url}?since_block=-1').json
+    assert len(first['transactions']) == 1 and first['cursor'] == 2
+    assert client.get(f"{url}?since_block={first['cursor']}").json == {"transactions": [], "cursor": 2}
+
+    _send(chain, address, type_field="check_in", offset=2)
+    delta = client.get(f"{url}?since_block={first['cursor']}").json
+    assert [tx['type_field'] for tx in delta['transactions']] == ["check_in"]
+    assert delta['cursor'] == 3
+
+    counts = client.get(f'{url}?counts=1').json
+    assert counts == {"total": 2, "by_type": {"message": 1, "check_in": 1}, "cursor": 3}
+    assert client.get(f"{url}?since_block=2&counts=1").json['total'] == 1
+    assert client.get(f'{url}?since_block=abc').status_code == 400
+
+
+def test_address_index_spans_sealed_segments(app_module):
+    chain = app_module.blockchain
+    _send(chain, "addr-x")
+    _send(chain, "addr-x", offset=1)
+    chain.seal_cold_blocks(now=time.time() + 10 * chain.chain.epoch_seconds)
+    _send(chain, "addr-x", offset=2)
+
+    assert chain.chain.segments
+    assert [b.block_index for b in chain.chain.blocks_for_addresses(["addr-x"])] == [1, 2, 3]
+    assert [b.block_index for b in chain.chain.blocks_for_addresses(["addr-x"], since_block=1)] == [2, 3]
+    assert [b.block_index for b in chain.chain.blocks_for_addresses(["addr-x"], 1, until_block=2)] == [2]
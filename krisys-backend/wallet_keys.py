@@ -0,0 +1,63 @@
+# wallet_keys.py
+"""
+Wallet key material, kept free of app/blockchain imports so process-pool workers
+(bulk wallet creation) start quickly and never inherit the server's threads or
+database connections.
+"""
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import threading
+import pgpy
+from pgpy.constants import PubKeyAlgorithm, KeyFlags, HashAlgorithm, SymmetricKeyAlgorithm
+
+WALLET_KEY_BITS = 4096
+KEYGEN_WORKERS = int(os.getenv('KRISYS_KEYGEN_WORKERS', 0)) or os.cpu_count() or 1
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def generate_keypair(passphrase: str = "") -> pgpy.PGPKey:
+    """RSA-4096 wallet key, protected with the user's passphrase"""
+    key = pgpy.PGPKey.new(PubKeyAlgorithm.RSAEncryptOrSign, WALLET_KEY_BITS)
+    uid = pgpy.PGPUID.new('KriSYS Wallet', comment='Auto-generated')
+    key.add_uid(uid, usage={KeyFlags.Sign, KeyFlags.EncryptCommunications},
+                hashes=[HashAlgorithm.SHA256],
+                ciphers=[SymmetricKeyAlgorithm.AES256])
+
+    key.protect(passphrase, SymmetricKeyAlgorithm.AES256, HashAlgorithm.SHA256)
+    return key
+
+
+def wrap_with_master_key(data: str, master_public_key: str) -> str:
+    """Encrypt data to the blockchain's master public key"""
+    pub_key = pgpy.PGPKey()
+    pub_key.parse(master_public_key)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')     # pgpy: compression algorithm not in key preferences
+        return str(pub_key.encrypt(pgpy.PGPMessage.new(data)))
+
+
+def generate_wallet_keys(passphrase: str, master_public_key: str):
+    """
+    Everything CPU-heavy about a new wallet, runnable in a worker process
+    - Returns: (master-wrapped, passphrase-protected private key, public key), as stored in wallet_keys
+    """
+    keypair = generate_keypair(passphrase)
+    return wrap_with_master_key(str(keypair), master_public_key), str(keypair.pubkey)
+
+
+def keygen_pool() -> ProcessPoolExecutor:
+    """
+    Shared process pool for bulk keygen, created on first use
+    - spawn, not fork: the server process has miner/logging threads and open sockets
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():     # a forked worker builds its own
+            _pool_pid = os.getpid()
+            _pool = ProcessPoolExecutor(max_workers=KEYGEN_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
@@ -65,6 +65,11 @@ export const api = {
         }),
     getWallet: (familyId) => axios.get(`${API_BASE}/wallet/${familyId}`),
     getWalletTransactions: (familyId) => axios.get(`${API_BASE}/wallet/${familyId}/transactions`),
+    // Delta sync: only transactions mined after sinceBlock; pass back the returned cursor
+    getWalletTransactionsSince: (familyId, sinceBlock) =>
+        axios.get(`${API_BASE}/wallet/${familyId}/transactions`, { params: { since_block: sinceBlock } }),
+    getWalletTransactionCounts: (familyId, sinceBlock) =>
+        axios.get(`${API_BASE}/wallet/${familyId}/transactions`, { params: { counts: 1, since_block: sinceBlock } }),
     getWalletQR: (familyId, address) => axios.get(`${API_BASE}/wallet/${familyId}/qr/${address}`),
         
     // Auth endpoints